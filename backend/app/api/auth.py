@@ -3,15 +3,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user_readonly, token_claims
 
 from app.db.database import get_db
 from app.db.models import User
 from app.schemas.auth import RegisterRequest, LoginRequest, UserResponse, AuthResponse
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import (
+    hash_password_async, verify_password_async, create_access_token, PasswordHasherBusy,
+)
 
 router = APIRouter()
 
+def auth_busy() -> HTTPException:
+    # Password hashing pool is saturated; ask the client to retry shortly
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=AuthResponse)
 async def register_user(payload: RegisterRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == payload.email))
@@ -20,17 +30,22 @@ async def register_user(payload: RegisterRequest, db: AsyncSession = Depends(get
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    try:
+        hashed_password = await hash_password_async(payload.password)
+    except PasswordHasherBusy:
+        raise auth_busy()
+
     new_user = User(
         name=payload.name,
         email=payload.email,
-        hashed_password=hash_password(payload.password)
+        hashed_password=hashed_password
     )
 
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
 
-    token = create_access_token(data={"sub": str(new_user.id)})
+    token = create_access_token(data=token_claims(new_user))
 
     return AuthResponse(
         user=UserResponse(
@@ -47,10 +62,15 @@ async def login_user(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == payload.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(payload.password, user.hashed_password):
+    try:
+        valid = user is not None and await verify_password_async(payload.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise auth_busy()
+
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    token = create_access_token(data={"sub": str(user.id)})
+    token = create_access_token(data=token_claims(user))
 
     return AuthResponse(
         user=UserResponse(
@@ -64,7 +84,7 @@ async def login_user(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/user", response_model=UserResponse)
-async def get_user(current_user: User = Depends(get_current_user)):
+async def get_user(current_user: User = Depends(get_current_user_readonly)):
     # Returns the current user's data (name, email, etc.)
     return UserResponse(
         id=current_user.id,
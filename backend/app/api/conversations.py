@@ -1,13 +1,15 @@
 # backend/app/api/conversations.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from typing import Optional
 from app.db.database import get_db
-from app.db.models import Conversation, VectorContext
+from app.db.models import Conversation, VectorContext, Message
+from app.core.pagination import encode_cursor, decode_cursor
 from app.schemas.conversations import ConversationCreate, ConversationOut
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_readonly
 from app.db.models import User
 from fastapi import HTTPException, status
 
@@ -23,29 +25,71 @@ router = APIRouter()
 #     )
 #     return result.scalars().all()
 
+PREVIEW_LENGTH = 200
+
 @router.get("/", response_model=list[ConversationOut])
 async def get_conversations(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Cursor: return conversations less recently active than this one"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_readonly)
 ):
-    result = await db.execute(
-        select(Conversation)
-        .options(selectinload(Conversation.vector_context))
+    """
+    Conversations ordered by most recent activity, with their context info and a
+    preview of the latest message, fetched in a single query. The `X-Before-Cursor`
+    response header (set when more exist) fetches the next page.
+    """
+    # The sort key is stored on the row, so each page is a range scan of the
+    # (user_id, last_message_at, id) index; only the returned rows look up their
+    # preview, through the (conversation_id, created_at, id) index on messages
+    last_message_preview = (
+        select(func.substr(Message.content, 1, PREVIEW_LENGTH))
+        .where(Message.conversation_id == Conversation.id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(1)
+        .correlate(Conversation)
+        .scalar_subquery()
+    )
+
+    query = (
+        select(
+            Conversation.id,
+            Conversation.vector_context_id,
+            Conversation.title,
+            Conversation.created_at,
+            Conversation.last_message_at,
+            VectorContext.chroma_collection_name,
+            VectorContext.description,
+            last_message_preview.label("last_message_preview"),
+        )
+        .outerjoin(VectorContext, VectorContext.id == Conversation.vector_context_id)
         .where(Conversation.user_id == current_user.id)
-        .order_by(Conversation.created_at.desc())
     )
-    conversations = result.scalars().all()
+    if before:
+        query = query.where(
+            tuple_(Conversation.last_message_at, Conversation.id) < tuple_(*decode_cursor(before))
+        )
+    query = query.order_by(Conversation.last_message_at.desc(), Conversation.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Before-Cursor"] = encode_cursor(rows[-1].last_message_at, rows[-1].id)
 
     return [
         ConversationOut(
-            id=c.id,
-            vector_context_id=c.vector_context_id,
-            collection_name=c.vector_context.chroma_collection_name,
-            description=c.vector_context.description,
-            title=c.title,
-            created_at=c.created_at,
+            id=row.id,
+            vector_context_id=row.vector_context_id,
+            collection_name=row.chroma_collection_name,
+            description=row.description,
+            title=row.title,
+            created_at=row.created_at,
+            # Until the first message the sort key holds the creation time
+            last_message_at=row.last_message_at if row.last_message_preview is not None else None,
+            last_message_preview=row.last_message_preview,
         )
-        for c in conversations
+        for row in rows
     ]
 
 
@@ -0,0 +1,33 @@
+# backend/app/api/jobs.py
+
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.database import get_db
+from app.db.models import GenerationJob, User
+from app.core.dependencies import get_current_user_readonly
+from app.schemas.jobs import JobOut
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_readonly),
+):
+    """Status of a generation job; `assistant_message_id` is the id the reply will have."""
+    result = await db.execute(
+        select(GenerationJob).where(
+            GenerationJob.id == job_id,
+            GenerationJob.user_id == current_user.id,
+        )
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
@@ -1,15 +1,20 @@
 # backend/app/api/messages.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.database import get_db
-from app.core.dependencies import get_current_user
-from app.db.models import Message, Conversation, User, VectorContext
+from app.core.dependencies import get_current_user, get_current_user_readonly
+from app.db.models import Message, Conversation, User, VectorContext, RoleEnum
 from app.schemas.messages import MessageCreate, MessageOut, MessageRead, MessageRole
-from app.core.llm_responder import generate_llm_response
+from app.jobs.queue import enqueue_generation, notify_job_available, QueueFull
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.activity import touch_conversation
 
-from uuid import UUID
+from typing import Optional
+from uuid import UUID, uuid4
 
 router = APIRouter()
 
@@ -17,68 +22,131 @@ router = APIRouter()
 @router.get("/{conversation_id}", response_model=list[MessageOut])
 async def get_messages(
     conversation_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Cursor: return the page of messages older than this one"),
+    after: Optional[str] = Query(None, description="Cursor: return messages newer than this one (incremental refresh)"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_readonly)
 ):
+    """
+    Keyset-paginated message history, oldest first within a page.
+
+    Without a cursor the latest `limit` messages are returned. The `X-Before-Cursor`
+    response header (set when older messages exist) fetches the previous page, and
+    `X-After-Cursor` fetches anything newer than this page.
+    """
     # Ensure user owns this conversation
     result = await db.execute(
-        select(Conversation).where(
+        select(Conversation.id).where(
             Conversation.id == conversation_id,
             Conversation.user_id == current_user.id
         )
     )
-    conversation = result.scalar_one_or_none()
-    if not conversation:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    result = await db.execute(
-        select(Message).where(Message.conversation_id == conversation_id).order_by(Message.created_at.asc())
+    # Only the columns the client needs, no ORM entities
+    query = select(
+        Message.id, Message.conversation_id, Message.role, Message.content, Message.created_at
+    ).where(Message.conversation_id == conversation_id)
+    key = tuple_(Message.created_at, Message.id)
+
+    if after:
+        query = query.where(key > tuple_(*decode_cursor(after)))
+        query = query.order_by(Message.created_at.asc(), Message.id.asc())
+    else:
+        if before:
+            query = query.where(key < tuple_(*decode_cursor(before)))
+        query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+    # One extra row tells whether another page exists
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not after:
+        rows.reverse()
+
+    headers = {}
+    if rows:
+        headers["X-After-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+        if has_more and not after:
+            headers["X-Before-Cursor"] = encode_cursor(rows[0].created_at, rows[0].id)
+    elif after:
+        headers["X-After-Cursor"] = after
+    if after:
+        headers["X-Has-More"] = str(has_more).lower()
+
+    return ORJSONResponse(
+        [
+            {
+                "id": row.id,
+                "conversation_id": row.conversation_id,
+                "role": row.role.value,
+                "content": row.content,
+                "created_at": row.created_at,
+            }
+            for row in rows
+        ],
+        headers=headers,
     )
-    return result.scalars().all()
 
 @router.post("/{conversation_id}", response_model=MessageRead)
 async def create_user_message(
     conversation_id: UUID,
     message_in: MessageCreate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Validate conversation exists and belongs to user
-    conversation = await db.get(Conversation, conversation_id)
-    if not conversation or conversation.user_id != current_user.id:
+    # Ownership check and vector context resolution in one joined query
+    result = await db.execute(
+        select(VectorContext.id)
+        .select_from(Conversation)
+        .outerjoin(VectorContext, VectorContext.id == Conversation.vector_context_id)
+        .where(
+            Conversation.id == conversation_id,
+            Conversation.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
-
-    # Get vector context for the conversation
-    vector_context = await db.get(VectorContext, conversation.vector_context_id)
-    if not vector_context:
+    if row.id is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vector context not found")
 
-    # Save user message
-    user_message = Message(
-        conversation_id=conversation_id,
-        role="user",
-        content=message_in.content,
-    )
-    db.add(user_message)
-    await db.flush()
-
-    # Trigger async LLM response
-    background_tasks.add_task(
-        generate_llm_response,
-        db=db,
-        user=current_user,
-        conversation_id=conversation_id,
-        user_message=user_message,
-        vector_context=vector_context,
+    # Save user message; RETURNING gives back the server-side timestamp without a reload
+    message_id = uuid4()
+    result = await db.execute(
+        insert(Message)
+        .values(id=message_id, conversation_id=conversation_id, role=RoleEnum.user, content=message_in.content)
+        .returning(Message.created_at)
     )
+    created_at = result.scalar_one()
+    await touch_conversation(db, conversation_id, created_at)
 
+    # The reply is generated by a worker; the job commits together with the message
+    try:
+        job_id = await enqueue_generation(
+            db,
+            user_id=current_user.id,
+            conversation_id=conversation_id,
+            vector_context_id=row.id,
+            user_message_id=message_id,
+        )
+    except QueueFull:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending replies, please retry",
+            headers={"Retry-After": "5"},
+        )
     await db.commit()
+    notify_job_available()
 
     return MessageRead(
-        id=user_message.id,
-        conversation_id=user_message.conversation_id,
-        role=user_message.role,
-        content=user_message.content,
-        created_at=user_message.created_at
+        id=message_id,
+        conversation_id=conversation_id,
+        role=MessageRole.user,
+        content=message_in.content,
+        created_at=created_at,
+        job_id=job_id,
     )
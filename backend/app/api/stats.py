@@ -0,0 +1,30 @@
+# backend/app/api/stats.py
+
+from fastapi import APIRouter, Depends, Request
+from app.core.llm_responder import (
+    collection_registry, numpy_registry, query_embedding_cache, answer_cache, embedding_batcher,
+)
+from app.core.inference import inference_stats
+from app.core.dependencies import require_stats_access, user_cache, vector_context_catalog
+from app.core.security import password_hasher
+from app.websockets.manager import manager
+
+router = APIRouter()
+
+@router.get("/", dependencies=[Depends(require_stats_access)])
+async def get_stats(request: Request):
+    # Runtime counters for the in-process caches and pools
+    worker = getattr(request.app.state, "generation_worker", None)
+    return {
+        "collections": collection_registry.stats(),
+        "numpy_collections": numpy_registry.stats(),
+        "inference": inference_stats(),
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "embedding_batcher": embedding_batcher.stats(),
+        "answer_cache": answer_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "vector_context_catalog": vector_context_catalog.stats(),
+        "password_hasher": password_hasher.stats(),
+        "generation_worker": worker.stats() if worker else None,
+        "websockets": manager.stats(),
+    }
@@ -0,0 +1,99 @@
+# backend/app/api/usage.py
+
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.database import get_db
+from app.db.models import TokenUsageRollup, User
+from app.core.dependencies import get_current_user_readonly
+from app.schemas.usage import UsageBucket, UsageReport
+
+router = APIRouter()
+
+# Longest range per request, in buckets of the requested granularity (~3 months hourly)
+MAX_RANGE_BUCKETS = 24 * 93
+# Rows returned at most; more (many contexts) sets `truncated`, totals stay exact
+MAX_BUCKETS = 4 * MAX_RANGE_BUCKETS
+BUCKET_WIDTH = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+@router.get("/", response_model=UsageReport)
+async def get_usage(
+    granularity: Literal["hour", "day"] = Query("day"),
+    start: Optional[datetime] = Query(None, description="Inclusive; defaults to 30 days before `end`"),
+    end: Optional[datetime] = Query(None, description="Exclusive; defaults to now"),
+    vector_context_id: Optional[UUID] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_readonly),
+):
+    """
+    Token consumption of the current user per vector context and hour/day bucket,
+    read from the pre-aggregated rollups rather than the token_usage table.
+    Ranges longer than MAX_RANGE_BUCKETS buckets are rejected; when the buckets
+    of all contexts exceed MAX_BUCKETS the list is cut and `truncated` is set.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    if end - start > BUCKET_WIDTH[granularity] * MAX_RANGE_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large: at most {MAX_RANGE_BUCKETS} {granularity} buckets per request",
+        )
+
+    filters = [
+        TokenUsageRollup.user_id == current_user.id,
+        TokenUsageRollup.granularity == granularity,
+        TokenUsageRollup.bucket_start >= start,
+        TokenUsageRollup.bucket_start < end,
+    ]
+    if vector_context_id:
+        filters.append(TokenUsageRollup.vector_context_id == vector_context_id)
+
+    query = (
+        select(
+            TokenUsageRollup.bucket_start,
+            TokenUsageRollup.vector_context_id,
+            TokenUsageRollup.input_tokens,
+            TokenUsageRollup.output_tokens,
+            TokenUsageRollup.message_count,
+        )
+        .where(*filters)
+        .order_by(TokenUsageRollup.bucket_start, TokenUsageRollup.vector_context_id)
+        .limit(MAX_BUCKETS + 1)
+    )
+    rows = (await db.execute(query)).all()
+    truncated = len(rows) > MAX_BUCKETS
+    buckets = [UsageBucket(**row._mapping) for row in rows[:MAX_BUCKETS]]
+
+    if truncated:
+        # Totals cover the whole range, not just the buckets returned
+        totals = (await db.execute(
+            select(
+                func.coalesce(func.sum(TokenUsageRollup.input_tokens), 0),
+                func.coalesce(func.sum(TokenUsageRollup.output_tokens), 0),
+                func.coalesce(func.sum(TokenUsageRollup.message_count), 0),
+            ).where(*filters)
+        )).one()
+    else:
+        totals = (
+            sum(b.input_tokens for b in buckets),
+            sum(b.output_tokens for b in buckets),
+            sum(b.message_count for b in buckets),
+        )
+
+    return UsageReport(
+        granularity=granularity,
+        input_tokens=totals[0],
+        output_tokens=totals[1],
+        message_count=totals[2],
+        truncated=truncated,
+        buckets=buckets,
+    )
@@ -1,23 +1,118 @@
 # backend/app/api/ws.py
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import tuple_
+from sqlalchemy.future import select
 from app.websockets.manager import manager
 from uuid import UUID
 from app.core.dependencies import get_current_user
-from app.db.models import User
+from app.core.security import WS_HEARTBEAT_TIMEOUT_SECONDS, WS_REPLAY_MAX_MESSAGES
+from app.db.database import AsyncSessionLocal
+from app.db.models import Conversation, Message, RoleEnum
 from fastapi import Query
 
 router = APIRouter()
 
+
+async def owns_conversation(token: Optional[str], conversation_id: UUID) -> bool:
+    """Whether the token is valid and its user owns the conversation."""
+    if not token:
+        return False
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await get_current_user(token=token, db=db)
+        except HTTPException:
+            return False
+        owner_id = (await db.execute(
+            select(Conversation.user_id).where(Conversation.id == conversation_id)
+        )).scalar_one_or_none()
+    return owner_id is not None and owner_id == user.id
+
+
+async def replay_from_db(conversation_id: UUID, last_message_id: UUID) -> Optional[list[dict]]:
+    """
+    Returns the assistant replies newer than `last_message_id` as "replay" frames,
+    or None when the client has to refetch instead (unknown cursor, or more than
+    WS_REPLAY_MAX_MESSAGES were missed).
+    """
+    async with AsyncSessionLocal() as db:
+        cursor = (await db.execute(
+            select(Message.created_at, Message.id).where(
+                Message.id == last_message_id,
+                Message.conversation_id == conversation_id,
+            )
+        )).one_or_none()
+        if cursor is None:
+            return None
+        rows = (await db.execute(
+            select(Message.id, Message.content, Message.created_at)
+            .where(
+                Message.conversation_id == conversation_id,
+                Message.role == RoleEnum.assistant,
+                tuple_(Message.created_at, Message.id) > tuple_(cursor.created_at, cursor.id),
+            )
+            .order_by(Message.created_at, Message.id)
+            .limit(WS_REPLAY_MAX_MESSAGES + 1)
+        )).all()
+
+    if len(rows) > WS_REPLAY_MAX_MESSAGES:
+        return None
+    return [
+        {
+            "type": "replay",
+            "id": str(row.id),
+            "conversation_id": str(conversation_id),
+            "role": "assistant",
+            "content": row.content,
+            "created_at": row.created_at.isoformat(),
+        }
+        for row in rows
+    ]
+
+
 @router.websocket("/ws/{conversation_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
     conversation_id: UUID,
-    # token: str = Query(...),
+    epoch: Optional[str] = Query(None, description="Resume: event log epoch last seen by the client"),
+    seq: Optional[int] = Query(None, description="Resume: last frame sequence number received"),
+    last_message_id: Optional[UUID] = Query(None, description="Resume: last complete message the client has"),
+    token: Optional[str] = Query(None, description="Access token of the conversation's owner"),
 ):
+    # Browsers can't set headers on a WebSocket, so the token comes as a query parameter
+    if not await owns_conversation(token, conversation_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    connection, resumed = await manager.connect(conversation_id, websocket, resume_epoch=epoch, resume_seq=seq)
     try:
-        await manager.connect(conversation_id, websocket)
-        while True:
-            await websocket.receive_text()  # Optional: could just wait for connection unless you want ping/pong
-    except WebSocketDisconnect:
-        manager.disconnect(conversation_id)
\ No newline at end of file
+        # The event log could not cover the gap: fall back to the message table,
+        # or tell the client to refetch its history. Live frames are held back
+        # meanwhile so they arrive after the replayed history.
+        if epoch and not resumed:
+            replayed = await replay_from_db(conversation_id, last_message_id) if last_message_id else None
+            if replayed is None:
+                replayed = [{"type": "resync", "conversation_id": str(conversation_id)}]
+            connection.release(replayed)
+
+        while not connection.closed:
+            # Anything from the client (usually a pong) proves it is still there
+            try:
+                text = await asyncio.wait_for(websocket.receive_text(), timeout=WS_HEARTBEAT_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                break
+            connection.touch()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "ping":
+                connection.offer({"type": "pong"})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        await manager.disconnect(connection)
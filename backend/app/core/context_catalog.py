@@ -0,0 +1,117 @@
+# backend/app/core/context_catalog.py
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import VectorContext
+from app.vector_store.collection_pool import catalog_version
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    # Session-independent snapshot of a VectorContext row
+    id: UUID
+    name: str
+    description: Optional[str]
+    chroma_collection_name: str
+    vector_backend: str
+    created_at: datetime
+
+
+class VectorContextCatalog:
+    """
+    In-memory copy of the vector_contexts table, which only changes on ingest.
+
+    The catalog reloads when the ingest pipeline touches the catalog marker under the
+    Chroma base path (other processes), when this process writes a VectorContext
+    through the ORM, or at the latest after `ttl_seconds`.
+    """
+
+    def __init__(self, base_path: Path, ttl_seconds: float = 300):
+        self.base_path = base_path
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[UUID, CatalogEntry] = {}
+        self._ordered: List[CatalogEntry] = []
+        self._loaded_at: Optional[float] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+        self.hits = 0
+
+    def _stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        if time.monotonic() - self._loaded_at > self.ttl_seconds:
+            return True
+        return catalog_version(self.base_path) != self._version
+
+    async def _ensure_fresh(self, db: AsyncSession, force: bool = False):
+        if not force and not self._stale():
+            self.hits += 1
+            return
+        async with self._lock:
+            # Another request may have reloaded while we waited
+            if not force and not self._stale():
+                return
+            version = catalog_version(self.base_path)
+            result = await db.execute(
+                select(
+                    VectorContext.id,
+                    VectorContext.name,
+                    VectorContext.description,
+                    VectorContext.chroma_collection_name,
+                    VectorContext.vector_backend,
+                    VectorContext.created_at,
+                ).order_by(VectorContext.created_at.desc())
+            )
+            ordered = [CatalogEntry(**row._mapping) for row in result.all()]
+            self._ordered = ordered
+            self._entries = {entry.id: entry for entry in ordered}
+            self._version = version
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    async def list(self, db: AsyncSession) -> List[CatalogEntry]:
+        """All vector contexts, newest first."""
+        await self._ensure_fresh(db)
+        return self._ordered
+
+    async def get(self, db: AsyncSession, vector_context_id: UUID) -> Optional[CatalogEntry]:
+        await self._ensure_fresh(db)
+        entry = self._entries.get(vector_context_id)
+        if entry is None:
+            # Possibly created elsewhere without touching the marker; reload once
+            await self._ensure_fresh(db, force=True)
+            entry = self._entries.get(vector_context_id)
+        return entry
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._ordered),
+            "version": self._version,
+            "age_seconds": time.monotonic() - self._loaded_at if self._loaded_at else None,
+            "ttl_seconds": self.ttl_seconds,
+            "reloads": self.reloads,
+            "hits": self.hits,
+        }
+
+
+def register_invalidation_hooks(catalog: VectorContextCatalog):
+    """Drops the catalog whenever this process writes a VectorContext through the ORM."""
+
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        @event.listens_for(VectorContext, event_name)
+        def _on_change(mapper, connection, target):
+            catalog.invalidate()
@@ -1,5 +1,10 @@
 # backend/app/core/dependencies.py
 
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Union
+from uuid import UUID
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
@@ -7,6 +12,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.db.models import User
 from app.db.database import get_db
+from app.core.security import (
+    USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES, AUTH_TRUST_TOKEN_CLAIMS,
+    CHROMA_BASE_PATH, CONTEXT_CATALOG_TTL_SECONDS, STATS_ADMIN_EMAILS,
+)
+from app.core.user_cache import UserCache, register_invalidation_hooks
+from app.core.context_catalog import VectorContextCatalog, register_invalidation_hooks as register_catalog_hooks
 import os
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -14,6 +25,34 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 
+user_cache = UserCache(ttl_seconds=USER_CACHE_TTL_SECONDS, max_entries=USER_CACHE_MAX_ENTRIES)
+register_invalidation_hooks(user_cache)
+
+vector_context_catalog = VectorContextCatalog(CHROMA_BASE_PATH, ttl_seconds=CONTEXT_CATALOG_TTL_SECONDS)
+register_catalog_hooks(vector_context_catalog)
+
+
+@dataclass
+class TokenUser:
+    # User identity taken from signed token claims, without a DB lookup
+    id: UUID
+    name: str
+    email: str
+    created_at: datetime
+
+
+def token_claims(user: User) -> dict:
+    # Identity claims are only needed (and only exposed) when they are trusted
+    if not AUTH_TRUST_TOKEN_CLAIMS:
+        return {"sub": str(user.id)}
+    return {
+        "sub": str(user.id),
+        "name": user.name,
+        "email": user.email,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
@@ -21,12 +60,52 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = str(payload.get("sub"))
-        result = await db.execute(select(User).where(User.id == user_id))
+
+        user = user_cache.get(user_id)
+        if user:
+            return user
+
+        result = await db.execute(select(User).where(User.id == UUID(user_id)))
         user = result.scalar_one_or_none()
 
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
 
-        return user
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        return user_cache.put(user)
+    except (JWTError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+async def get_current_user_readonly(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Union[User, TokenUser]:
+    """
+    For read-only endpoints. With AUTH_TRUST_TOKEN_CLAIMS enabled the signed claims
+    are trusted as-is (no DB or cache lookup); a deleted user then stays valid until
+    the token expires.
+    """
+    if AUTH_TRUST_TOKEN_CLAIMS:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if all(payload.get(claim) for claim in ("sub", "name", "email", "created_at")):
+            return TokenUser(
+                id=UUID(payload["sub"]),
+                name=payload["name"],
+                email=payload["email"],
+                created_at=datetime.fromisoformat(payload["created_at"]),
+            )
+
+    # Older tokens without identity claims go through the regular lookup
+    return await get_current_user(token=token, db=db)
+
+
+async def require_stats_access(
+    current_user: Union[User, TokenUser] = Depends(get_current_user_readonly),
+) -> Union[User, TokenUser]:
+    # Runtime stats are for operators; STATS_ADMIN_EMAILS narrows them down further
+    if STATS_ADMIN_EMAILS and current_user.email.lower() not in STATS_ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Not allowed to read stats")
+    return current_user
@@ -0,0 +1,86 @@
+# backend/app/core/embedding_batcher.py
+
+import asyncio
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.inference import InferenceStage
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-query embedding calls into batched forward passes.
+
+    Callers are parked on a future; the pending batch is flushed when it reaches
+    `max_batch_size` or `max_wait_ms` after its first item arrived, whichever comes
+    first. Identical texts within a batch are embedded once.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        stage: InferenceStage,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5,
+    ):
+        self.embed_batch = embed_batch
+        self.stage = stage
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.items += len(batch)
+
+        try:
+            vectors = await self.stage.run(self.embed_batch, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,136 @@
+# backend/app/core/embedding_cache.py
+
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    # Collapse whitespace so trivially different queries share one entry
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of query embeddings keyed by (model name, normalized text).
+
+    Entries expire after `ttl_seconds`. When `disk_path` is set, embeddings are also
+    written to a small SQLite file so the cache survives restarts; the disk tier is
+    only consulted on a memory miss and hits are promoted back into memory.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        disk_path: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> Tuple[str, str]:
+        return (self.model_name, normalize_text(text))
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Memory-only lookup, safe to call from the event loop."""
+        key = self._key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, vector = entry
+            if self._expired(stored_at):
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def load(self, text: str) -> Optional[List[float]]:
+        """Disk tier lookup (blocking). Counts a miss when nothing usable is found."""
+        if not self.disk_path:
+            self.misses += 1
+            return None
+
+        key = self._key(text)
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT vector, stored_at FROM query_embeddings WHERE model = ? AND text = ?",
+                key,
+            ).fetchone()
+        if row is None or self._expired(row[1]):
+            self.misses += 1
+            return None
+
+        vector = array("f", row[0]).tolist()
+        self._remember(key, vector, row[1])
+        self.disk_hits += 1
+        return vector
+
+    def put(self, text: str, vector: List[float]):
+        key = self._key(text)
+        stored_at = time.time()
+        self._remember(key, vector, stored_at)
+
+        if self.disk_path:
+            with self._lock:
+                db = self._connection()
+                db.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (model, text, vector, stored_at) VALUES (?, ?, ?, ?)",
+                    (*key, array("f", vector).tobytes(), stored_at),
+                )
+                db.commit()
+
+    def _remember(self, key: Tuple[str, str], vector: List[float], stored_at: float):
+        with self._lock:
+            self._entries[key] = (stored_at, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, stored_at REAL NOT NULL, "
+                "PRIMARY KEY (model, text))"
+            )
+        return self._db
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.disk_path:
+                self._connection().execute("DELETE FROM query_embeddings WHERE model = ?", (self.model_name,))
+                self._connection().commit()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_tier": bool(self.disk_path),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,133 @@
+# backend/app/core/inference.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import ollama
+
+from app.core.security import (
+    LLM_MODEL_NAME, LLM_MAX_CONCURRENCY,
+    EMBEDDING_WORKERS, EMBEDDING_MAX_CONCURRENCY,
+    TOKENIZER_WORKERS, TOKENIZER_MAX_CONCURRENCY,
+    SEARCH_WORKERS, SEARCH_MAX_CONCURRENCY,
+    EMBEDDING_CACHE_IO_WORKERS,
+)
+
+
+class InferenceStage:
+    """
+    A bounded execution lane for one kind of blocking work.
+
+    `max_concurrency` caps how many calls may be in flight (queued callers wait on
+    the semaphore instead of piling up in the pool), and `max_workers` sizes the
+    thread pool that actually runs them. With `max_workers=0` the stage only limits
+    concurrency of natively async work (e.g. LLM calls).
+    """
+
+    def __init__(self, name: str, max_workers: int, max_concurrency: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker"
+            )
+        return self._executor
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        async with self.slot():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+        }
+
+
+# Embedding and tokenization run on threads: torch and the HF fast tokenizers
+# release the GIL, so threads give real parallelism without copying the models
+# into every worker process.
+embedding_stage = InferenceStage("embedding", EMBEDDING_WORKERS, EMBEDDING_MAX_CONCURRENCY)
+tokenizer_stage = InferenceStage("tokenizer", TOKENIZER_WORKERS, TOKENIZER_MAX_CONCURRENCY)
+# Vector index lookups get their own lane so retrieval never queues behind embedding batches
+search_stage = InferenceStage("search", SEARCH_WORKERS, SEARCH_MAX_CONCURRENCY)
+# Disk-tier reads/writes of the query embedding cache (SQLite, serialized anyway)
+cache_io_stage = InferenceStage("cache_io", EMBEDDING_CACHE_IO_WORKERS, 4 * EMBEDDING_CACHE_IO_WORKERS)
+llm_stage = InferenceStage("llm", 0, LLM_MAX_CONCURRENCY)
+
+_llm_client: Optional[ollama.AsyncClient] = None
+
+
+def get_llm_client() -> ollama.AsyncClient:
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = ollama.AsyncClient()
+    return _llm_client
+
+
+async def llm_chat(messages: list[dict[str, str]]) -> Any:
+    async with llm_stage.slot():
+        return await get_llm_client().chat(model=LLM_MODEL_NAME, messages=messages)
+
+
+async def llm_chat_stream(messages: list[dict[str, str]]) -> AsyncIterator[Any]:
+    # The slot is held for the whole stream so concurrent generations stay bounded
+    async with llm_stage.slot():
+        stream = await get_llm_client().chat(model=LLM_MODEL_NAME, messages=messages, stream=True)
+        async for chunk in stream:
+            yield chunk
+
+
+def shutdown_inference():
+    embedding_stage.shutdown()
+    tokenizer_stage.shutdown()
+    search_stage.shutdown()
+    cache_io_stage.shutdown()
+
+
+def inference_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        "embedding": embedding_stage.stats(),
+        "tokenizer": tokenizer_stage.stats(),
+        "search": search_stage.stats(),
+        "cache_io": cache_io_stage.stats(),
+        "llm": llm_stage.stats(),
+    }
@@ -1,14 +1,29 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.security import CHROMA_BASE_PATH, EMBEDDING_MODEL_NAME, ENCODING_MODEL_NAME, LLM_MODEL_NAME
+from app.core.security import (
+    CHROMA_BASE_PATH, EMBEDDING_MODEL_NAME, ENCODING_MODEL_NAME,
+    CHROMA_POOL_MAX_COLLECTIONS, CHROMA_POOL_MAX_BYTES, LLM_STREAMING,
+    EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_TTL_SECONDS, EMBEDDING_CACHE_PATH,
+    SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_MAX_CONTEXTS, SEMANTIC_CACHE_TTL_SECONDS,
+    EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+from app.vector_store.collection_pool import CollectionRegistry
+from app.vector_store.numpy_store import open_numpy_collection, store_footprint
+from app.core.embedding_cache import EmbeddingCache
+from app.core.semantic_cache import SemanticAnswerCache
+from app.core.embedding_batcher import EmbeddingBatcher
+from app.core.inference import embedding_stage, search_stage, cache_io_stage, tokenizer_stage, llm_chat, llm_chat_stream
 from app.db.models import Message, TokenUsage, VectorContext, User
-from uuid import UUID
-from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain.prompts import ChatPromptTemplate
-import ollama
-from transformers import AutoTokenizer
+from app.db.rollups import increment_usage_rollups
+from app.db.activity import touch_conversation
+from app.jobs.queue import JobLease, LeaseLost
+from uuid import UUID, uuid4
+from typing import Optional
+from datetime import datetime, timezone
+import hashlib
+import threading
 
 PROMPT_TEMPLATE = """
 Answer the question based only on the following context:
@@ -22,12 +37,192 @@ Do not start with "According to the provided context" and only provide relevant
 Prefer using paragraphs instead of pointers unless you are listing something or the question specificly requests it.
 """
 
-embedding_function = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+# Heavy models (and langchain/transformers themselves) are loaded on first use or
+# by the startup warm-up, so importing this module stays cheap.
+_embedding_function = None
+_tokenizer = None
+_model_lock = threading.Lock()
+
+
+def get_embedding_function():
+    global _embedding_function
+    if _embedding_function is None:
+        with _model_lock:
+            if _embedding_function is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+                _embedding_function = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    return _embedding_function
+
+
+def get_tokenizer():
+    global _tokenizer
+    if _tokenizer is None:
+        with _model_lock:
+            if _tokenizer is None:
+                from transformers import AutoTokenizer
+                _tokenizer = AutoTokenizer.from_pretrained(ENCODING_MODEL_NAME)
+    return _tokenizer
+
+
+def open_chroma_collection(path: str, collection_name: str):
+    from langchain_community.vectorstores import Chroma
+    return Chroma(
+        persist_directory=path,
+        collection_name=collection_name,
+        embedding_function=get_embedding_function()
+    )
+
+
+def embed_queries(texts: list[str]) -> list[list[float]]:
+    """
+    Embeds a batch of user queries exactly as `embed_query` would embed each one.
+    Query encode kwargs (prompts, instructions) are passed to a single `encode` call;
+    a model with its own query prompt but no query kwargs falls back to `embed_query`
+    per item, so cached vectors never differ from the unbatched path.
+    """
+    embeddings = get_embedding_function()
+    query_encode_kwargs = getattr(embeddings, "query_encode_kwargs", None)
+    if query_encode_kwargs:
+        texts = [text.replace("\n", " ") for text in texts]
+        return embeddings._client.encode(texts, **query_encode_kwargs).tolist()
+    if "query" in (getattr(embeddings._client, "prompts", None) or {}):
+        return [embeddings.embed_query(text) for text in texts]
+    # Without query-specific encoding, embed_query is embed_documents of one text
+    return embeddings.embed_documents(texts)
+
+
+# Concurrent queries share one batched forward pass
+embedding_batcher = EmbeddingBatcher(
+    embed_batch=embed_queries,
+    stage=embedding_stage,
+    max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+    max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+
+query_embedding_cache = EmbeddingCache(
+    model_name=EMBEDDING_MODEL_NAME,
+    max_entries=EMBEDDING_CACHE_SIZE,
+    ttl_seconds=EMBEDDING_CACHE_TTL_SECONDS,
+    disk_path=EMBEDDING_CACHE_PATH or None,
+)
+
+answer_cache = SemanticAnswerCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    max_entries_per_context=SEMANTIC_CACHE_MAX_ENTRIES,
+    max_contexts=SEMANTIC_CACHE_MAX_CONTEXTS,
+    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+)
+
+# Open collections are shared across messages instead of reloading the index each time.
+# Evicted Chroma handles are simply dropped: chromadb has no public way to close one
+# client without stopping every other client of the process.
+collection_registry = CollectionRegistry(
+    base_path=CHROMA_BASE_PATH,
+    opener=open_chroma_collection,
+    max_collections=CHROMA_POOL_MAX_COLLECTIONS,
+    max_bytes=CHROMA_POOL_MAX_BYTES,
+)
+
+# Collections served by the memory-mapped NumPy backend; only the part of a snapshot
+# that is scanned on every query counts towards the budget
+numpy_registry = CollectionRegistry(
+    base_path=CHROMA_BASE_PATH,
+    opener=open_numpy_collection,
+    closer=lambda store: store.close(),
+    max_collections=CHROMA_POOL_MAX_COLLECTIONS,
+    max_bytes=CHROMA_POOL_MAX_BYTES,
+    footprint=store_footprint,
+)
+
+
+def registry_for(vector_backend: str) -> CollectionRegistry:
+    return numpy_registry if vector_backend == "numpy" else collection_registry
 
 
-tokenizer = AutoTokenizer.from_pretrained(ENCODING_MODEL_NAME)
 def count_tokens(text: str) -> int:
-    return len(tokenizer.tokenize(text))
+    return len(get_tokenizer().tokenize(text))
+
+
+def count_tokens_batch(texts: list[str]) -> list[int]:
+    # One call through the fast (Rust) tokenizer instead of one tokenize() per text
+    encoded = get_tokenizer()(texts, add_special_tokens=False)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def backend_token_counts(response) -> Optional[tuple[int, int]]:
+    """
+    (prompt, completion) token counts reported by Ollama, when present. The prompt
+    count only covers tokens Ollama evaluated, see record_token_usage.
+    """
+    if response is None:
+        return None
+    prompt_tokens = response.get("prompt_eval_count")
+    completion_tokens = response.get("eval_count")
+    if prompt_tokens is None or completion_tokens is None:
+        return None
+    return prompt_tokens, completion_tokens
+
+
+def search_collection(collection_name: str, query_embedding: list[float], k: int = 3, vector_backend: str = "chroma"):
+    """
+    Runs a similarity search with an already computed query embedding and returns
+    (document, relevance score) pairs, same as `similarity_search_with_relevance_scores`.
+    Chroma and NumpyVectorStore handles expose the same two methods used here.
+    """
+    # The handle stays lent out (and open, even if evicted meanwhile) until the search is done
+    with registry_for(vector_backend).get(collection_name) as store:
+        docs_and_distances = store.similarity_search_by_vector_with_relevance_scores(query_embedding, k=k)
+        relevance_score_fn = store._select_relevance_score_fn()
+    return [(doc, relevance_score_fn(distance)) for doc, distance in docs_and_distances]
+
+
+async def embed_query(query_text: str) -> list[float]:
+    # Memory hits skip the embedding stage entirely
+    query_embedding = query_embedding_cache.get(query_text)
+    if query_embedding is not None:
+        return query_embedding
+
+    # Disk tier access is blocking and runs on its own small pool, away from the
+    # embedding workers; without a disk tier this only records the miss
+    has_disk_tier = bool(query_embedding_cache.disk_path)
+    if has_disk_tier:
+        query_embedding = await cache_io_stage.run(query_embedding_cache.load, query_text)
+    else:
+        query_embedding = query_embedding_cache.load(query_text)
+
+    if query_embedding is None:
+        # The cache is keyed on the normalized text, but the model sees the query as typed
+        query_embedding = await embedding_batcher.embed(query_text)
+        if has_disk_tier:
+            await cache_io_stage.run(query_embedding_cache.put, query_text, query_embedding)
+        else:
+            query_embedding_cache.put(query_text, query_embedding)
+    return query_embedding
+
+
+async def retrieve_context(collection_name: str, query_text: str, k: int = 3, vector_backend: str = "chroma"):
+    # Embedding and index lookup are blocking; each runs on its own stage
+    query_embedding = await embed_query(query_text)
+    results = await search_stage.run(search_collection, collection_name, query_embedding, k, vector_backend)
+    return query_embedding, results
+
+
+def chunk_ids(results) -> list[str]:
+    # Stored ids identify the chunks; fall back to a content hash when missing
+    return [
+        getattr(doc, "id", None) or hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+        for doc, _ in results
+    ]
+
+
+async def has_prior_messages(db: AsyncSession, conversation_id: UUID, message_id: UUID) -> bool:
+    """Whether the conversation has any message besides `message_id`."""
+    result = await db.execute(
+        select(Message.id)
+        .where(Message.conversation_id == conversation_id, Message.id != message_id)
+        .limit(1)
+    )
+    return result.first() is not None
 
 
 async def construct_llm_prompt(
@@ -53,33 +248,134 @@ async def construct_llm_prompt(
 
     return chat_history
 
+async def stream_llm_reply(
+    conversation_id: UUID,
+    message_id: UUID,
+    chat_prompt: list[dict[str, str]],
+    lease: Optional[JobLease] = None,
+) -> tuple[str, Optional[tuple[int, int]]]:
+    """
+    Streams the LLM reply over the WebSocket as start/delta frames and returns
+    the full text once generation has finished, along with the token counts
+    reported in the final chunk. With a job lease, every frame is only sent while
+    the lease still holds, so a job taken over by another worker is not streamed twice.
+    """
+    from app.websockets.manager import manager  # import here to avoid circular import
+
+    if lease:
+        lease.check()
+    await manager.send_message(conversation_id, {
+        "type": "start",
+        "id": str(message_id),
+        "conversation_id": str(conversation_id),
+        "role": "assistant",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    })
+
+    parts = []
+    token_counts = None
+    async for chunk in llm_chat_stream(chat_prompt):
+        if chunk.get('done'):
+            token_counts = backend_token_counts(chunk)
+        delta = chunk['message']['content']
+        if not delta:
+            continue
+        parts.append(delta)
+        if lease:
+            lease.check()
+        await manager.send_message(conversation_id, {
+            "type": "delta",
+            "id": str(message_id),
+            "conversation_id": str(conversation_id),
+            "content": delta,
+        })
+
+    return "".join(parts), token_counts
+
+
+async def record_token_usage(
+    db: AsyncSession,
+    user_id: UUID,
+    message_id: UUID,
+    vector_context_id: UUID,
+    input_text: str,
+    output_text: str,
+    token_counts: Optional[tuple[int, int]],
+):
+    # Prefer the completion count the LLM backend already computed; otherwise tokenize
+    # both texts in one batched call on the tokenizer stage.
+    if token_counts is None:
+        input_tokens, output_tokens = await tokenizer_stage.run(count_tokens_batch, [input_text, output_text])
+    else:
+        # Ollama's prompt_eval_count leaves out a prompt prefix it reused from its
+        # cache (e.g. the conversation history), so the prompt is counted locally
+        # and the backend figure only wins when it is larger (chat template tokens)
+        (local_input_tokens,) = await tokenizer_stage.run(count_tokens_batch, [input_text])
+        input_tokens = max(token_counts[0], local_input_tokens)
+        output_tokens = token_counts[1]
+
+    db.add(TokenUsage(
+        user_id=user_id,
+        message_id=message_id,
+        vector_context_id=vector_context_id,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+    ))
+    # Keep the hour/day rollups in step so usage queries never scan token_usage
+    await increment_usage_rollups(
+        db, user_id, vector_context_id, input_tokens, output_tokens, datetime.now(timezone.utc)
+    )
+    await db.commit()
+
+
 async def generate_llm_response(
     db: AsyncSession,
     user: User,
     conversation_id: UUID,
     user_message: Message,
     vector_context: VectorContext,
+    assistant_msg_id: Optional[UUID] = None,
+    lease: Optional[JobLease] = None,
 ):
-    try:
-        # Load Vector Store Collection
-        import os
-        chroma_path = os.path.join(CHROMA_BASE_PATH, vector_context.chroma_collection_name)
-        db_chroma = Chroma(
-            persist_directory=chroma_path,
-            collection_name=vector_context.chroma_collection_name,
-            embedding_function=embedding_function
-        )
+    from app.websockets.manager import manager  # import here to avoid circular import
 
+    assistant_msg_id = assistant_msg_id or uuid4()
+    chat_prompt = None
+    token_counts = None
+    answered_from_cache = False
+    try:
+        # Retrieve from the pooled vector store collection
         query_text = user_message.content
-        results = db_chroma.similarity_search_with_relevance_scores(query_text, k=3)
+        collection_name = vector_context.chroma_collection_name
+        vector_backend = getattr(vector_context, "vector_backend", None) or "chroma"
+        query_embedding, results = await retrieve_context(collection_name, query_text, k=3, vector_backend=vector_backend)
+
+        # The cache key has no conversation history, so only a conversation's first
+        # question may be answered from (or stored into) it
+        use_answer_cache = (
+            SEMANTIC_CACHE_ENABLED
+            and bool(results)
+            and not await has_prior_messages(db, conversation_id, user_message.id)
+        )
+        cached_answer = None
+        if use_answer_cache:
+            collection_version = registry_for(vector_backend).version(collection_name)
+            cached_answer = answer_cache.lookup(
+                vector_context.id, collection_version, query_embedding, chunk_ids(results)
+            )
 
         if len(results) == 0 or results[0][1] > 0.7:
             assistant_content = "I'm sorry, I couldn't find relevant context to answer your question."
             context_text = ""
+        elif cached_answer is not None:
+            # Near-duplicate question over the same retrieved context
+            assistant_content = cached_answer
+            answered_from_cache = True
         else:
             context_text = "\n\n---\n\n".join([doc.page_content for doc, _ in results])
 
             # Build prompt
+            from langchain.prompts import ChatPromptTemplate
             prompt = ChatPromptTemplate.from_template(PROMPT_TEMPLATE).format(
                 context=context_text, question=query_text
             )
@@ -92,48 +388,71 @@ async def generate_llm_response(
             )
 
             # Generate response using ollama
-            response = ollama.chat(
-                model=LLM_MODEL_NAME,
-                messages=chat_prompt,
-            )
+            if LLM_STREAMING:
+                assistant_content, token_counts = await stream_llm_reply(
+                    conversation_id, assistant_msg_id, chat_prompt, lease=lease
+                )
+            else:
+                response = await llm_chat(chat_prompt)
+                assistant_content = response['message']['content']
+                token_counts = backend_token_counts(response)
 
-            assistant_content = response['message']['content']
+            if use_answer_cache:
+                answer_cache.store(
+                    vector_context.id, collection_version, query_embedding, chunk_ids(results), assistant_content
+                )
 
-        # Save assistant message
+        # Save assistant message once the full reply is known
         assistant_msg = Message(
+            id=assistant_msg_id,
             conversation_id=conversation_id,
             role="assistant",
             content=assistant_content,
         )
         db.add(assistant_msg)
-        await db.flush()
-
-        # Token usage tracking
-        total_input_text = "\n".join([m["content"] for m in chat_prompt]) if results else query_text
-        input_tokens = count_tokens(total_input_text)
-        output_tokens = count_tokens(assistant_content)
-
-        usage = TokenUsage(
-            user_id=user.id,
-            message_id=assistant_msg.id,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-        )
-        db.add(usage)
+        await touch_conversation(db, conversation_id)
+        if lease:
+            # Only the worker still holding the job may save and announce the reply
+            await lease.guard(db)
         await db.commit()
 
-        # Send message over WebSocket
-        from app.websockets.manager import manager  # import here to avoid circular import
-        
-        await manager.send_message(conversation_id, {
+        # Send message over WebSocket (closes the stream when streaming)
+        payload = {
             "id": str(assistant_msg.id),
             "conversation_id": str(conversation_id),
             "role": "assistant",
             "content": assistant_content,
             "created_at": assistant_msg.created_at.isoformat()
-        })
+        }
+        if LLM_STREAMING:
+            payload = {"type": "end", **payload}
+
+        await manager.send_message(conversation_id, payload)
 
+    except LeaseLost:
+        # The worker that took the job over streams the reply; send nothing more
+        await db.rollback()
+        raise
     except Exception as e:
         print(f"Error in LLM response: {e}")
         await db.rollback()
-        raise
\ No newline at end of file
+        if LLM_STREAMING:
+            await manager.send_message(conversation_id, {
+                "type": "error",
+                "id": str(assistant_msg_id),
+                "conversation_id": str(conversation_id),
+            })
+        raise
+
+    # Token usage tracking happens after the reply has been delivered; a cached
+    # answer made no LLM call, so there is nothing to bill
+    if answered_from_cache:
+        return
+    try:
+        total_input_text = "\n".join([m["content"] for m in chat_prompt]) if chat_prompt else query_text
+        await record_token_usage(
+            db, user.id, assistant_msg.id, vector_context.id, total_input_text, assistant_content, token_counts
+        )
+    except Exception as e:
+        print(f"Error recording token usage: {e}")
+        await db.rollback()
@@ -0,0 +1,24 @@
+# backend/app/core/pagination.py
+
+import base64
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+# Keyset pagination cursors are opaque to clients: base64("<timestamp>|<id>")
+
+
+def encode_cursor(timestamp: datetime, id_: UUID) -> str:
+    raw = f"{timestamp.isoformat()}|{id_}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, id_ = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), UUID(id_)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
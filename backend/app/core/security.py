@@ -1,7 +1,9 @@
 # backend/app/core/security.py
 
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import asyncio
 from jose import jwt
 import os
 from dotenv import load_dotenv
@@ -17,11 +19,93 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
 
+# Authenticated user cache, and whether read-only endpoints may trust token claims
+USER_CACHE_TTL_SECONDS=float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES=int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+AUTH_TRUST_TOKEN_CLAIMS=os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+# Users allowed to read /api/stats (comma-separated emails); empty lets any signed-in user
+STATS_ADMIN_EMAILS={e.strip().lower() for e in os.getenv("STATS_ADMIN_EMAILS", "").split(",") if e.strip()}
+
+# Password hashing pool (calls beyond workers + queue are rejected right away)
+PASSWORD_HASH_WORKERS=int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
 # Environment-based LLM related variables
 CHROMA_BASE_PATH=Path(os.getenv("CHROMA_BASE_PATH")).resolve()
 EMBEDDING_MODEL_NAME=os.getenv("EMBEDDING_MODEL_NAME")
 ENCODING_MODEL_NAME=os.getenv("ENCODING_MODEL_NAME")
 LLM_MODEL_NAME=os.getenv("LLM_MODEL_NAME")
+# Stream assistant replies over the WebSocket as start/delta/end frames
+LLM_STREAMING=os.getenv("LLM_STREAMING", "true").lower() == "true"
+
+# Vector store collection pool (0 disables size-based eviction)
+CHROMA_POOL_MAX_COLLECTIONS=int(os.getenv("CHROMA_POOL_MAX_COLLECTIONS", "8"))
+CHROMA_POOL_MAX_BYTES=int(os.getenv("CHROMA_POOL_MAX_BYTES", "0"))
+# Upper bound on how long the in-memory vector context catalog is trusted
+CONTEXT_CATALOG_TTL_SECONDS=float(os.getenv("CONTEXT_CATALOG_TTL_SECONDS", "300"))
+
+# Inference execution limits (worker threads / concurrent calls per stage)
+LLM_MAX_CONCURRENCY=int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+EMBEDDING_WORKERS=int(os.getenv("EMBEDDING_WORKERS", "2"))
+EMBEDDING_MAX_CONCURRENCY=int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+TOKENIZER_WORKERS=int(os.getenv("TOKENIZER_WORKERS", "2"))
+TOKENIZER_MAX_CONCURRENCY=int(os.getenv("TOKENIZER_MAX_CONCURRENCY", "4"))
+SEARCH_WORKERS=int(os.getenv("SEARCH_WORKERS", "4"))
+SEARCH_MAX_CONCURRENCY=int(os.getenv("SEARCH_MAX_CONCURRENCY", "8"))
+EMBEDDING_BATCH_MAX_SIZE=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "16"))
+EMBEDDING_BATCH_MAX_WAIT_MS=float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+# Query embedding cache (empty path disables the on-disk tier)
+EMBEDDING_CACHE_SIZE=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+EMBEDDING_CACHE_TTL_SECONDS=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "86400"))
+EMBEDDING_CACHE_PATH=os.getenv("EMBEDDING_CACHE_PATH", "")
+EMBEDDING_CACHE_IO_WORKERS=int(os.getenv("EMBEDDING_CACHE_IO_WORKERS", "1"))
+
+# Startup warm-up (the app reports ready on /ready once it is done)
+WARMUP_ENABLED=os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_LLM=os.getenv("WARMUP_LLM", "true").lower() == "true"
+WARMUP_MAX_COLLECTIONS=int(os.getenv("WARMUP_MAX_COLLECTIONS", "4"))
+# Failed required phases are retried with exponential backoff up to this delay
+WARMUP_RETRY_INITIAL_SECONDS=float(os.getenv("WARMUP_RETRY_INITIAL_SECONDS", "2"))
+WARMUP_RETRY_MAX_SECONDS=float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "60"))
+
+# Generation job queue. With GENERATION_WORKER_IN_PROCESS the API process runs a
+# worker itself; otherwise run `python -m app.jobs.worker` next to the API.
+GENERATION_WORKER_IN_PROCESS=os.getenv("GENERATION_WORKER_IN_PROCESS", "true").lower() == "true"
+GENERATION_WORKER_CONCURRENCY=int(os.getenv("GENERATION_WORKER_CONCURRENCY", str(LLM_MAX_CONCURRENCY)))
+GENERATION_WORKER_POLL_SECONDS=float(os.getenv("GENERATION_WORKER_POLL_SECONDS", "1"))
+GENERATION_JOB_MAX_ATTEMPTS=int(os.getenv("GENERATION_JOB_MAX_ATTEMPTS", "3"))
+GENERATION_JOB_RETRY_BACKOFF_SECONDS=float(os.getenv("GENERATION_JOB_RETRY_BACKOFF_SECONDS", "5"))
+GENERATION_JOB_LEASE_SECONDS=float(os.getenv("GENERATION_JOB_LEASE_SECONDS", "300"))
+GENERATION_QUEUE_MAX_DEPTH=int(os.getenv("GENERATION_QUEUE_MAX_DEPTH", "100"))
+
+# WebSocket fan-out across API processes: memory (single process), postgres or redis.
+# Delta frames are coalesced for up to WS_BATCH_MAX_WAIT_MS before being published.
+WS_BROKER=os.getenv("WS_BROKER", "memory").lower()
+WS_REDIS_URL=os.getenv("WS_REDIS_URL", "redis://localhost:6379/0")
+WS_BATCH_MAX_WAIT_MS=float(os.getenv("WS_BATCH_MAX_WAIT_MS", "20"))
+WS_BATCH_MAX_FRAMES=int(os.getenv("WS_BATCH_MAX_FRAMES", "32"))
+# Per-connection outbound queue; when it is full deltas are dropped ("drop_deltas")
+# or the client is disconnected ("disconnect")
+WS_SEND_QUEUE_SIZE=int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+WS_SLOW_CONSUMER_POLICY=os.getenv("WS_SLOW_CONSUMER_POLICY", "drop_deltas").lower()
+WS_SEND_TIMEOUT_SECONDS=float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+# Idle connections get a ping this often; clients silent for the timeout are closed
+WS_HEARTBEAT_SECONDS=float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+WS_HEARTBEAT_TIMEOUT_SECONDS=float(os.getenv("WS_HEARTBEAT_TIMEOUT_SECONDS", "60"))
+# Resumable delivery: frames kept per conversation, how long a conversation stays
+# logged after its last client left, and the cap on messages replayed from the DB
+WS_EVENT_LOG_MAX_EVENTS=int(os.getenv("WS_EVENT_LOG_MAX_EVENTS", "512"))
+WS_RESUME_WINDOW_SECONDS=float(os.getenv("WS_RESUME_WINDOW_SECONDS", "120"))
+WS_REPLAY_MAX_MESSAGES=int(os.getenv("WS_REPLAY_MAX_MESSAGES", "50"))
+
+# Semantic answer cache, opt-in (TTL of 0 keeps answers until evicted or re-ingested;
+# SEMANTIC_CACHE_MAX_ENTRIES=0 stops storing answers)
+SEMANTIC_CACHE_ENABLED=os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MAX_ENTRIES=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "256"))
+SEMANTIC_CACHE_MAX_CONTEXTS=int(os.getenv("SEMANTIC_CACHE_MAX_CONTEXTS", "64"))
+SEMANTIC_CACHE_TTL_SECONDS=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "0"))
 
 
 def hash_password(password: str) -> str:
@@ -30,6 +114,60 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated bounded thread pool so hashing never blocks the event
+    loop. Once `max_workers + max_queue` calls are pending, new calls fail fast with
+    `PasswordHasherBusy` instead of queueing behind a login burst.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
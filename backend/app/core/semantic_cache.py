@@ -0,0 +1,170 @@
+# backend/app/core/semantic_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class _CachedAnswer:
+    embedding: np.ndarray
+    chunk_ids: tuple
+    answer: str
+    stored_at: float
+    hits: int = 0
+
+
+class _ContextAnswers:
+    def __init__(self, collection_version: int):
+        self.collection_version = collection_version
+        self.entries: List[_CachedAnswer] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def matrix(self) -> np.ndarray:
+        # Stacked lazily so lookups are a single matrix-vector product
+        if self._matrix is None:
+            self._matrix = np.stack([entry.embedding for entry in self.entries])
+        return self._matrix
+
+    def add(self, entry: _CachedAnswer, max_entries: int):
+        self.entries.append(entry)
+        if len(self.entries) > max_entries:
+            # Drop the least useful entry: fewest hits, then oldest
+            victim = min(range(len(self.entries) - 1), key=lambda i: (self.entries[i].hits, self.entries[i].stored_at))
+            self.entries.pop(victim)
+        self._matrix = None
+
+    def remove(self, index: int):
+        self.entries.pop(index)
+        self._matrix = None
+
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+class SemanticAnswerCache:
+    """
+    Per vector context cache of generated answers.
+
+    A cached answer is served when a new query embedding is within `threshold`
+    cosine similarity of a stored one *and* retrieval returned the same chunks,
+    so the answer was produced from identical context. Entries are tied to the
+    collection version and dropped automatically once the collection is re-ingested.
+    Conversation history is not part of the key, so callers only use it for the
+    first question of a conversation; it suits FAQ-style collections.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries_per_context: int = 256,
+        max_contexts: int = 64,
+        ttl_seconds: float = 0,
+    ):
+        self.threshold = threshold
+        self.max_entries_per_context = max_entries_per_context
+        self.max_contexts = max_contexts
+        self.ttl_seconds = ttl_seconds
+        self._contexts: "OrderedDict[Any, _ContextAnswers]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _context(self, context_key: Any, collection_version: int, create: bool) -> Optional[_ContextAnswers]:
+        answers = self._contexts.get(context_key)
+        if answers is not None and answers.collection_version != collection_version:
+            # Collection was re-ingested since these answers were cached
+            self._contexts.pop(context_key, None)
+            answers = None
+        if answers is None and create:
+            answers = self._contexts[context_key] = _ContextAnswers(collection_version)
+            while len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+        if answers is not None:
+            self._contexts.move_to_end(context_key)
+        return answers
+
+    def lookup(
+        self,
+        context_key: Any,
+        collection_version: int,
+        query_embedding: Sequence[float],
+        chunk_ids: Sequence[str],
+    ) -> Optional[str]:
+        query = _normalize(query_embedding)
+        chunk_ids = tuple(chunk_ids)
+
+        with self._lock:
+            answers = self._context(context_key, collection_version, create=False)
+            if not answers or not answers.entries:
+                self.misses += 1
+                return None
+
+            similarities = answers.matrix() @ query
+            expired = []
+            answer = None
+            for index in np.argsort(-similarities):
+                if similarities[index] < self.threshold:
+                    break
+                entry = answers.entries[index]
+                if self.ttl_seconds and time.time() - entry.stored_at > self.ttl_seconds:
+                    expired.append(int(index))
+                    continue
+                if entry.chunk_ids == chunk_ids:
+                    entry.hits += 1
+                    answer = entry.answer
+                    break
+            # Removed after the scan so the indices above stay valid
+            for index in sorted(expired, reverse=True):
+                answers.remove(index)
+
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return answer
+
+    def store(
+        self,
+        context_key: Any,
+        collection_version: int,
+        query_embedding: Sequence[float],
+        chunk_ids: Sequence[str],
+        answer: str,
+    ):
+        if self.max_entries_per_context <= 0:
+            return
+        entry = _CachedAnswer(
+            embedding=_normalize(query_embedding),
+            chunk_ids=tuple(chunk_ids),
+            answer=answer,
+            stored_at=time.time(),
+        )
+        with self._lock:
+            answers = self._context(context_key, collection_version, create=True)
+            answers.add(entry, self.max_entries_per_context)
+
+    def invalidate(self, context_key: Any = None):
+        with self._lock:
+            if context_key is None:
+                self._contexts.clear()
+            else:
+                self._contexts.pop(context_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "threshold": self.threshold,
+            "contexts": len(self._contexts),
+            "entries": sum(len(answers.entries) for answers in self._contexts.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,88 @@
+# backend/app/core/user_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+
+from app.db.models import User
+
+
+def _detached_copy(user: User) -> User:
+    # A plain copy that belongs to no session, so a rollback or close in the
+    # request that loaded it can't expire the cached attributes.
+    return User(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        hashed_password=user.hashed_password,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+
+
+class UserCache:
+    """
+    Short-TTL, bounded cache of authenticated users keyed by user id. Every lookup
+    hands out its own detached copy, so concurrent requests never share (or mutate)
+    one instance.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+        return _detached_copy(entry[1])
+
+    def put(self, user: User) -> User:
+        with self._lock:
+            self._entries[str(user.id)] = (time.monotonic(), _detached_copy(user))
+            self._entries.move_to_end(str(user.id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return _detached_copy(user)
+
+    def invalidate(self, user_id: Optional[Any] = None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(user_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def register_invalidation_hooks(cache: UserCache):
+    """Drops cached users whenever this process updates or deletes them through the ORM."""
+
+    @event.listens_for(User, "after_update")
+    def _on_update(mapper, connection, target):
+        cache.invalidate(target.id)
+
+    @event.listens_for(User, "after_delete")
+    def _on_delete(mapper, connection, target):
+        cache.invalidate(target.id)
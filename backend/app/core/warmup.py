@@ -0,0 +1,121 @@
+# backend/app/core/warmup.py
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+
+from app.core.security import (
+    WARMUP_LLM, WARMUP_MAX_COLLECTIONS, LLM_MODEL_NAME,
+    WARMUP_RETRY_INITIAL_SECONDS, WARMUP_RETRY_MAX_SECONDS,
+)
+from app.core.inference import embedding_stage, search_stage, tokenizer_stage, llm_stage, get_llm_client
+from app.core import llm_responder
+from app.db.database import AsyncSessionLocal
+from app.db.models import VectorContext
+
+
+class Readiness:
+    """Tracks the startup warm-up phases behind the /ready endpoint."""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.attempts = 0
+        self.next_retry_at: Optional[float] = None
+        self.phases: Dict[str, Any] = {}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "attempts": self.attempts,
+            "next_retry_at": self.next_retry_at,
+            "phases": self.phases,
+        }
+
+
+readiness = Readiness()
+
+
+async def _phase(name: str, coro, required: bool = True):
+    started = time.perf_counter()
+    try:
+        result = await coro
+        readiness.phases[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3)}
+        return result
+    except Exception as e:
+        readiness.phases[name] = {"ok": False, "error": repr(e)}
+        print(f"⚠️ Warm-up phase '{name}' failed: {e}")
+        if required:
+            raise
+
+
+def _search_hot_collection(collection_name: str, vector_backend: str, query_embedding: list[float]):
+    # A real query pages the index in, not just opening the handle
+    llm_responder.search_collection(collection_name, query_embedding, k=1, vector_backend=vector_backend)
+
+
+async def _warm_collections(query_embedding: list[float]):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(VectorContext.chroma_collection_name, VectorContext.vector_backend)
+            .order_by(VectorContext.created_at.desc())
+            .limit(WARMUP_MAX_COLLECTIONS)
+        )
+        collections = result.all()
+
+    for collection_name, vector_backend in collections:
+        await search_stage.run(_search_hot_collection, collection_name, vector_backend, query_embedding)
+
+
+async def _warm_llm():
+    # Loads the model into the Ollama server; a single token is enough
+    async with llm_stage.slot():
+        await get_llm_client().chat(
+            model=LLM_MODEL_NAME,
+            messages=[{"role": "user", "content": "Hello"}],
+            options={"num_predict": 1},
+        )
+
+
+async def _warm_required() -> list[float]:
+    query_embedding = await _phase("embedding_model", embedding_stage.run(
+        lambda: llm_responder.embed_queries(["warm up"])[0]
+    ))
+    await _phase("tokenizer", tokenizer_stage.run(llm_responder.count_tokens, "warm up"))
+    return query_embedding
+
+
+async def warm_up():
+    """
+    Loads the embedding model and tokenizer, opens the most recent collections and
+    makes a dummy LLM call. The app reports ready once the required phases are done;
+    those are retried with exponential backoff until they succeed, while collection
+    and LLM warm-up failures are recorded but don't block readiness.
+    """
+    readiness.started_at = time.time()
+    print("🔥 Warming up models...")
+    delay = WARMUP_RETRY_INITIAL_SECONDS
+    while True:
+        readiness.attempts += 1
+        try:
+            query_embedding = await _warm_required()
+            break
+        except Exception:
+            readiness.next_retry_at = time.time() + delay
+            print(f"🔁 Retrying warm-up in {delay:.0f}s (attempt {readiness.attempts} failed)")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+    readiness.next_retry_at = None
+
+    await _phase("collections", _warm_collections(query_embedding), required=False)
+    if WARMUP_LLM:
+        await _phase("llm", _warm_llm(), required=False)
+
+    readiness.ready = True
+    readiness.finished_at = time.time()
+    print(f"✅ Warm-up finished in {readiness.finished_at - readiness.started_at:.1f}s")
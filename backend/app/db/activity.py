@@ -0,0 +1,23 @@
+# backend/app/db/activity.py
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Conversation
+
+
+async def touch_conversation(db: AsyncSession, conversation_id: UUID, at: Optional[datetime] = None):
+    """
+    Records a new message in `conversations.last_message_at` (the conversation list's
+    sort key). Runs in the caller's transaction, so it commits with the message;
+    without `at` the transaction timestamp is used, same as the message's default.
+    """
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(last_message_at=at if at is not None else func.now())
+    )
@@ -1,7 +1,7 @@
 # backend/app/models.py
 
 from sqlalchemy import (
-    Column, String, Text, ForeignKey, Integer, DateTime, Enum, func
+    Column, String, Text, ForeignKey, Integer, BigInteger, DateTime, Enum, Index, UniqueConstraint, func
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declarative_base
@@ -16,6 +16,13 @@ class RoleEnum(str, enum.Enum):
     assistant = "assistant"
 
 
+class JobStatusEnum(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -36,6 +43,8 @@ class VectorContext(Base):
     name = Column(Text, nullable=False)
     description = Column(Text)
     chroma_collection_name = Column(Text, unique=True, nullable=False)
+    # Retrieval backend: "chroma", or "numpy" for the memory-mapped exact-search snapshot
+    vector_backend = Column(String(16), nullable=False, default="chroma", server_default="chroma")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     conversations = relationship("Conversation", back_populates="vector_context")
@@ -50,11 +59,19 @@ class Conversation(Base):
     title = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Time of the latest message (creation time until the first one); kept up to date
+    # by touch_conversation so listing by activity is an index range scan
+    last_message_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     user = relationship("User", back_populates="conversations")
     vector_context = relationship("VectorContext", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Per-user conversation listing by recent activity (keyset paginated)
+        Index("ix_conversations_user_last_message_id", "user_id", "last_message_at", "id"),
+    )
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -71,6 +88,11 @@ class Message(Base):
     conversation = relationship("Conversation", back_populates="messages")
     token_usage = relationship("TokenUsage", uselist=False, back_populates="message", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of a conversation's history
+        Index("ix_messages_conversation_created_id", "conversation_id", "created_at", "id"),
+    )
+
 
 class TokenUsage(Base):
     __tablename__ = "token_usage"
@@ -78,8 +100,63 @@ class TokenUsage(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id", ondelete="CASCADE"), nullable=False, unique=True)
+    vector_context_id = Column(UUID(as_uuid=True), ForeignKey("vector_contexts.id"), nullable=True)
     input_tokens = Column(Integer, nullable=False)
     output_tokens = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    message = relationship("Message", back_populates="token_usage")
\ No newline at end of file
+    message = relationship("Message", back_populates="token_usage")
+
+    __table_args__ = (
+        Index("ix_token_usage_user_created", "user_id", "created_at"),
+        Index("ix_token_usage_created", "created_at"),
+    )
+
+
+class TokenUsageRollup(Base):
+    """Token usage pre-aggregated per user, vector context and hour/day bucket (UTC)."""
+    __tablename__ = "token_usage_rollups"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    vector_context_id = Column(UUID(as_uuid=True), ForeignKey("vector_contexts.id", ondelete="CASCADE"), nullable=False)
+    granularity = Column(String(8), nullable=False)  # "hour" or "day"
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    input_tokens = Column(BigInteger, nullable=False, default=0)
+    output_tokens = Column(BigInteger, nullable=False, default=0)
+    message_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "granularity", "bucket_start", "vector_context_id",
+            name="uq_token_usage_rollups_bucket",
+        ),
+        Index("ix_token_usage_rollups_context_bucket", "vector_context_id", "granularity", "bucket_start"),
+    )
+
+
+class GenerationJob(Base):
+    """A queued assistant reply; claimed and run by the generation workers."""
+    __tablename__ = "generation_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False)
+    vector_context_id = Column(UUID(as_uuid=True), ForeignKey("vector_contexts.id"), nullable=False)
+    user_message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id", ondelete="CASCADE"), nullable=False)
+    # Allocated up front so a retried job never produces a second reply
+    assistant_message_id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
+    status = Column(Enum(JobStatusEnum), nullable=False, default=JobStatusEnum.queued)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    last_error = Column(Text, nullable=True)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_by = Column(Text, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Claim order for workers
+        Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+    )
@@ -0,0 +1,60 @@
+# backend/app/db/rollups.py
+
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import TokenUsageRollup
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _insert_for(db: AsyncSession):
+    # Both supported backends have INSERT ... ON CONFLICT DO UPDATE
+    if db.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
+async def increment_usage_rollups(
+    db: AsyncSession,
+    user_id: UUID,
+    vector_context_id: UUID,
+    input_tokens: int,
+    output_tokens: int,
+    at: datetime,
+):
+    """
+    Adds one message's usage to its hour and day buckets with atomic upserts.
+    Runs in the caller's transaction, so rollups commit together with the TokenUsage row.
+    """
+    insert = _insert_for(db)
+    for granularity in ROLLUP_GRANULARITIES:
+        stmt = insert(TokenUsageRollup).values(
+            id=uuid4(),
+            user_id=user_id,
+            vector_context_id=vector_context_id,
+            granularity=granularity,
+            bucket_start=bucket_start(at, granularity),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            message_count=1,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "granularity", "bucket_start", "vector_context_id"],
+            set_={
+                "input_tokens": TokenUsageRollup.input_tokens + stmt.excluded.input_tokens,
+                "output_tokens": TokenUsageRollup.output_tokens + stmt.excluded.output_tokens,
+                "message_count": TokenUsageRollup.message_count + stmt.excluded.message_count,
+            },
+        )
+        await db.execute(stmt)
@@ -0,0 +1,249 @@
+# backend/app/jobs/queue.py
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, insert, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.security import (
+    GENERATION_JOB_MAX_ATTEMPTS, GENERATION_JOB_RETRY_BACKOFF_SECONDS,
+    GENERATION_JOB_LEASE_SECONDS, GENERATION_QUEUE_MAX_DEPTH,
+)
+from app.db.models import GenerationJob, JobStatusEnum
+
+# How long a queue depth reading is reused for backpressure decisions
+DEPTH_CACHE_SECONDS = 1.0
+
+
+class QueueFull(Exception):
+    """Raised when the generation queue is deeper than GENERATION_QUEUE_MAX_DEPTH."""
+
+
+class LeaseLost(Exception):
+    """The worker no longer owns the job: its lease expired and may have been taken over."""
+
+
+class _DepthGauge:
+    # Counting queued jobs on every submission would cost a round trip each time
+    def __init__(self):
+        self.value = 0
+        self.read_at = 0.0
+
+    async def read(self, db: AsyncSession) -> int:
+        if time.monotonic() - self.read_at > DEPTH_CACHE_SECONDS:
+            result = await db.execute(
+                select(func.count()).select_from(GenerationJob)
+                .where(GenerationJob.status == JobStatusEnum.queued)
+            )
+            self.value = result.scalar_one()
+            self.read_at = time.monotonic()
+        return self.value
+
+
+_depth = _DepthGauge()
+
+# Wakes up a worker running in this process as soon as a job is enqueued
+job_available = asyncio.Event()
+
+
+async def enqueue_generation(
+    db: AsyncSession,
+    user_id: UUID,
+    conversation_id: UUID,
+    vector_context_id: UUID,
+    user_message_id: UUID,
+) -> UUID:
+    """
+    Adds a generation job to the caller's transaction; it becomes visible to workers
+    when the caller commits, together with the user message. Raises `QueueFull`
+    when the queue is too deep to accept more work.
+    """
+    if GENERATION_QUEUE_MAX_DEPTH and await _depth.read(db) >= GENERATION_QUEUE_MAX_DEPTH:
+        raise QueueFull()
+
+    job_id = uuid4()
+    await db.execute(
+        insert(GenerationJob).values(
+            id=job_id,
+            user_id=user_id,
+            conversation_id=conversation_id,
+            vector_context_id=vector_context_id,
+            user_message_id=user_message_id,
+            assistant_message_id=uuid4(),
+            status=JobStatusEnum.queued,
+            attempts=0,
+            max_attempts=GENERATION_JOB_MAX_ATTEMPTS,
+        )
+    )
+    _depth.value += 1
+    return job_id
+
+
+def notify_job_available():
+    job_available.set()
+
+
+async def claim_next_job(db: AsyncSession, worker_id: str) -> Optional[GenerationJob]:
+    """
+    Claims the oldest runnable job: queued and due, or running with an expired lease
+    (its worker died). Postgres skips rows locked by concurrent claimers; on SQLite
+    the compare-and-set update below is enough since writes are serialized.
+    """
+    now = datetime.now(timezone.utc)
+    lease_expired = now - timedelta(seconds=GENERATION_JOB_LEASE_SECONDS)
+    runnable = or_(
+        (GenerationJob.status == JobStatusEnum.queued) & (GenerationJob.run_after <= now),
+        (GenerationJob.status == JobStatusEnum.running) & (GenerationJob.locked_at < lease_expired),
+    )
+
+    result = await db.execute(
+        select(GenerationJob.id, GenerationJob.status, GenerationJob.locked_at)
+        .where(runnable)
+        .order_by(GenerationJob.run_after, GenerationJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    candidate = result.one_or_none()
+    if candidate is None:
+        await db.commit()
+        return None
+
+    claimed = await db.execute(
+        update(GenerationJob)
+        .where(
+            GenerationJob.id == candidate.id,
+            GenerationJob.status == candidate.status,
+            # Unchanged lock means nobody claimed it in between
+            GenerationJob.locked_at.is_(None) if candidate.locked_at is None
+            else GenerationJob.locked_at == candidate.locked_at,
+        )
+        .values(
+            status=JobStatusEnum.running,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=GenerationJob.attempts + 1,
+        )
+        .returning(GenerationJob)
+        # A session that already loaded the job gets the claimed row, not its stale copy
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    job = claimed.scalar_one_or_none()
+    await db.commit()
+    return job
+
+
+async def renew_lease(db: AsyncSession, job_id: UUID, worker_id: str) -> bool:
+    """Extends the lease; False when the job is no longer running under this worker."""
+    result = await db.execute(
+        update(GenerationJob)
+        .where(
+            GenerationJob.id == job_id,
+            GenerationJob.status == JobStatusEnum.running,
+            GenerationJob.locked_by == worker_id,
+        )
+        .values(locked_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+class JobLease:
+    """
+    A worker's ownership of a claimed job, renewed by its heartbeat.
+
+    `check()` costs nothing and is meant for every streamed frame: it fails once a
+    renewal found the job taken over, or when no renewal succeeded for
+    `LEASE_SAFETY_FRACTION` of the lease (a stalled event loop can't tell whether
+    another worker already claimed the job). `guard(db)` confirms ownership in the
+    caller's transaction, so the reply is only saved if the lease still holds.
+    """
+
+    LEASE_SAFETY_FRACTION = 2 / 3
+
+    def __init__(self, job_id: UUID, worker_id: str, lease_seconds: float = GENERATION_JOB_LEASE_SECONDS):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.renewed_at = time.monotonic()
+        self.lost = False
+
+    def check(self):
+        if not self.lost and time.monotonic() - self.renewed_at > self.lease_seconds * self.LEASE_SAFETY_FRACTION:
+            self.lost = True
+        if self.lost:
+            raise LeaseLost(f"lease of job {self.job_id} lost by {self.worker_id}")
+
+    async def renew(self, db: AsyncSession) -> bool:
+        if self.lost:
+            return False
+        renewed_at = time.monotonic()
+        if await renew_lease(db, self.job_id, self.worker_id):
+            self.renewed_at = renewed_at
+            return True
+        self.lost = True
+        return False
+
+    async def guard(self, db: AsyncSession):
+        """
+        Touches the job row in the caller's open transaction (not committed here);
+        raises LeaseLost when it's gone. The row lock makes a concurrent claim wait
+        for the caller's commit, after which its compare-and-set no longer matches.
+        """
+        self.check()
+        result = await db.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.id == self.job_id,
+                GenerationJob.status == JobStatusEnum.running,
+                GenerationJob.locked_by == self.worker_id,
+            )
+            .values(locked_at=datetime.now(timezone.utc))
+        )
+        if result.rowcount == 0:
+            self.lost = True
+            raise LeaseLost(f"job {self.job_id} was claimed by another worker")
+
+
+def _owned(job_id: UUID, worker_id: str):
+    return (GenerationJob.id == job_id) & (GenerationJob.locked_by == worker_id)
+
+
+async def complete_job(db: AsyncSession, job_id: UUID, worker_id: str) -> bool:
+    result = await db.execute(
+        update(GenerationJob)
+        .where(_owned(job_id, worker_id))
+        .values(status=JobStatusEnum.succeeded, locked_by=None, locked_at=None, last_error=None)
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def release_job(db: AsyncSession, job_id: UUID, worker_id: str):
+    """Hands an interrupted job back to the queue without counting the attempt."""
+    await db.execute(
+        update(GenerationJob)
+        .where(_owned(job_id, worker_id), GenerationJob.status == JobStatusEnum.running)
+        .values(status=JobStatusEnum.queued, locked_by=None, locked_at=None, attempts=GenerationJob.attempts - 1)
+    )
+    await db.commit()
+
+
+async def fail_job(db: AsyncSession, job: GenerationJob, worker_id: str, error: str, retry: bool = True) -> bool:
+    """
+    Re-queues the job with exponential backoff, or marks it failed once out of
+    attempts. Does nothing (returns False) when the job was taken over meanwhile.
+    """
+    values = {"locked_by": None, "locked_at": None, "last_error": error[:2000]}
+    if retry and job.attempts < job.max_attempts:
+        delay = GENERATION_JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        values.update(status=JobStatusEnum.queued, run_after=datetime.now(timezone.utc) + timedelta(seconds=delay))
+    else:
+        values.update(status=JobStatusEnum.failed)
+    result = await db.execute(update(GenerationJob).where(_owned(job.id, worker_id)).values(**values))
+    await db.commit()
+    return result.rowcount > 0
@@ -0,0 +1,201 @@
+# backend/app/jobs/worker.py
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+from typing import Any, Dict, Optional, Set
+from uuid import uuid4
+
+from app.core.dependencies import vector_context_catalog
+from app.core.inference import shutdown_inference
+from app.core.llm_responder import generate_llm_response
+from app.core.security import (
+    GENERATION_WORKER_CONCURRENCY, GENERATION_WORKER_POLL_SECONDS, GENERATION_JOB_LEASE_SECONDS,
+)
+from app.db.database import AsyncSessionLocal
+from app.db.models import GenerationJob, Message, User
+from app.websockets.manager import manager
+from app.jobs.queue import (
+    JobLease, LeaseLost, claim_next_job, complete_job, fail_job, release_job, job_available,
+)
+
+
+class JobAbandoned(Exception):
+    """The job can never succeed (its conversation, user or context is gone)."""
+
+
+async def run_generation_job(db, job: GenerationJob, lease: Optional[JobLease] = None):
+    # An earlier attempt may have saved the reply and died before completing the job
+    if await db.get(Message, job.assistant_message_id):
+        return
+
+    user = await db.get(User, job.user_id)
+    user_message = await db.get(Message, job.user_message_id)
+    vector_context = await vector_context_catalog.get(db, job.vector_context_id)
+    if not user or not user_message or not vector_context:
+        raise JobAbandoned("user, message or vector context no longer exists")
+
+    await generate_llm_response(
+        db=db,
+        user=user,
+        conversation_id=job.conversation_id,
+        user_message=user_message,
+        vector_context=vector_context,
+        assistant_msg_id=job.assistant_message_id,
+        lease=lease,
+    )
+
+
+class GenerationWorker:
+    """
+    Claims generation jobs from the database and runs up to `concurrency` of them at
+    once, each with its own session. A running job's lease is renewed while it runs;
+    jobs of a worker that died are picked up again once their lease expires. A job
+    whose lease lapsed (e.g. a stalled loop) stops streaming and is left to whichever
+    worker claimed it since.
+    """
+
+    def __init__(self, concurrency: int = GENERATION_WORKER_CONCURRENCY, poll_seconds: float = GENERATION_WORKER_POLL_SECONDS):
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.lease_lost = 0
+
+    async def run(self):
+        print(f"🛠️ Generation worker {self.worker_id} started (concurrency {self.concurrency})")
+        while not self._stopping:
+            await self._slots.acquire()
+            if self._stopping:
+                self._slots.release()
+                break
+
+            # Cleared before claiming so an enqueue during the claim is not missed
+            job_available.clear()
+            job: Optional[GenerationJob] = None
+            try:
+                async with AsyncSessionLocal() as db:
+                    job = await claim_next_job(db, self.worker_id)
+            except Exception as e:
+                print(f"⚠️ Failed to claim generation job: {e}")
+
+            if job is None:
+                self._slots.release()
+                try:
+                    await asyncio.wait_for(job_available.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._process(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _heartbeat(self, lease: JobLease):
+        while True:
+            await asyncio.sleep(lease.lease_seconds / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    if not await lease.renew(db):
+                        print(f"⚠️ Lost the lease of job {lease.job_id}")
+                        return
+            except Exception as e:
+                print(f"⚠️ Failed to renew lease of job {lease.job_id}: {e}")
+
+    async def _process(self, job: GenerationJob):
+        lease = JobLease(job.id, self.worker_id, GENERATION_JOB_LEASE_SECONDS)
+        heartbeat = asyncio.create_task(self._heartbeat(lease))
+        try:
+            async with AsyncSessionLocal() as db:
+                try:
+                    await run_generation_job(db, job, lease)
+                except asyncio.CancelledError:
+                    await db.rollback()
+                    await release_job(db, job.id, self.worker_id)
+                    raise
+                except LeaseLost as e:
+                    # Another worker owns the job now; its outcome is theirs to record
+                    await db.rollback()
+                    self.lease_lost += 1
+                    print(f"⚠️ Abandoned generation job {job.id}: {e}")
+                except Exception as e:
+                    await db.rollback()
+                    retry = not isinstance(e, JobAbandoned)
+                    if not await fail_job(db, job, self.worker_id, repr(e), retry=retry):
+                        self.lease_lost += 1
+                    elif retry and job.attempts < job.max_attempts:
+                        self.retried += 1
+                    else:
+                        self.failed += 1
+                    print(f"⚠️ Generation job {job.id} failed (attempt {job.attempts}/{job.max_attempts}): {e}")
+                else:
+                    if await complete_job(db, job.id, self.worker_id):
+                        self.succeeded += 1
+                    else:
+                        self.lease_lost += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The job row could not be updated; its lease will expire and it is retried
+            print(f"⚠️ Failed to record outcome of generation job {job.id}: {e}")
+        finally:
+            heartbeat.cancel()
+            self._slots.release()
+
+    async def stop(self, timeout: float = 30):
+        """Stops claiming, waits for running jobs and hands back those still running."""
+        self._stopping = True
+        job_available.set()
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": len(self._tasks),
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "lease_lost": self.lease_lost,
+        }
+
+
+async def main(concurrency: int):
+    # Frames are published to the API process holding each conversation's socket
+    await manager.start()
+    worker = GenerationWorker(concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    stop_requested = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_requested.set)
+
+    run_task = asyncio.create_task(worker.run())
+    await stop_requested.wait()
+    print("👋 Generation worker is shutting down...")
+    await worker.stop()
+    run_task.cancel()
+    await asyncio.gather(run_task, return_exceptions=True)
+    await manager.close()
+    shutdown_inference()
+
+
+# Dedicated worker process, scaled independently of the API:
+#   cd backend && python -m app.jobs.worker --concurrency 2
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run generation jobs from the database queue.")
+    parser.add_argument("--concurrency", type=int, default=GENERATION_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -2,6 +2,7 @@
 
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
 class ConversationCreate(BaseModel):
@@ -15,4 +16,6 @@ class ConversationOut(BaseModel):
     description: str
     title: str
     created_at: datetime
+    last_message_at: Optional[datetime] = None
+    last_message_preview: Optional[str] = None
     
\ No newline at end of file
@@ -0,0 +1,32 @@
+# backend/app/schemas/jobs.py
+
+from pydantic import BaseModel
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class JobOut(BaseModel):
+    id: UUID
+    conversation_id: UUID
+    user_message_id: UUID
+    assistant_message_id: UUID
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+        use_enum_values = True
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from enum import Enum
+from typing import Optional
 from uuid import UUID
 
 
@@ -35,6 +36,7 @@ class MessageRead(BaseModel):
     role: MessageRole
     content: str
     created_at: datetime
+    job_id: Optional[UUID] = None  # generation job producing the reply
 
     class Config:
         orm_mode = True
@@ -0,0 +1,22 @@
+# backend/app/schemas/usage.py
+
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+class UsageBucket(BaseModel):
+    bucket_start: datetime
+    vector_context_id: UUID
+    input_tokens: int
+    output_tokens: int
+    message_count: int
+
+class UsageReport(BaseModel):
+    granularity: str
+    input_tokens: int
+    output_tokens: int
+    message_count: int
+    # Set when more buckets matched than were returned (totals still cover all of them)
+    truncated: bool = False
+    buckets: List[UsageBucket]
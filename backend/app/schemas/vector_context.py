@@ -8,6 +8,7 @@ class VectorContextResponse(BaseModel):
     name: str
     description: Optional[str] = None
     chroma_collection_name: str
+    vector_backend: str = "chroma"
     created_at: datetime
 
     class Config:
@@ -0,0 +1,264 @@
+# backend/app/vector_store/collection_pool.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Marker file written by the ingest pipeline every time a collection is (re)built.
+# Its mtime lets API processes notice a rebuild done by another process.
+INGEST_MARKER_FILENAME = ".ingest_version"
+# Same idea one level up: touched whenever the set of vector contexts may have changed.
+CATALOG_MARKER_FILENAME = ".catalog_version"
+
+
+def collection_path(base_path: Path, collection_name: str) -> str:
+    return os.path.join(base_path, collection_name)
+
+
+def mark_collection_rebuilt(chroma_path: str):
+    """
+    Touches the ingest marker inside a collection directory so that every process
+    holding an open handle on it drops the handle on next access.
+    """
+    os.makedirs(chroma_path, exist_ok=True)
+    with open(os.path.join(chroma_path, INGEST_MARKER_FILENAME), "w", encoding="utf-8") as f:
+        f.write(str(time.time_ns()))
+
+
+def mark_catalog_changed(base_path: str):
+    """Touches the catalog marker so API processes reload their vector context catalog."""
+    os.makedirs(base_path, exist_ok=True)
+    with open(os.path.join(base_path, CATALOG_MARKER_FILENAME), "w", encoding="utf-8") as f:
+        f.write(str(time.time_ns()))
+
+
+def _marker_version(chroma_path: str, filename: str = INGEST_MARKER_FILENAME) -> int:
+    try:
+        return os.stat(os.path.join(chroma_path, filename)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def catalog_version(base_path: str) -> int:
+    return _marker_version(base_path, CATALOG_MARKER_FILENAME)
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+@dataclass
+class _PooledCollection:
+    handle: Any
+    path: str
+    version: int
+    size_bytes: int
+    opened_at: float = field(default_factory=time.time)
+    last_used_at: float = field(default_factory=time.time)
+    hits: int = 0
+    borrows: int = 0  # callers currently using the handle
+    retired: bool = False  # out of the registry; closed once the last borrower is done
+
+
+class CollectionRegistry:
+    """
+    Process-wide registry of open vector store handles keyed by collection name.
+
+    Handles are kept in LRU order and evicted when either the number of open
+    collections or their estimated memory footprint (size of the persisted index
+    on disk) exceeds the configured limits.
+
+    Opening a collection is slow (index load, embedding model), so it happens
+    outside the registry lock: the first caller opens it and concurrent callers for
+    the same path wait on that open instead of blocking lookups of other
+    collections. Evicted and invalidated handles are passed to `closer` so the
+    backend can release what it caches beyond the handle itself.
+
+    `get()` lends a handle for the duration of a `with` block. A handle evicted or
+    invalidated while lent out leaves the registry right away but is only closed
+    when its last borrower returns it, so in-flight searches never see it closed.
+    """
+
+    def __init__(
+        self,
+        base_path: Path,
+        opener: Callable[[str, str], Any],
+        max_collections: int = 8,
+        max_bytes: int = 0,
+        footprint: Callable[[str], int] = directory_size,
+        closer: Optional[Callable[[Any], None]] = None,
+    ):
+        self.base_path = base_path
+        self.opener = opener
+        self.closer = closer
+        self.footprint = footprint  # estimated memory of an open collection, from its path
+        self.max_collections = max_collections
+        self.max_bytes = max_bytes  # 0 disables size-based eviction
+        self._entries: "OrderedDict[str, _PooledCollection]" = OrderedDict()
+        self._opening: Dict[str, Tuple[Future, int]] = {}  # path -> (open in progress, version)
+        self._lock = threading.RLock()
+        self.opens = 0
+        self.evictions = 0
+        self.deferred_closes = 0
+
+    @contextmanager
+    def get(self, collection_name: str) -> Iterator[Any]:
+        """Lends the collection's handle; use as `with registry.get(name) as store:`."""
+        entry = self._borrow(collection_name)
+        try:
+            yield entry.handle
+        finally:
+            with self._lock:
+                entry.borrows -= 1
+                close = entry.retired and entry.borrows == 0
+            if close:
+                self._close(entry)
+
+    def _borrow(self, collection_name: str) -> _PooledCollection:
+        path = collection_path(self.base_path, collection_name)
+        version = _marker_version(path)
+
+        while True:
+            stale = None
+            with self._lock:
+                entry = self._entries.get(collection_name)
+                if entry and entry.version == version:
+                    entry.hits += 1
+                    entry.borrows += 1
+                    entry.last_used_at = time.time()
+                    self._entries.move_to_end(collection_name)
+                    return entry
+
+                pending = self._opening.get(path)
+                if pending is None:
+                    if entry:
+                        # Collection was rebuilt since we opened it
+                        stale = self._entries.pop(collection_name)
+                    future: Future = Future()
+                    self._opening[path] = (future, version)
+                    break
+
+            # Another thread is opening this path; wait for it without the lock, then
+            # borrow the entry it registered
+            future, _ = pending
+            future.result()
+
+        # The stale handle is released before reopening (once nobody borrows it),
+        # so the backend can't hand back state cached for the old files
+        if stale is not None:
+            self._retire([stale])
+        try:
+            handle = self.opener(path, collection_name)
+            size_bytes = self.footprint(path)
+        except BaseException as e:
+            with self._lock:
+                self._opening.pop(path, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._opening.pop(path, None)
+            self.opens += 1
+            entry = _PooledCollection(
+                handle=handle,
+                path=path,
+                version=version,
+                size_bytes=size_bytes,
+                borrows=1,
+            )
+            self._entries[collection_name] = entry
+            evicted = self._evict(keep=collection_name)
+        future.set_result(handle)
+        self._retire(evicted)
+        return entry
+
+    def version(self, collection_name: str) -> int:
+        """Current on-disk version of a collection (changes on every re-ingest)."""
+        return _marker_version(collection_path(self.base_path, collection_name))
+
+    def invalidate(self, collection_name: Optional[str] = None):
+        """Drops one (or every) open handle; the next `get` reopens it from disk."""
+        with self._lock:
+            if collection_name is None:
+                dropped = list(self._entries.values())
+                self._entries.clear()
+            else:
+                entry = self._entries.pop(collection_name, None)
+                dropped = [entry] if entry else []
+        self._retire(dropped)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    def _evict(self, keep: str) -> List[_PooledCollection]:
+        # Called with the lock held; the caller retires the returned entries after releasing it
+        evicted = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_collections
+            or (self.max_bytes and self.total_bytes() > self.max_bytes)
+        ):
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            evicted.append(self._entries.pop(oldest))
+            self.evictions += 1
+        return evicted
+
+    def _retire(self, entries: List[_PooledCollection]):
+        # Entries already removed from the registry: close those nobody borrows now,
+        # the rest when they are returned
+        with self._lock:
+            idle = []
+            for entry in entries:
+                entry.retired = True
+                if entry.borrows == 0:
+                    idle.append(entry)
+                else:
+                    self.deferred_closes += 1
+        for entry in idle:
+            self._close(entry)
+
+    def _close(self, entry: _PooledCollection):
+        if self.closer is None:
+            return
+        try:
+            self.closer(entry.handle)
+        except Exception as e:
+            print(f"⚠️ Failed to close collection at {entry.path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_collections": len(self._entries),
+                "max_collections": self.max_collections,
+                "total_bytes": self.total_bytes(),
+                "max_bytes": self.max_bytes,
+                "opens": self.opens,
+                "opening": len(self._opening),
+                "evictions": self.evictions,
+                "deferred_closes": self.deferred_closes,
+                "collections": {
+                    name: {
+                        "size_bytes": entry.size_bytes,
+                        "hits": entry.hits,
+                        "borrows": entry.borrows,
+                        "opened_at": entry.opened_at,
+                        "last_used_at": entry.last_used_at,
+                    }
+                    for name, entry in self._entries.items()
+                },
+            }
@@ -0,0 +1,80 @@
+# backend/app/vector_store/crawl_cache.py
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+CRAWL_CACHE_FILENAME = ".crawl_cache.json"
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class CrawlCache:
+    """
+    Persistent per-URL validators for re-crawls, stored next to the crawled files.
+
+    Each entry keeps the ETag / Last-Modified headers, the sitemap `lastmod`, the
+    hash of the saved content and the file it was written to.
+    """
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, CRAWL_CACHE_FILENAME)
+        self.entries: Dict[str, Dict[str, Optional[str]]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, url: str) -> Optional[Dict[str, Optional[str]]]:
+        entry = self.entries.get(url)
+        # An entry is only useful while the crawled file is still on disk
+        if entry and entry.get("file") and os.path.exists(entry["file"]):
+            return entry
+        return None
+
+    def unchanged_by_lastmod(self, url: str, lastmod: Optional[str]) -> bool:
+        entry = self.get(url)
+        return bool(entry and lastmod and entry.get("lastmod") == lastmod)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def unchanged_by_headers(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> bool:
+        entry = self.get(url)
+        if not entry:
+            return False
+        if etag and entry.get("etag"):
+            return etag == entry["etag"]
+        if last_modified and entry.get("last_modified"):
+            return last_modified == entry["last_modified"]
+        return False
+
+    def unchanged_by_hash(self, url: str, digest: str) -> bool:
+        entry = self.get(url)
+        return bool(entry and entry.get("hash") == digest)
+
+    def update(self, url: str, **fields: Optional[str]):
+        entry = self.entries.setdefault(url, {})
+        entry.update({k: v for k, v in fields.items() if v is not None})
+        entry["checked_at"] = str(time.time())
+
+    def forget_files(self, paths: Iterable[str]):
+        """Drops the entries of these files so their pages are fetched again next time."""
+        paths = {os.path.normpath(p) for p in paths}
+        for url in [u for u, e in self.entries.items() if e.get("file") and os.path.normpath(e["file"]) in paths]:
+            del self.entries[url]
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
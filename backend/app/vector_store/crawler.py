@@ -1,27 +1,144 @@
 # backend/app/vector_store/crawler.py
 
 import os
-import requests
+import gzip
+import aiofiles
+import aiohttp
 from xml.etree import ElementTree
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 import asyncio
+from dataclasses import dataclass, field
 
-from typing import List
+from typing import Dict, List, Optional, Set
 
+from app.vector_store.crawl_cache import CrawlCache, content_hash
+
+SITEMAP_NAMESPACE = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+MAX_SITEMAP_DEPTH = 3
+# Bounds each sitemap request so one slow server can't hang the crawl
+SITEMAP_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=10, sock_read=20)
+
+
+async def fetch_urls_from_sitemap_async(
+    sitemap_url: str,
+    session: aiohttp.ClientSession,
+    seen_sitemaps: Optional[Set[str]] = None,
+    depth: int = 0,
+    lastmods: Optional[Dict[str, str]] = None,
+    failed: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Fetches page URLs from a sitemap, recursively expanding sitemap indexes
+    (fetched concurrently). Returned URLs are de-duplicated, in sitemap order.
+    Page `lastmod` values are collected into `lastmods` when given, and sitemaps
+    that could not be fetched or parsed into `failed`: when it is non-empty the
+    returned list is incomplete.
+    """
+    if seen_sitemaps is None:
+        seen_sitemaps = set()
+    if lastmods is None:
+        lastmods = {}
+    if failed is None:
+        failed = []
+    if sitemap_url in seen_sitemaps or depth > MAX_SITEMAP_DEPTH:
+        return []
+    seen_sitemaps.add(sitemap_url)
 
-def fetch_urls_from_sitemap(sitemap_url: str) -> List[str]:
     try:
-        response = requests.get(sitemap_url)
-        response.raise_for_status()
-        root = ElementTree.fromstring(response.content)
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-        return [loc.text for loc in root.findall('.//ns:loc', namespace)]
-    except Exception:
+        async with session.get(sitemap_url) as response:
+            response.raise_for_status()
+            content = await response.read()
+        if sitemap_url.endswith(".gz"):
+            content = gzip.decompress(content)
+        root = ElementTree.fromstring(content)
+    except Exception as e:
+        print(f"⚠️ Failed to read sitemap {sitemap_url}: {e}")
+        failed.append(sitemap_url)
         return []
 
+    if root.tag.endswith("sitemapindex"):
+        children = [loc.text.strip() for loc in root.findall('./ns:sitemap/ns:loc', SITEMAP_NAMESPACE) if loc.text]
+        nested = await asyncio.gather(*[
+            fetch_urls_from_sitemap_async(child, session, seen_sitemaps, depth + 1, lastmods, failed)
+            for child in children
+        ])
+        urls = [url for child_urls in nested for url in child_urls]
+    else:
+        urls = []
+        for entry in root.findall('./ns:url', SITEMAP_NAMESPACE):
+            loc = entry.find('ns:loc', SITEMAP_NAMESPACE)
+            if loc is None or not loc.text:
+                continue
+            urls.append(loc.text.strip())
+            lastmod = entry.find('ns:lastmod', SITEMAP_NAMESPACE)
+            if lastmod is not None and lastmod.text:
+                lastmods[loc.text.strip()] = lastmod.text.strip()
+
+    return list(dict.fromkeys(urls))
+
+
+def url_to_filename(url: str) -> str:
+    return url.replace("https://", "").replace("http://", "").replace("/", "_")[:200] + ".html"
+
+
+@dataclass
+class CrawlResult:
+    changed: List[str] = field(default_factory=list)  # files written with new content
+    unchanged: List[str] = field(default_factory=list)  # files skipped by the crawl cache
+    removed: List[str] = field(default_factory=list)  # files of pages no longer listed
+    # Updated validators; saved by the caller once the changes are ingested, so pages
+    # whose ingest failed are fetched and re-ingested on the next run
+    cache: Optional[CrawlCache] = None
+
+
+def _header(headers, name: str) -> Optional[str]:
+    for key, value in (headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
 
-async def crawl_urls(urls: List[str], output_dir: str, max_concurrent: int = 5):
+async def _check_unchanged(
+    url: str,
+    cache: CrawlCache,
+    session: aiohttp.ClientSession,
+    lastmods: Dict[str, str],
+) -> bool:
+    # Cheapest first: sitemap lastmod, then a conditional HEAD request
+    if cache.unchanged_by_lastmod(url, lastmods.get(url)):
+        return True
+    if not cache.get(url):
+        return False
+    try:
+        async with session.head(url, headers=cache.conditional_headers(url), allow_redirects=True) as response:
+            if response.status == 304:
+                return True
+            return response.ok and cache.unchanged_by_headers(
+                url, response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+    except Exception:
+        return False
+
+
+async def crawl_urls(
+    urls: List[str],
+    output_dir: str,
+    max_concurrent: int = 5,
+    cache: Optional[CrawlCache] = None,
+    lastmods: Optional[Dict[str, str]] = None,
+    prune: bool = False,
+) -> CrawlResult:
+    """
+    Crawls URLs keeping `max_concurrent` fetches in flight at all times, so one slow
+    page only occupies its own slot. With a crawl cache, pages whose sitemap lastmod,
+    ETag/Last-Modified or content hash did not change are neither fetched again nor
+    rewritten.
+
+    With `prune`, cached pages missing from `urls` are deleted and reported as
+    removed; only pass it when `urls` is the complete listing of the site.
+    """
     os.makedirs(output_dir, exist_ok=True)
+    lastmods = lastmods or {}
 
     browser_config = BrowserConfig(
         headless=True,
@@ -31,33 +148,90 @@ async def crawl_urls(urls: List[str], output_dir: str, max_concurrent: int = 5):
     crawl_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
     crawler = AsyncWebCrawler(config=browser_config)
     await crawler.start()
+    session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
 
-    try:
-        for i in range(0, len(urls), max_concurrent):
-            batch = urls[i:i + max_concurrent]
-            tasks = [
-                crawler.arun(url=url, config=crawl_config, session_id=f"session_{i+j}")
-                for j, url in enumerate(batch)
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for url, result in zip(batch, results):
-                if hasattr(result, 'success') and result.success:
-                    html = getattr(result, 'content', '') or getattr(result, 'html', '') or getattr(result, 'text', '')
+    queue: asyncio.Queue = asyncio.Queue()
+    for url in dict.fromkeys(urls):
+        queue.put_nowait(url)
+    result = CrawlResult(cache=cache)
+
+    async def worker(worker_id: int):
+        while True:
+            try:
+                url = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                path = os.path.join(output_dir, url_to_filename(url))
+                if cache and await _check_unchanged(url, cache, session, lastmods):
+                    cache.update(url, lastmod=lastmods.get(url))
+                    result.unchanged.append(path)
+                    continue
+
+                crawled = await crawler.arun(url=url, config=crawl_config, session_id=f"session_{worker_id}")
+                if hasattr(crawled, 'success') and crawled.success:
+                    html = getattr(crawled, 'content', '') or getattr(crawled, 'html', '') or getattr(crawled, 'text', '')
                     if html:
-                        filename = url.replace("https://", "").replace("http://", "").replace("/", "_")[:200] + ".html"
-                        with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
-                            f.write(html)
+                        digest = content_hash(html)
+                        if cache and cache.unchanged_by_hash(url, digest):
+                            # Re-rendered but identical: keep the file untouched
+                            result.unchanged.append(path)
+                        else:
+                            async with aiofiles.open(path, "w", encoding="utf-8") as f:
+                                await f.write(html)
+                            result.changed.append(path)
+                        if cache:
+                            # Validators are only stored once the content is safely on disk
+                            headers = getattr(crawled, 'response_headers', None)
+                            cache.update(
+                                url,
+                                hash=digest,
+                                file=path,
+                                lastmod=lastmods.get(url),
+                                etag=_header(headers, "ETag"),
+                                last_modified=_header(headers, "Last-Modified"),
+                            )
+            except Exception as e:
+                print(f"⚠️ Failed to crawl {url}: {e}")
+
+    try:
+        await asyncio.gather(*[worker(i) for i in range(max_concurrent)])
     finally:
+        await session.close()
         await crawler.close()
 
+    if cache and prune:
+        # Pages that dropped out of the sitemap are removed from disk and the cache.
+        # A file already gone (an earlier run whose ingest failed) is still reported.
+        listed = set(urls)
+        for url in [u for u in cache.entries if u not in listed]:
+            entry = cache.entries.pop(url)
+            file_path = entry.get("file")
+            if file_path:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                result.removed.append(file_path)
 
-async def crawl_site(main_url: str, output_dir: str, max_concurrent: int = 5):
+    return result
+
+
+async def crawl_site(main_url: str, output_dir: str, max_concurrent: int = 5, use_cache: bool = True) -> CrawlResult:
     # Try sitemap first
     sitemap_url = main_url.rstrip("/") + "/sitemap.xml"
-    urls = fetch_urls_from_sitemap(sitemap_url)
+    lastmods: Dict[str, str] = {}
+    failed: List[str] = []
+    async with aiohttp.ClientSession(timeout=SITEMAP_TIMEOUT) as session:
+        urls = await fetch_urls_from_sitemap_async(sitemap_url, session, lastmods=lastmods, failed=failed)
 
+    # Pages are only pruned against a listing known to be complete; a transient
+    # sitemap error must not look like the whole site was removed
+    complete = bool(urls) and not failed
     if not urls:
         urls = [main_url]  # fallback to main page only or use another strategy
+    if not complete:
+        print(f"⚠️ Sitemap discovery incomplete ({len(failed)} sitemaps failed); not pruning removed pages")
 
-    await crawl_urls(urls, output_dir=output_dir, max_concurrent=max_concurrent)
\ No newline at end of file
+    cache = CrawlCache(output_dir) if use_cache else None
+    return await crawl_urls(
+        urls, output_dir=output_dir, max_concurrent=max_concurrent, cache=cache, lastmods=lastmods, prune=complete
+    )
@@ -3,6 +3,7 @@
 import asyncio
 import os
 import sys
+from typing import Optional
 
 from crawler import crawl_site
 from ingest import ingest_collection
@@ -11,31 +12,73 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-async def create_vector_collection(collection_name: str, url: str, description: str):
+def _option(args, name: str, default: Optional[str] = None) -> Optional[str]:
+    # --name=value style options after the positional arguments
+    for arg in args:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+async def create_vector_collection(
+    collection_name: str,
+    url: str,
+    description: str,
+    incremental: bool = False,
+    vector_backend: Optional[str] = None,
+    vector_dtype: Optional[str] = None,
+    vector_rerank: Optional[bool] = None,
+):
     html_output_dir = os.path.join("backend", "app", "chroma_input", collection_name)
     os.makedirs(html_output_dir, exist_ok=True)
 
     print(f"🌐 Crawling site: {url}")
-    await crawl_site(url, html_output_dir)
+    crawl = await crawl_site(url, html_output_dir)
+    print(f"🌐 {len(crawl.changed)} pages changed, {len(crawl.unchanged)} unchanged, {len(crawl.removed)} removed")
 
     print(f"🧠 Ingesting documents into Chroma for collection '{collection_name}'")
     async with AsyncSessionLocal() as db:
-        await ingest_collection(
+        failed_files = await ingest_collection(
             collection_name=collection_name,
             input_dir=html_output_dir,
             description=description,
             db=db,
+            incremental=incremental,
+            # Unchanged pages are skipped entirely on incremental refreshes
+            files=crawl.changed,
+            removed_files=crawl.removed,
+            vector_backend=vector_backend,
+            vector_dtype=vector_dtype,
+            vector_rerank=vector_rerank,
         )
 
+    # Validators are only persisted once the pages are ingested; pages that failed to
+    # ingest are forgotten so the next run fetches and ingests them again
+    if crawl.cache:
+        crawl.cache.forget_files(failed_files)
+        crawl.cache.save()
+
 if __name__ == "__main__":
     if len(sys.argv) < 4:
         print("USAGE")
         print("From root directory run the following command:")
-        print("PYTHONPATH=backend python backend/app/vector_store/create_collection.py <collection_name> <url> <description>")
+        print("PYTHONPATH=backend python backend/app/vector_store/create_collection.py <collection_name> <url> <description> [--incremental] [--vector-backend=chroma|numpy] [--vector-dtype=float32|float16|int8] [--rerank|--no-rerank]")
         sys.exit(1)
 
     collection_name = sys.argv[1]
     url = sys.argv[2]
     description = sys.argv[3]
+    incremental = "--incremental" in sys.argv[4:]
+    # Omitted: a new collection uses Chroma, a refresh keeps the current backend
+    vector_backend = _option(sys.argv[4:], "vector-backend")
+    # Omitted: a refresh keeps the snapshot's dtype and re-rank setting
+    vector_dtype = _option(sys.argv[4:], "vector-dtype")
+    vector_rerank = False if "--no-rerank" in sys.argv[4:] else True if "--rerank" in sys.argv[4:] else None
 
-    asyncio.run(create_vector_collection(collection_name, url, description))
\ No newline at end of file
+    asyncio.run(create_vector_collection(
+        collection_name, url, description,
+        incremental=incremental,
+        vector_backend=vector_backend,
+        vector_dtype=vector_dtype,
+        vector_rerank=vector_rerank,
+    ))
\ No newline at end of file
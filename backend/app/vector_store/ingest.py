@@ -1,6 +1,14 @@
+import hashlib
+import json
+import multiprocessing
 import os
+import queue
 import shutil
-from typing import List
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -10,6 +18,11 @@ from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
 
 from app.db.models import VectorContext
+from app.vector_store.collection_pool import mark_collection_rebuilt, mark_catalog_changed
+from app.vector_store.numpy_store import (
+    export_chroma_collection, numpy_store_path, print_quantization_report, read_manifest,
+    same_store_settings, store_settings,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -20,6 +33,14 @@ load_dotenv()
 # CONFIG
 CHROMA_BASE_PATH = Path("backend",os.getenv("CHROMA_BASE_PATH")).resolve()
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+# Parse workers are never forked: the parent has the embedding model (torch/OpenMP
+# thread pools and locks) loaded, and a fork copies those locks in whatever state
+# another thread left them, which can deadlock the child
+INGEST_START_METHOD = os.getenv("INGEST_START_METHOD", "spawn")
+CHECKPOINT_FILENAME = ".ingest_checkpoint.jsonl"
 
 # HTML Chunking
 def load_html_and_chunk(
@@ -62,51 +83,494 @@ def load_html_and_chunk(
     return filtered_docs
 
 
+@dataclass
+class FileReport:
+    path: str
+    chunks: int
+    seconds: float
+    error: Optional[str] = None
+
+
+def _load_and_chunk_file(
+    file_path: str,
+    chunk_size: int,
+    chunk_overlap: int
+) -> Tuple[str, List[Document], float, Optional[str]]:
+    # Runs inside a worker process; errors are returned instead of raised
+    # so one bad page doesn't abort the whole ingest.
+    started = time.perf_counter()
+    try:
+        documents = UnstructuredHTMLLoader(file_path, mode="single").load()
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        chunks = filter_complex_metadata(splitter.split_documents(documents))
+        return file_path, chunks, time.perf_counter() - started, None
+    except Exception as e:
+        return file_path, [], time.perf_counter() - started, repr(e)
+
+
+def create_parse_pool(workers: int) -> ProcessPoolExecutor:
+    # _load_and_chunk_file is looked up by module name in the spawned workers
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(INGEST_START_METHOD))
+
+
+def iter_html_chunk_batches(
+    directory_path: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    workers: int = INGEST_WORKERS,
+    batch_size: int = INGEST_BATCH_SIZE,
+    report: Optional[List[FileReport]] = None,
+    files: Optional[List[str]] = None,
+    pool: Optional[Executor] = None,
+) -> Iterator[Tuple[List[Document], List[str]]]:
+    """
+    Parses and chunks HTML files in parallel worker processes, yielding chunk batches
+    as soon as files finish. A file's chunks never span two batches.
+
+    Args:
+        directory_path (str): Path to the directory containing HTML files.
+        chunk_size (int, optional): Size of each text chunk. Defaults to 1000.
+        chunk_overlap (int, optional): Overlap between chunks. Defaults to 200.
+        workers (int, optional): Worker processes; 1 parses in-process.
+        batch_size (int, optional): Approximate number of chunks per yielded batch.
+        report (List[FileReport], optional): Receives per-file timing and failures.
+        files (List[str], optional): Explicit file list instead of globbing the directory.
+        pool (Executor, optional): Parse pool owned by the caller; by default one with
+            `workers` processes is created and shut down here.
+
+    Yields:
+        Tuple[List[Document], List[str]]: A batch of processed Document objects and
+        the files it was built from.
+    """
+    if files is None:
+        files = sorted(str(p) for p in Path(directory_path).glob("**/*.html"))
+    if report is None:
+        report = []
+
+    batch: List[Document] = []
+    batch_files: List[str] = []
+
+    def collect(result):
+        path, chunks, seconds, error = result
+        report.append(FileReport(path=path, chunks=len(chunks), seconds=seconds, error=error))
+        if error:
+            print(f"⚠️ Failed to load {path}: {error}")
+        batch.extend(chunks)
+        batch_files.append(path)
+
+    if workers <= 1 and pool is None:
+        for file_path in files:
+            collect(_load_and_chunk_file(file_path, chunk_size, chunk_overlap))
+            if len(batch) >= batch_size:
+                yield batch, batch_files
+                batch, batch_files = [], []
+    else:
+        owned = pool is None
+        if owned:
+            pool = create_parse_pool(workers)
+        try:
+            pending = set()
+            remaining = iter(files)
+            # Only a few files per worker are in flight so parsed chunks don't pile up
+            max_in_flight = max(workers, 1) * 4
+
+            while True:
+                for file_path in remaining:
+                    pending.add(pool.submit(_load_and_chunk_file, file_path, chunk_size, chunk_overlap))
+                    if len(pending) >= max_in_flight:
+                        break
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future.result())
+
+                if len(batch) >= batch_size:
+                    yield batch, batch_files
+                    batch, batch_files = [], []
+        finally:
+            if owned:
+                pool.shutdown(cancel_futures=True)
+
+    if batch_files:
+        yield batch, batch_files
+
+
+def chunk_id(document: Document, input_dir: str) -> str:
+    """
+    Deterministic chunk id derived from the source file (relative to the input dir)
+    and the chunk text, so unchanged chunks keep their id across crawls.
+    """
+    source = os.path.relpath(document.metadata.get("source", ""), input_dir)
+    digest = hashlib.sha256(f"{source}\0{document.page_content}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stored_chunk_sources(db_chroma: Chroma) -> Dict[str, str]:
+    # Maps every stored chunk id to its source file
+    stored = db_chroma.get(include=["metadatas"])
+    return {
+        id_: (metadata or {}).get("source", "")
+        for id_, metadata in zip(stored["ids"], stored["metadatas"])
+    }
+
+
+@dataclass
+class IngestCheckpoint:
+    """
+    Append-only record of the batches already stored for an ingest run.
+
+    The first line holds the run settings; every following line lists the files
+    and chunk ids of one stored batch. An interrupted run is resumed by skipping
+    the recorded files.
+    """
+    path: str
+    input_dir: str
+    incremental: bool
+    files: Optional[List[str]] = None
+    removed_files: Optional[List[str]] = None
+    completed_files: Set[str] = field(default_factory=set)
+    seen_ids: Set[str] = field(default_factory=set)
+    added: int = 0
+
+    @classmethod
+    def load(cls, path: str, input_dir: str) -> Optional["IngestCheckpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get("input_dir") != os.path.abspath(input_dir):
+            return None
+
+        header = lines[0]
+        checkpoint = cls(
+            path=path,
+            input_dir=input_dir,
+            incremental=header["incremental"],
+            files=header.get("files"),
+            removed_files=header.get("removed_files"),
+        )
+        for entry in lines[1:]:
+            checkpoint.completed_files.update(entry["files"])
+            checkpoint.seen_ids.update(entry["ids"])
+            checkpoint.added += entry["added"]
+        return checkpoint
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "input_dir": os.path.abspath(self.input_dir),
+                "incremental": self.incremental,
+                "files": self.files,
+                "removed_files": self.removed_files,
+            }) + "\n")
+
+    def record(self, files: List[str], ids: List[str], added: int):
+        self.completed_files.update(files)
+        self.seen_ids.update(ids)
+        self.added += added
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"files": files, "ids": ids, "added": added}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+_STAGE_DONE = object()
+
+
+def run_ingest_pipeline(
+    db_chroma: Chroma,
+    embeddings: HuggingFaceEmbeddings,
+    input_dir: str,
+    files: List[str],
+    stored: Dict[str, str],
+    checkpoint: IngestCheckpoint,
+    report: List[FileReport],
+    workers: int = INGEST_WORKERS,
+    batch_size: int = INGEST_BATCH_SIZE,
+) -> int:
+    """
+    Streams files through parse -> chunk -> embed -> upsert in fixed-size batches.
+
+    Each stage runs on its own thread and hands batches over through bounded queues,
+    so memory stays proportional to a few batches rather than the corpus. Stored
+    batches are recorded in the checkpoint. Returns the number of chunks added.
+
+    The parse pool is created here, on the calling thread, before any stage thread
+    starts; its workers are spawned (see INGEST_START_METHOD) rather than forked
+    from a process whose embed thread is running inside torch.
+    """
+    embed_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    upsert_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+    seen = set(checkpoint.seen_ids)
+
+    pool = create_parse_pool(workers) if workers > 1 else None
+
+    def parse_stage():
+        try:
+            for batch, batch_files in iter_html_chunk_batches(
+                input_dir, workers=workers, batch_size=batch_size, report=report, files=files, pool=pool
+            ):
+                # Chunks whose content hash is already stored are skipped
+                new_docs, new_ids, batch_ids = [], [], []
+                for document in batch:
+                    id_ = chunk_id(document, input_dir)
+                    if id_ in seen:
+                        continue
+                    seen.add(id_)
+                    batch_ids.append(id_)
+                    if id_ not in stored:
+                        new_docs.append(document)
+                        new_ids.append(id_)
+                embed_queue.put((new_docs, new_ids, batch_ids, batch_files))
+            embed_queue.put(_STAGE_DONE)
+        except BaseException as e:
+            embed_queue.put(e)
+
+    def embed_stage():
+        while True:
+            item = embed_queue.get()
+            if item is _STAGE_DONE or isinstance(item, BaseException):
+                upsert_queue.put(item)
+                return
+            new_docs, new_ids, batch_ids, batch_files = item
+            try:
+                vectors = embeddings.embed_documents([d.page_content for d in new_docs]) if new_docs else []
+            except BaseException as e:
+                upsert_queue.put(e)
+                return
+            upsert_queue.put((new_docs, new_ids, vectors, batch_ids, batch_files))
+
+    for stage in (parse_stage, embed_stage):
+        threading.Thread(target=stage, name=f"ingest-{stage.__name__}", daemon=True).start()
+    try:
+        return _upsert_stage(db_chroma, upsert_queue, checkpoint, report, len(files))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def _upsert_stage(
+    db_chroma: Chroma,
+    upsert_queue: queue.Queue,
+    checkpoint: IngestCheckpoint,
+    report: List[FileReport],
+    file_count: int,
+) -> int:
+    # Runs on the caller's thread: Chroma writes and checkpoint records stay in order
+    started = time.perf_counter()
+    previously_completed = len(checkpoint.completed_files)
+    total_files = previously_completed + file_count
+    failed = set()
+    added = 0
+    while True:
+        item = upsert_queue.get()
+        if item is _STAGE_DONE:
+            break
+        if isinstance(item, BaseException):
+            raise item
+
+        new_docs, new_ids, vectors, batch_ids, batch_files = item
+        if new_docs:
+            db_chroma._collection.upsert(
+                ids=new_ids,
+                embeddings=vectors,
+                documents=[d.page_content for d in new_docs],
+                metadatas=[d.metadata for d in new_docs],
+            )
+            added += len(new_docs)
+
+        # Failed files are left out of the checkpoint so a resumed run retries them
+        failed.update(r.path for r in report if r.error)
+        checkpoint.record([f for f in batch_files if f not in failed], batch_ids, len(new_docs))
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"🧠 {previously_completed + len(report)}/{total_files} files, "
+            f"{checkpoint.added} new chunks ({added / elapsed:.1f} chunks/s, {len(report) / elapsed:.1f} files/s)"
+        )
+
+    return added
+
+
+def print_ingest_report(report: List[FileReport], elapsed: float):
+    failed = [r for r in report if r.error]
+    chunks = sum(r.chunks for r in report)
+    print(f"📄 Parsed {len(report) - len(failed)}/{len(report)} files into {chunks} chunks in {elapsed:.1f}s")
+    for r in sorted(report, key=lambda r: r.seconds, reverse=True)[:5]:
+        print(f"   🐢 {r.seconds:.2f}s  {r.path}")
+    for r in failed:
+        print(f"   ❌ {r.path}: {r.error}")
+
+
 # Ingest Pipeline
-async def ingest_collection(collection_name: str, input_dir: str, description: str, db: AsyncSession):
+async def ingest_collection(
+    collection_name: str,
+    input_dir: str,
+    description: str,
+    db: AsyncSession,
+    workers: int = INGEST_WORKERS,
+    incremental: bool = False,
+    files: Optional[List[str]] = None,
+    removed_files: Optional[List[str]] = None,
+    vector_backend: Optional[str] = None,
+    vector_dtype: Optional[str] = None,
+    vector_rerank: Optional[bool] = None,
+) -> List[str]:
     """
     Extracts, semantically chunks, embeds, and stores HTML documents in Chroma.
+    Returns the files that failed to parse (their previous chunks are kept).
 
     :param collection_name: Name of Chroma collection (used as folder name).
     :param input_dir: Path to directory containing HTML files.
     :param description: Optional description for logging/debugging.
+    :param workers: Number of processes used to parse and chunk files.
+    :param incremental: Only embed new chunks and delete vanished ones instead of rebuilding.
+    :param files: Incremental mode only: restrict the run to these changed files (e.g. from
+        the crawl cache); chunks of other files are left untouched.
+    :param removed_files: Incremental mode only: files whose chunks should be deleted.
+    :param vector_backend: "numpy" also writes a memory-mapped snapshot of the collection
+        and makes the API search it instead of Chroma. Defaults to the collection's
+        current backend ("chroma" for a new one).
+    :param vector_dtype: Numpy backend only: "float32", "float16" or "int8" (per-vector
+        scale) storage. A recall-vs-memory report of all three is printed. Defaults to
+        the dtype of the existing snapshot ("float32" for a new one).
+    :param vector_rerank: Numpy backend only: keep a float32 copy of quantized vectors
+        and re-rank the shortlisted candidates exactly. Defaults to the existing
+        snapshot's setting when the dtype is unchanged, otherwise on.
     """
     chroma_path = os.path.join(CHROMA_BASE_PATH, collection_name)
+    checkpoint_path = os.path.join(chroma_path, CHECKPOINT_FILENAME)
 
-    # Start fresh
-    if os.path.exists(chroma_path):
-        shutil.rmtree(chroma_path)
+    vc = None
+    if db:
+        existing = await db.execute(
+            select(VectorContext).where(VectorContext.chroma_collection_name == collection_name)
+        )
+        vc = existing.scalar_one_or_none()
+    # A refresh keeps the collection's backend unless another one is asked for
+    if vector_backend is None:
+        vector_backend = (vc.vector_backend if vc else None) or "chroma"
 
-    print(f"🔍 Loading documents from: {input_dir}")
-    documents = load_html_and_chunk(input_dir)
+    # An interrupted run for the same input is resumed where it stopped
+    checkpoint = IngestCheckpoint.load(checkpoint_path, input_dir)
+    if checkpoint:
+        incremental = checkpoint.incremental
+        if checkpoint.files is None or files is None:
+            files = None
+        else:
+            # Changes handed to the interrupted run still have to be applied
+            files = sorted(set(checkpoint.files) | set(files))
+            removed_files = sorted(set(checkpoint.removed_files or []) | set(removed_files or []))
+        print(f"⏯️ Resuming ingest: {len(checkpoint.completed_files)} files already stored")
+    else:
+        # Start fresh unless only the differences should be applied
+        if not incremental and os.path.exists(chroma_path):
+            shutil.rmtree(chroma_path)
+        checkpoint = IngestCheckpoint(
+            path=checkpoint_path,
+            input_dir=input_dir,
+            incremental=incremental,
+            files=files if incremental else None,
+            removed_files=removed_files if incremental else None,
+        )
+        checkpoint.start()
 
-    print(f"🧠 Found {len(documents)} semantic chunks. Embedding...")
+    print(f"🔍 Loading documents from: {input_dir} ({workers} workers)")
 
     embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
-
-    Chroma.from_documents(
-        documents,
-        embedding=embeddings,
+    db_chroma = Chroma(
         persist_directory=chroma_path,
-        collection_name=collection_name
+        collection_name=collection_name,
+        embedding_function=embeddings
     )
 
-    if db:
-        existing = await db.execute(
-            select(VectorContext).where(VectorContext.chroma_collection_name == collection_name)
-        )
-        if existing.scalar_one_or_none():
-            raise ValueError(f"Collection with name '{collection_name}' already exists in DB.")
+    # A resumed rebuild also has to skip what it already stored
+    resuming = bool(checkpoint.completed_files)
+    stored: Dict[str, str] = stored_chunk_sources(db_chroma) if incremental or resuming else {}
+    if incremental:
+        print(f"♻️ Incremental mode: {len(stored)} chunks already stored")
 
-        vc = VectorContext(
-            name=collection_name.replace("_", " ").title(),
-            description=description,
-            chroma_collection_name=collection_name
-        )
-        db.add(vc)
-        await db.commit()
+    # Only an incremental run can be limited to the files the crawler reported
+    scoped = incremental and files is not None
+    if not scoped:
+        files = sorted(str(p) for p in Path(input_dir).glob("**/*.html"))
+    scope = {os.path.normpath(f) for f in files + (removed_files or [])}
+    files = [f for f in files if f not in checkpoint.completed_files]
+
+    started = time.perf_counter()
+    report: List[FileReport] = []
+    run_ingest_pipeline(db_chroma, embeddings, input_dir, files, stored, checkpoint, report, workers=workers)
+    added = checkpoint.added
+    seen = checkpoint.seen_ids
+
+    # Chunks that disappeared from the crawl are removed, except those of files that
+    # failed to parse this time (their old chunks are better than nothing).
+    vanished = []
+    if incremental:
+        failed_sources = {r.path for r in report if r.error}
+        vanished = [
+            id_ for id_, source in stored.items()
+            if id_ not in seen
+            and source not in failed_sources
+            and (not scoped or os.path.normpath(source) in scope)
+        ]
+        for i in range(0, len(vanished), INGEST_BATCH_SIZE):
+            db_chroma.delete(ids=vanished[i:i + INGEST_BATCH_SIZE])
+
+    print_ingest_report(report, time.perf_counter() - started)
+    print(f"📊 {added} chunks added, {len(vanished)} removed, {len(seen) - added} unchanged")
+    checkpoint.clear()
+
+    changed = bool(added or vanished or not incremental)
+    if vector_backend == "numpy":
+        snapshot_path = numpy_store_path(chroma_path)
+        # Settings not given again are those of the snapshot being refreshed
+        manifest = read_manifest(snapshot_path) if incremental else None
+        vector_dtype, vector_rerank = store_settings(manifest, vector_dtype, vector_rerank)
+        if changed or manifest is None or not same_store_settings(manifest, vector_dtype, vector_rerank):
+            count, quantization = export_chroma_collection(
+                db_chroma, snapshot_path, dtype=vector_dtype, rerank=vector_rerank
+            )
+            print(f"🧮 Wrote NumPy snapshot of {count} chunks ({vector_dtype}) to '{snapshot_path}'")
+            print_quantization_report(quantization)
+            changed = True
+
+    # Let running API processes drop their open handle on the old index
+    if changed:
+        mark_collection_rebuilt(chroma_path)
+
+    if db:
+        if vc:
+            if not incremental:
+                raise ValueError(f"Collection with name '{collection_name}' already exists in DB.")
+            if vc.vector_backend != vector_backend:
+                vc.vector_backend = vector_backend
+                await db.commit()
+                mark_catalog_changed(CHROMA_BASE_PATH)
+        else:
+            vc = VectorContext(
+                name=collection_name.replace("_", " ").title(),
+                description=description,
+                chroma_collection_name=collection_name,
+                vector_backend=vector_backend,
+            )
+            db.add(vc)
+            await db.commit()
+            # Running API processes reload their vector context catalog
+            mark_catalog_changed(CHROMA_BASE_PATH)
 
     print(f"✅ Collection '{collection_name}' ingested and stored at '{chroma_path}'.")
+    return [r.path for r in report if r.error]
 
 
 # EXAMPLE USAGE - 
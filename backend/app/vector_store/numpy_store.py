@@ -0,0 +1,454 @@
+# backend/app/vector_store/numpy_store.py
+
+import json
+import math
+import mmap
+import os
+import shutil
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Sub-directory of a collection holding the NumPy snapshot of its Chroma index: a
+# symlink to the current "<NUMPY_DIRNAME><VERSION_SUFFIX>..." version directory
+NUMPY_DIRNAME = "numpy"
+VERSION_SUFFIX = ".v-"
+MANIFEST_FILENAME = "manifest.json"
+VECTORS_FILENAME = "vectors.npy"
+SCALES_FILENAME = "scales.npy"  # int8 only: per-vector dequantization scale
+RERANK_VECTORS_FILENAME = "vectors_f32.npy"  # full precision copy for re-ranking
+DOCS_FILENAME = "docs.jsonl"
+DOC_OFFSETS_FILENAME = "docs_offsets.npy"
+REPORT_FILENAME = "quantization_report.json"
+FORMAT_VERSION = 1
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# Rows scored per block; bounds the float32 temporaries for quantized matrices
+SEARCH_BLOCK_ROWS = 65536
+# Quantized stores shortlist max(k * RERANK_FACTOR, RERANK_MIN_CANDIDATES) rows
+# and re-score them exactly against the float32 copy
+RERANK_FACTOR = 8
+RERANK_MIN_CANDIDATES = 32
+# The recall report is measured on a random sample of this many stored vectors
+QUANTIZATION_REPORT_MAX_ROWS = 20000
+
+
+def numpy_store_path(chroma_path: str) -> str:
+    return os.path.join(chroma_path, NUMPY_DIRNAME)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Converts normalized float32 vectors to the storage dtype. int8 uses a symmetric
+    per-vector scale (max |component| / 127), returned alongside the matrix.
+    """
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, dtype=np.float32)
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.round(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def approximate_scores(matrix: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+    """Dot products of a (possibly quantized) matrix with a float32 query."""
+    if matrix.dtype == np.float32:
+        return matrix @ query
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for start in range(0, matrix.shape[0], SEARCH_BLOCK_ROWS):
+        block = matrix[start:start + SEARCH_BLOCK_ROWS]
+        scores[start:start + len(block)] = block.astype(np.float32) @ query
+    if scales is not None:
+        scores *= scales
+    return scores
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def rerank_candidates(k: int) -> int:
+    return max(k * RERANK_FACTOR, RERANK_MIN_CANDIDATES)
+
+
+def quantization_report(vectors: np.ndarray, k: int = 10, sample: int = 200, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Recall@k of every storage dtype against exact float32 search, with and without
+    the float32 re-rank, using a sample of the stored vectors as queries (each
+    query's own row is left out of both result lists).
+    """
+    rows = []
+    n = len(vectors)
+    if n < 2:
+        return rows
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(n, size=min(sample, n), replace=False)
+    k = min(k, n - 1)
+
+    def neighbours(scores: np.ndarray, row: int, count: int) -> np.ndarray:
+        scores = scores.copy()
+        scores[row] = -np.inf
+        return top_k_rows(scores, count)
+
+    exact = {int(q): set(neighbours(vectors @ vectors[q], q, k).tolist()) for q in queries}
+    for dtype in SUPPORTED_DTYPES:
+        matrix, scales = quantize(vectors, dtype)
+        recall = recall_reranked = 0.0
+        for q in queries:
+            q = int(q)
+            scores = approximate_scores(matrix, scales, vectors[q])
+            recall += len(exact[q] & set(neighbours(scores, q, k).tolist())) / k
+            shortlist = neighbours(scores, q, rerank_candidates(k))
+            exact_scores = vectors[shortlist] @ vectors[q]
+            exact_scores[shortlist == q] = -np.inf
+            reranked = shortlist[top_k_rows(exact_scores, k)]
+            recall_reranked += len(exact[q] & set(reranked.tolist())) / k
+        resident = matrix.nbytes + (scales.nbytes if scales is not None else 0)
+        rows.append({
+            "dtype": dtype,
+            "bytes_per_vector": resident / n,
+            "resident_bytes": int(resident),
+            "recall_at_k": recall / len(queries),
+            "recall_at_k_reranked": recall_reranked / len(queries) if dtype != "float32" else 1.0,
+            "k": k,
+            "queries": len(queries),
+        })
+    return rows
+
+
+def print_quantization_report(rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    print(f"📐 Recall@{rows[0]['k']} vs memory ({rows[0]['queries']} sample queries):")
+    for row in rows:
+        print(
+            f"   {row['dtype']:>8}  {row['bytes_per_vector']:8.1f} B/vector  "
+            f"{row['resident_bytes'] / 2**20:8.2f} MiB  "
+            f"recall {row['recall_at_k']:.3f}  re-ranked {row['recall_at_k_reranked']:.3f}"
+        )
+
+
+class NumpyStoreWriter:
+    """
+    Builds a store batch by batch, so a collection is never held in memory at once:
+    normalized embeddings go straight into memory-mapped .npy files (float32,
+    float16 or int8 with per-vector scales) and each document becomes one JSON line
+    plus its byte offset. Quantized stores also keep a float32 copy for re-ranking
+    unless `rerank` is off.
+
+    Every build goes into its own version directory; `finish()` repoints the `path`
+    symlink at it with one atomic rename, so readers see either the old or the new
+    store and never a missing one. The version it replaced is kept until the next
+    build, for readers still opening it.
+    """
+
+    def __init__(self, path: str, count: int, dtype: str = "float32", rerank: bool = True, report_rows: int = 0):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported vector dtype '{dtype}' (expected one of {SUPPORTED_DTYPES})")
+        self.path = path
+        self.count = count
+        self.dtype = dtype
+        self.rerank = rerank and dtype != "float32"
+        self.version_path = f"{path}{VERSION_SUFFIX}{time.time_ns()}-{os.getpid()}"
+        os.makedirs(self.version_path)
+
+        self.written = 0
+        self.dim = 0
+        self._matrix = self._rerank_matrix = None
+        self._scales = np.zeros(count, dtype=np.float32) if dtype == "int8" else None
+        self._offsets = np.zeros(count + 1, dtype=np.uint64)
+        self._docs = open(os.path.join(self.version_path, DOCS_FILENAME), "wb")
+        # Rows kept in memory for the recall report, drawn evenly at random up front
+        sample = np.random.default_rng(0).choice(count, size=min(report_rows, count), replace=False)
+        self._sample_rows = np.sort(sample)
+        self._sample: List[np.ndarray] = []
+
+    def _open_matrix(self, name: str, dtype) -> np.ndarray:
+        return np.lib.format.open_memmap(
+            os.path.join(self.version_path, name), mode="w+", dtype=dtype, shape=(self.count, self.dim)
+        )
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Optional[Dict[str, Any]]]):
+        if not ids:
+            return
+        start, end = self.written, self.written + len(ids)
+        if end > self.count:
+            raise RuntimeError(f"More than the expected {self.count} vectors (collection changed during export?)")
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        if self._matrix is None:
+            self.dim = vectors.shape[1]
+            self._matrix = self._open_matrix(VECTORS_FILENAME, self.dtype)
+            if self.rerank:
+                self._rerank_matrix = self._open_matrix(RERANK_VECTORS_FILENAME, np.float32)
+
+        matrix, scales = quantize(vectors, self.dtype)
+        self._matrix[start:end] = matrix
+        if scales is not None:
+            self._scales[start:end] = scales
+        if self._rerank_matrix is not None:
+            self._rerank_matrix[start:end] = vectors
+        picked = self._sample_rows[(self._sample_rows >= start) & (self._sample_rows < end)]
+        if len(picked):
+            self._sample.append(vectors[picked - start])
+
+        for i, (id_, text, metadata) in enumerate(zip(ids, documents, metadatas), start):
+            line = json.dumps({"id": id_, "page_content": text, "metadata": metadata or {}}).encode("utf-8") + b"\n"
+            self._docs.write(line)
+            self._offsets[i + 1] = self._offsets[i] + len(line)
+        self.written = end
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Recall-vs-memory report computed over the sampled rows."""
+        return quantization_report(np.concatenate(self._sample)) if self._sample else []
+
+    def abort(self):
+        """Drops a build that won't be finished, leaving the current store in place."""
+        self._docs.close()
+        self._matrix = self._rerank_matrix = None
+        shutil.rmtree(self.version_path, ignore_errors=True)
+
+    def finish(self, report: Optional[List[Dict[str, Any]]] = None):
+        self._docs.close()
+        if self.written != self.count:
+            raise RuntimeError(f"Expected {self.count} vectors, got {self.written} (collection changed during export?)")
+        if self._matrix is None:
+            np.save(os.path.join(self.version_path, VECTORS_FILENAME), np.zeros((0, 0), dtype=self.dtype))
+        else:
+            self._matrix.flush()
+            if self._rerank_matrix is not None:
+                self._rerank_matrix.flush()
+        if self._scales is not None:
+            np.save(os.path.join(self.version_path, SCALES_FILENAME), self._scales)
+        if self.rerank and self._rerank_matrix is None:
+            np.save(os.path.join(self.version_path, RERANK_VECTORS_FILENAME), np.zeros((0, 0), dtype=np.float32))
+        np.save(os.path.join(self.version_path, DOC_OFFSETS_FILENAME), self._offsets)
+        if report is not None:
+            with open(os.path.join(self.version_path, REPORT_FILENAME), "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        with open(os.path.join(self.version_path, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+            json.dump({
+                "format": FORMAT_VERSION, "dtype": self.dtype, "dim": self.dim, "count": self.count, "rerank": self.rerank,
+            }, f)
+        self._matrix = self._rerank_matrix = None
+        _swap_in(self.path, self.version_path)
+
+
+def _swap_in(path: str, version_path: str):
+    parent, name = os.path.split(path)
+    link_tmp = f"{path}.link-{os.getpid()}"
+    if os.path.lexists(link_tmp):
+        os.remove(link_tmp)
+    os.symlink(os.path.basename(version_path), link_tmp)
+
+    previous = os.path.realpath(path) if os.path.islink(path) else None
+    if os.path.isdir(path) and not os.path.islink(path):
+        # A store written before versioning is a plain directory; a symlink can't
+        # replace it atomically, so it is moved aside this one time
+        previous = f"{path}{VERSION_SUFFIX}legacy-{os.getpid()}"
+        os.replace(path, previous)
+    os.replace(link_tmp, path)
+
+    keep = {os.path.basename(version_path), os.path.basename(previous or "")}
+    for entry in os.listdir(parent or "."):
+        if entry.startswith(f"{name}{VERSION_SUFFIX}") and entry not in keep:
+            # Older versions (and builds that never finished); processes that still
+            # map their files keep them until they reopen
+            shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+
+
+def write_numpy_store(
+    path: str,
+    ids: List[str],
+    embeddings: np.ndarray,
+    documents: List[str],
+    metadatas: List[Optional[Dict[str, Any]]],
+    dtype: str = "float32",
+    rerank: bool = True,
+    report: Optional[List[Dict[str, Any]]] = None,
+):
+    """Writes an in-memory set of vectors as a store (see NumpyStoreWriter)."""
+    writer = NumpyStoreWriter(path, len(ids), dtype=dtype, rerank=rerank)
+    writer.add(ids, embeddings, documents, metadatas)
+    writer.finish(report)
+
+
+def export_chroma_collection(
+    db_chroma,
+    path: str,
+    dtype: str = "float32",
+    rerank: bool = True,
+    batch_size: int = 1000,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Copies every chunk of a Chroma collection into a NumPy store, `batch_size` chunks
+    at a time; returns the chunk count and the recall-vs-memory report of the storage
+    dtypes (also saved with it), measured on up to QUANTIZATION_REPORT_MAX_ROWS chunks.
+
+    Chroma pages by limit/offset without a snapshot, so a write during the export can
+    shift rows between pages. The exported ids are checked against the collection's
+    id set before the new store is swapped in; on a mismatch the build is dropped
+    and a RuntimeError raised, leaving the current store in place.
+    """
+    collection = db_chroma._collection
+    writer = NumpyStoreWriter(path, collection.count(), dtype=dtype, rerank=rerank, report_rows=QUANTIZATION_REPORT_MAX_ROWS)
+    exported = set()
+    try:
+        for offset in range(0, writer.count, batch_size):
+            batch = collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            writer.add(batch["ids"], batch["embeddings"], batch["documents"], batch["metadatas"])
+            exported.update(batch["ids"])
+        if len(exported) != writer.written or exported != set(collection.get(include=[])["ids"]):
+            raise RuntimeError("Exported ids don't match the collection (collection changed during export?)")
+        report = writer.report()
+        writer.finish(report)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.written, report
+
+
+def read_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """The manifest of the store at `path`, or None when there is no readable store."""
+    try:
+        with open(os.path.join(path, MANIFEST_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_settings(
+    manifest: Optional[Dict[str, Any]], dtype: Optional[str], rerank: Optional[bool]
+) -> Tuple[str, bool]:
+    """
+    Fills in the dtype and rerank settings that weren't given from an existing
+    store's manifest, so refreshing a store doesn't silently change its format.
+    """
+    if dtype is None:
+        dtype = manifest["dtype"] if manifest else "float32"
+    if rerank is None:
+        # A float32 store records rerank as off, which says nothing about another dtype
+        rerank = manifest.get("rerank", True) if manifest and manifest["dtype"] == dtype else True
+    return dtype, rerank
+
+
+def same_store_settings(manifest: Dict[str, Any], dtype: str, rerank: bool) -> bool:
+    return manifest["dtype"] == dtype and bool(manifest.get("rerank")) == (rerank and dtype != "float32")
+
+
+def _euclidean_relevance_score_fn(distance: float) -> float:
+    # Same conversion langchain's Chroma wrapper applies to its default l2 space
+    return 1.0 - distance / math.sqrt(2)
+
+
+class NumpyVectorStore:
+    """
+    Exact search over a memory-mapped embedding matrix.
+
+    The matrix is opened with `mmap_mode="r"`, so every process searching the same
+    collection shares the OS page cache instead of holding its own copy. Top-k is one
+    matrix-vector product plus `argpartition`; only the k winning documents are read
+    from the docs file, which is memory-mapped as well (reads are thread-safe).
+
+    Quantized (float16 / int8) stores scan the compact matrix to shortlist candidates
+    and re-score those exactly against the float32 copy; only the shortlisted rows
+    of that copy are ever paged in.
+
+    Scores follow the Chroma wrapper: `similarity_search_by_vector_with_relevance_scores`
+    returns squared L2 distances (2 - 2·cos for unit vectors) and
+    `_select_relevance_score_fn` converts them, so callers can use either backend.
+    """
+
+    def __init__(self, path: str):
+        # Resolved once so every file comes from the same version, even mid-swap
+        self.path = os.path.realpath(path)
+        path = self.path
+        with open(os.path.join(path, MANIFEST_FILENAME), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported NumPy store format in {path}")
+        self.vectors = np.load(os.path.join(path, VECTORS_FILENAME), mmap_mode="r")
+        self.scales = (
+            np.load(os.path.join(path, SCALES_FILENAME), mmap_mode="r")
+            if self.manifest["dtype"] == "int8" else None
+        )
+        self.rerank_vectors = (
+            np.load(os.path.join(path, RERANK_VECTORS_FILENAME), mmap_mode="r")
+            if self.manifest.get("rerank") else None
+        )
+        self.offsets = np.load(os.path.join(path, DOC_OFFSETS_FILENAME), mmap_mode="r")
+        with open(os.path.join(path, DOCS_FILENAME), "rb") as f:
+            # mmap can't map an empty file (a collection without chunks)
+            self._docs = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def close(self):
+        """Unmaps the docs file; the matrices are unmapped once no longer referenced."""
+        if isinstance(self._docs, mmap.mmap):
+            self._docs.close()
+
+    def _search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = approximate_scores(self.vectors, self.scales, query)
+        if self.rerank_vectors is None:
+            top = top_k_rows(scores, k)
+            return top, scores[top]
+        # Sorted rows keep the reads from the float32 copy sequential
+        shortlist = np.sort(top_k_rows(scores, rerank_candidates(k)))
+        exact = np.asarray(self.rerank_vectors[shortlist]) @ query
+        order = top_k_rows(exact, k)
+        return shortlist[order], exact[order]
+
+    def _document(self, row: int):
+        from langchain_core.documents import Document
+
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        record = json.loads(self._docs[start:end])
+        return Document(page_content=record["page_content"], metadata=record["metadata"], id=record["id"])
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: Iterable[float], k: int = 4
+    ) -> List[Tuple[Any, float]]:
+        if len(self) == 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        rows, scores = self._search(query, k)
+        return [(self._document(int(row)), float(2.0 - 2.0 * score)) for row, score in zip(rows, scores)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return _euclidean_relevance_score_fn
+
+
+def store_footprint(chroma_path: str) -> int:
+    """Bytes a store keeps hot: everything but the float32 re-rank copy, read sparsely."""
+    path = numpy_store_path(chroma_path)
+    total = 0
+    for name in (VECTORS_FILENAME, SCALES_FILENAME, DOC_OFFSETS_FILENAME):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+def open_numpy_collection(path: str, collection_name: str) -> NumpyVectorStore:
+    return NumpyVectorStore(numpy_store_path(path))
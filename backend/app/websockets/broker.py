@@ -0,0 +1,321 @@
+# backend/app/websockets/broker.py
+
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+# Receives the frames published for a conversation this process has subscribed to
+FrameHandler = Callable[[UUID, List[dict]], Awaitable[None]]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; leave room for the envelope
+PG_NOTIFY_MAX_PAYLOAD = 7000
+# Partially received chunked payloads are dropped after this long
+PG_REASSEMBLY_TIMEOUT_SECONDS = 30
+# The LISTEN connection is probed this often; a dropped one is re-established with
+# exponential backoff and every subscribed channel is listened to again
+PG_LISTEN_CHECK_SECONDS = 15
+PG_RECONNECT_INITIAL_SECONDS = 0.5
+PG_RECONNECT_MAX_SECONDS = 30
+
+
+def channel_name(conversation_id: UUID) -> str:
+    return f"ws_{conversation_id.hex}"
+
+
+def _conversation_from_channel(channel: str) -> UUID:
+    return UUID(hex=channel[len("ws_"):])
+
+
+class Broker:
+    """
+    Routes WebSocket frames to whichever process holds the conversation's socket.
+    Processes subscribe to the conversations they have sockets for and publish to any.
+    """
+
+    def __init__(self):
+        self.handler: Optional[FrameHandler] = None
+        self.published = 0
+        self.received = 0
+
+    async def start(self, handler: FrameHandler):
+        self.handler = handler
+
+    async def subscribe(self, conversation_id: UUID):
+        pass
+
+    async def unsubscribe(self, conversation_id: UUID):
+        pass
+
+    async def publish(self, conversation_id: UUID, frames: List[dict]):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    async def _dispatch(self, conversation_id: UUID, frames: List[dict]):
+        self.received += 1
+        if self.handler:
+            try:
+                await self.handler(conversation_id, frames)
+            except Exception as e:
+                print(f"⚠️ Failed to deliver frames for conversation {conversation_id}: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": type(self).__name__, "published": self.published, "received": self.received}
+
+
+class InMemoryBroker(Broker):
+    """Single process only (tests, local development): publishing delivers directly."""
+
+    async def publish(self, conversation_id: UUID, frames: List[dict]):
+        self.published += 1
+        await self._dispatch(conversation_id, frames)
+
+
+class PostgresBroker(Broker):
+    """
+    LISTEN/NOTIFY on one channel per conversation, through the app's asyncpg engine.
+    Payloads above the NOTIFY limit are split into numbered chunks and reassembled
+    by the listener. The LISTEN connection is supervised: when it drops (or stops
+    answering) it is replaced and the subscribed channels are listened to again.
+    Notifications sent while it is down are lost; clients catch up on reconnect.
+    """
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self._listen_conn = None  # SQLAlchemy AsyncConnection kept open for LISTEN
+        self._driver_conn = None  # None while reconnecting
+        self._channels: set[str] = set()
+        self._partial: Dict[str, tuple[float, List[Optional[str]]]] = {}
+        self._lock = asyncio.Lock()
+        self._lost = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
+        # Frames being dispatched; referenced here so they are not garbage collected
+        self._tasks: set[asyncio.Task] = set()
+        self.reconnects = 0
+
+    async def start(self, handler: FrameHandler):
+        await super().start(handler)
+        async with self._lock:
+            await self._connect()
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def _connect(self):
+        # Called with the lock held
+        self._lost.clear()
+        self._listen_conn = await self.engine.connect()
+        raw = await self._listen_conn.get_raw_connection()
+        driver_conn = raw.driver_connection
+        driver_conn.add_termination_listener(self._on_terminated)
+        for channel in self._channels:
+            await driver_conn.add_listener(channel, self._on_notify)
+        self._driver_conn = driver_conn
+
+    async def _disconnect(self):
+        # Called with the lock held
+        conn, self._listen_conn, self._driver_conn = self._listen_conn, None, None
+        if conn is not None:
+            try:
+                # The connection may be broken; keep it out of the pool
+                await conn.invalidate()
+                await conn.close()
+            except Exception:
+                pass
+
+    def _on_terminated(self, connection):
+        if connection is self._driver_conn:
+            self._lost.set()
+
+    async def _supervise(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._lost.wait(), timeout=PG_LISTEN_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                try:
+                    async with self._lock:
+                        await self._driver_conn.execute("SELECT 1", timeout=PG_LISTEN_CHECK_SECONDS)
+                    continue
+                except Exception as e:
+                    print(f"⚠️ Postgres LISTEN connection is not responding: {e}")
+            await self._reconnect()
+
+    async def _reconnect(self):
+        delay = PG_RECONNECT_INITIAL_SECONDS
+        while True:
+            # The lock is only held per attempt so subscribe() never waits on the backoff
+            async with self._lock:
+                await self._disconnect()
+                try:
+                    await self._connect()
+                    break
+                except Exception as e:
+                    await self._disconnect()
+                    print(f"⚠️ Postgres LISTEN reconnect failed, retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PG_RECONNECT_MAX_SECONDS)
+        self.reconnects += 1
+        print(f"🔌 Postgres LISTEN connection re-established ({len(self._channels)} channels)")
+
+    def _on_notify(self, connection, pid, channel, payload):
+        task = asyncio.get_running_loop().create_task(self._receive(channel, payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _receive(self, channel: str, payload: str):
+        envelope = json.loads(payload)
+        if "n" in envelope:
+            payload = self._reassemble(envelope)
+            if payload is None:
+                return
+            envelope = json.loads(payload)
+        await self._dispatch(_conversation_from_channel(channel), envelope["f"])
+
+    def _reassemble(self, chunk: dict) -> Optional[str]:
+        now = time.monotonic()
+        for key in [k for k, (at, _) in self._partial.items() if now - at > PG_REASSEMBLY_TIMEOUT_SECONDS]:
+            del self._partial[key]
+        _, parts = self._partial.setdefault(chunk["k"], (now, [None] * chunk["n"]))
+        parts[chunk["i"]] = chunk["d"]
+        if any(part is None for part in parts):
+            return None
+        del self._partial[chunk["k"]]
+        return "".join(parts)
+
+    async def subscribe(self, conversation_id: UUID):
+        channel = channel_name(conversation_id)
+        async with self._lock:
+            if channel in self._channels:
+                return
+            # While disconnected the channel is only recorded; _connect() listens to it
+            self._channels.add(channel)
+            if self._driver_conn is not None:
+                try:
+                    await self._driver_conn.add_listener(channel, self._on_notify)
+                except Exception as e:
+                    print(f"⚠️ LISTEN {channel} failed, reconnecting: {e}")
+                    self._lost.set()
+
+    async def unsubscribe(self, conversation_id: UUID):
+        channel = channel_name(conversation_id)
+        async with self._lock:
+            if channel not in self._channels:
+                return
+            self._channels.discard(channel)
+            if self._driver_conn is not None:
+                try:
+                    await self._driver_conn.remove_listener(channel, self._on_notify)
+                except Exception as e:
+                    print(f"⚠️ UNLISTEN {channel} failed, reconnecting: {e}")
+                    self._lost.set()
+
+    async def publish(self, conversation_id: UUID, frames: List[dict]):
+        from sqlalchemy import text
+
+        payload = json.dumps({"f": frames}, separators=(",", ":"))
+        if len(payload) <= PG_NOTIFY_MAX_PAYLOAD:  # json.dumps output is ASCII
+            payloads = [payload]
+        else:
+            # Re-encoding a piece escapes each character into at most 6 bytes (\uXXXX)
+            size = PG_NOTIFY_MAX_PAYLOAD // 6
+            pieces = [payload[i:i + size] for i in range(0, len(payload), size)]
+            key = uuid4().hex
+            payloads = [
+                json.dumps({"k": key, "i": i, "n": len(pieces), "d": piece}, separators=(",", ":"))
+                for i, piece in enumerate(pieces)
+            ]
+
+        channel = channel_name(conversation_id)
+        # One transaction so the chunks are delivered together and in order
+        async with self.engine.begin() as conn:
+            for item in payloads:
+                await conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": item})
+        self.published += 1
+
+    async def close(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        async with self._lock:
+            if self._driver_conn is not None:
+                for channel in list(self._channels):
+                    try:
+                        await self._driver_conn.remove_listener(channel, self._on_notify)
+                    except Exception:
+                        break
+            self._channels.clear()
+            await self._disconnect()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **super().stats(),
+            "connected": self._driver_conn is not None,
+            "channels": len(self._channels),
+            "reconnects": self.reconnects,
+        }
+
+
+class RedisBroker(Broker):
+    """Redis (or compatible) pub/sub; needs the optional `redis` package."""
+
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("WS_BROKER=redis requires the 'redis' package (pip install redis)") from e
+        self.client = redis.from_url(url)
+        self.pubsub = self.client.pubsub()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def _read(self):
+        while True:
+            try:
+                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception as e:
+                print(f"⚠️ Redis pub/sub read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message and message["type"] == "message":
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                await self._dispatch(_conversation_from_channel(channel), json.loads(message["data"])["f"])
+
+    async def subscribe(self, conversation_id: UUID):
+        await self.pubsub.subscribe(channel_name(conversation_id))
+        # The reader can only poll once there is at least one subscription
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read())
+
+    async def unsubscribe(self, conversation_id: UUID):
+        await self.pubsub.unsubscribe(channel_name(conversation_id))
+
+    async def publish(self, conversation_id: UUID, frames: List[dict]):
+        await self.client.publish(channel_name(conversation_id), json.dumps({"f": frames}, separators=(",", ":")))
+        self.published += 1
+
+    async def close(self):
+        if self._reader:
+            self._reader.cancel()
+        await self.pubsub.close()
+        await self.client.close()
+
+
+def create_broker(backend: str) -> Broker:
+    from app.core.security import WS_REDIS_URL
+
+    if backend == "postgres":
+        from app.db.database import engine
+        return PostgresBroker(engine)
+    if backend == "redis":
+        return RedisBroker(WS_REDIS_URL)
+    if backend == "memory":
+        return InMemoryBroker()
+    raise ValueError(f"Unknown WS_BROKER '{backend}' (expected memory, postgres or redis)")
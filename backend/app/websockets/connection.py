@@ -0,0 +1,136 @@
+# backend/app/websockets/connection.py
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from fastapi import WebSocket
+
+# Close code sent to clients that cannot keep up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """
+    One subscriber of a conversation: a WebSocket with its own bounded outbound queue
+    drained by a writer task, so delivery never waits on a slow client.
+
+    When the queue is full the slow-consumer policy applies: with "drop_deltas" delta
+    frames are dropped (the "end" frame still carries the full reply) and the client
+    is disconnected only if a non-delta frame doesn't fit; with "disconnect" the
+    client is disconnected right away. The writer sends a ping when idle for
+    `heartbeat_seconds`.
+    """
+
+    def __init__(
+        self,
+        conversation_id: UUID,
+        websocket: WebSocket,
+        queue_size: int = 256,
+        slow_consumer_policy: str = "drop_deltas",
+        heartbeat_seconds: float = 20,
+        send_timeout_seconds: float = 10,
+    ):
+        self.id = uuid4()
+        self.conversation_id = conversation_id
+        self.websocket = websocket
+        self.slow_consumer_policy = slow_consumer_policy
+        self.heartbeat_seconds = heartbeat_seconds
+        self.send_timeout_seconds = send_timeout_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self._writer: Optional[asyncio.Task] = None
+        # Live frames set aside while history is replayed (see hold/release)
+        self._held: Optional[List[dict]] = None
+
+        self.connected_at = time.time()
+        self.last_received_at = time.monotonic()
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.max_queue_depth = 0
+        self.send_seconds = 0.0
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write())
+
+    def touch(self):
+        """Records that the client sent something (pong or any other message)."""
+        self.last_received_at = time.monotonic()
+
+    def hold(self):
+        """Sets live frames aside until `release()`, so history replayed meanwhile goes first."""
+        self._held = []
+
+    def release(self, replayed: List[dict] = ()):
+        """Queues the replayed frames, then the live frames held since `hold()`."""
+        held, self._held = self._held or [], None
+        for frame in [*replayed, *held]:
+            self.offer(frame)
+
+    def offer(self, frame: dict) -> bool:
+        """Queues a frame without waiting; applies the slow-consumer policy when full."""
+        if self.closed:
+            return False
+        if self._held is not None:
+            self._held.append(frame)
+            return True
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.frames_dropped += 1
+            if self.slow_consumer_policy == "disconnect" or frame.get("type") != "delta":
+                self.close_soon("slow consumer")
+            return False
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return True
+
+    async def _write(self):
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(self.queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    frame = {"type": "ping"}
+                started = time.perf_counter()
+                await asyncio.wait_for(self.websocket.send_json(frame), timeout=self.send_timeout_seconds)
+                self.send_seconds += time.perf_counter() - started
+                self.frames_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.close_soon("send timeout")
+        except Exception:
+            self.close_soon("send failed")
+
+    def close_soon(self, reason: str):
+        if not self.closed:
+            self.close_reason = reason
+            asyncio.get_running_loop().create_task(self.close())
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        try:
+            await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE if self.close_reason else 1000)
+        except Exception:
+            pass  # already gone
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            # Conversation ids are left out; stats must not reveal other users' conversations
+            "id": str(self.id),
+            "connected_seconds": round(time.time() - self.connected_at, 1),
+            "idle_seconds": round(time.monotonic() - self.last_received_at, 1),
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "avg_send_ms": round(1000 * self.send_seconds / self.frames_sent, 2) if self.frames_sent else 0.0,
+            "closed": self.closed,
+            "close_reason": self.close_reason,
+        }
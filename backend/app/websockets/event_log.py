@@ -0,0 +1,38 @@
+# backend/app/websockets/event_log.py
+
+import time
+from collections import deque
+from typing import List, Optional
+from uuid import uuid4
+
+
+class EventLog:
+    """
+    Bounded log of the frames delivered for one conversation in this process.
+
+    Every frame gets a sequence number, and the log an epoch that changes whenever
+    the log is recreated (new process, conversation dropped after the resume
+    window), so a client's (epoch, seq) only means something to the log it came from.
+    """
+
+    def __init__(self, max_events: int = 512):
+        self.epoch = uuid4().hex[:12]
+        self.events: deque = deque(maxlen=max_events)
+        self.last_seq = 0
+
+    def append(self, frame: dict) -> dict:
+        self.last_seq += 1
+        frame = {**frame, "epoch": self.epoch, "seq": self.last_seq}
+        self.events.append(frame)
+        return frame
+
+    def since(self, epoch: str, seq: int) -> Optional[List[dict]]:
+        """Frames after `seq`, or None when they can't be replayed from this log."""
+        if epoch != self.epoch or seq > self.last_seq:
+            return None
+        if seq == self.last_seq:
+            return []
+        first_seq = self.events[0]["seq"] if self.events else self.last_seq + 1
+        if seq + 1 < first_seq:
+            return None  # the gap has already been evicted
+        return [frame for frame in self.events if frame["seq"] > seq]
@@ -1,23 +1,232 @@
 # backend/app/websockets/manager.py
 
-from typing import Dict
+import asyncio
+from typing import Dict, List, Optional, Set
 from fastapi import WebSocket
 from uuid import UUID
 
+from app.core.security import (
+    WS_BROKER, WS_BATCH_MAX_WAIT_MS, WS_BATCH_MAX_FRAMES, WS_SEND_QUEUE_SIZE,
+    WS_SLOW_CONSUMER_POLICY, WS_HEARTBEAT_SECONDS, WS_SEND_TIMEOUT_SECONDS,
+    WS_EVENT_LOG_MAX_EVENTS, WS_RESUME_WINDOW_SECONDS,
+)
+from app.websockets.broker import Broker, create_broker
+from app.websockets.connection import ClientConnection
+from app.websockets.event_log import EventLog
+
+# Per-connection metrics listed by stats(); the totals cover every connection
+STATS_MAX_CONNECTIONS = 100
+
+
+def _coalesce(frames: List[dict], frame: dict):
+    # Consecutive deltas of the same message become one frame with the joined text
+    last = frames[-1] if frames else None
+    if (
+        last is not None
+        and frame.get("type") == "delta"
+        and last.get("type") == "delta"
+        and last.get("id") == frame.get("id")
+    ):
+        frames[-1] = {**last, "content": last["content"] + frame["content"]}
+    else:
+        frames.append(frame)
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[UUID, WebSocket] = {}
+    """
+    Holds this process's WebSocket connections and routes outbound frames through a
+    pub/sub broker, so a reply generated by any API or worker process reaches the
+    process that holds the socket. A conversation can have several subscribers
+    (tabs, devices); each gets the frames through its own ClientConnection queue.
+
+    Delta frames are buffered per conversation for up to `batch_max_wait_ms` (or
+    `batch_max_frames`) and published as one message; any other frame flushes the
+    buffer right away so start/end/error are never delayed.
+
+    Delivered frames are numbered in a per-conversation EventLog. After the last
+    subscriber leaves, the conversation stays subscribed (and logged) for
+    `resume_window_seconds`, so a client that reconnects in time gets only the
+    frames it missed.
+    """
+
+    def __init__(
+        self,
+        broker: Broker,
+        batch_max_wait_ms: float = 20,
+        batch_max_frames: int = 32,
+        event_log_max_events: int = 512,
+        resume_window_seconds: float = 120,
+    ):
+        self.active_connections: Dict[UUID, Set[ClientConnection]] = {}
+        self.event_log_max_events = event_log_max_events
+        self.resume_window_seconds = resume_window_seconds
+        # A conversation is subscribed on the broker exactly while it has a log
+        self._logs: Dict[UUID, EventLog] = {}
+        self._release_timers: Dict[UUID, asyncio.TimerHandle] = {}
+        self.broker = broker
+        self.batch_max_wait = batch_max_wait_ms / 1000
+        self.batch_max_frames = batch_max_frames
+        self._pending: Dict[UUID, List[dict]] = {}
+        self._flush_timers: Dict[UUID, asyncio.TimerHandle] = {}
+        self._publish_locks: Dict[UUID, tuple[asyncio.Lock, int]] = {}  # lock, flushes using it
+        self._started = False
+        self.slow_consumer_disconnects = 0
+        self.resumed = 0
+        self.not_resumed = 0
+
+    async def start(self):
+        if not self._started:
+            await self.broker.start(self._deliver)
+            self._started = True
 
-    async def connect(self, conversation_id: UUID, websocket: WebSocket):
+    async def close(self):
+        for conversation_id in list(self._pending):
+            await self._flush(conversation_id)
+        await self.broker.close()
+        self._started = False
+
+    async def connect(
+        self,
+        conversation_id: UUID,
+        websocket: WebSocket,
+        resume_epoch: Optional[str] = None,
+        resume_seq: Optional[int] = None,
+    ) -> tuple[ClientConnection, bool]:
+        """
+        Registers a subscriber. With `resume_epoch`/`resume_seq` the frames the client
+        missed are replayed from the event log when possible; returns whether they were.
+        A resume the log can't cover leaves the connection holding live frames: the
+        caller replays from elsewhere and then calls `connection.release()`.
+        """
         await websocket.accept()
-        self.active_connections[conversation_id] = websocket
+        timer = self._release_timers.pop(conversation_id, None)
+        if timer:
+            timer.cancel()
+        if conversation_id not in self._logs:
+            await self.broker.subscribe(conversation_id)
+            self._logs.setdefault(conversation_id, EventLog(self.event_log_max_events))
+        log = self._logs[conversation_id]
+
+        connection = ClientConnection(
+            conversation_id,
+            websocket,
+            queue_size=WS_SEND_QUEUE_SIZE,
+            slow_consumer_policy=WS_SLOW_CONSUMER_POLICY,
+            heartbeat_seconds=WS_HEARTBEAT_SECONDS,
+            send_timeout_seconds=WS_SEND_TIMEOUT_SECONDS,
+        )
+
+        # No await from here on: the replay and the registration happen atomically,
+        # so live frames are queued right after the replayed ones
+        missed = log.since(resume_epoch, resume_seq) if resume_epoch and resume_seq is not None else None
+        if missed is not None and len(missed) >= connection.queue.maxsize:
+            missed = None  # too far behind to replay through the queue
+        resumed = missed is not None
+        if resume_epoch:
+            if resumed:
+                self.resumed += 1
+            else:
+                self.not_resumed += 1
+
+        connection.offer({"type": "hello", "epoch": log.epoch, "last_seq": log.last_seq, "resumed": resumed})
+        for frame in missed or []:
+            connection.offer(frame)
+        if resume_epoch and not resumed:
+            connection.hold()
+        self.active_connections.setdefault(conversation_id, set()).add(connection)
+        connection.start()
+        return connection, resumed
+
+    async def disconnect(self, connection: ClientConnection):
+        if connection.close_reason == "slow consumer":
+            self.slow_consumer_disconnects += 1
+        await connection.close()
+        subscribers = self.active_connections.get(connection.conversation_id)
+        if subscribers is None or connection not in subscribers:
+            return
+        subscribers.discard(connection)
+        if not subscribers:
+            del self.active_connections[connection.conversation_id]
+            # Keep logging for a while so a reconnecting client can resume
+            conversation_id = connection.conversation_id
+            self._release_timers[conversation_id] = asyncio.get_running_loop().call_later(
+                self.resume_window_seconds, lambda: asyncio.ensure_future(self._release(conversation_id))
+            )
 
-    def disconnect(self, conversation_id: UUID):
-        self.active_connections.pop(conversation_id, None)
+    async def _release(self, conversation_id: UUID):
+        self._release_timers.pop(conversation_id, None)
+        if conversation_id in self.active_connections or conversation_id not in self._logs:
+            return
+        del self._logs[conversation_id]
+        try:
+            await self.broker.unsubscribe(conversation_id)
+        except Exception as e:
+            print(f"⚠️ Failed to unsubscribe conversation {conversation_id}: {e}")
 
     async def send_message(self, conversation_id: UUID, message: dict):
-        websocket = self.active_connections.get(conversation_id)
-        if websocket:
-            await websocket.send_json(message)
+        frames = self._pending.setdefault(conversation_id, [])
+        _coalesce(frames, message)
+        if message.get("type") != "delta" or len(frames) >= self.batch_max_frames:
+            await self._flush(conversation_id)
+        elif conversation_id not in self._flush_timers:
+            loop = asyncio.get_running_loop()
+            self._flush_timers[conversation_id] = loop.call_later(
+                self.batch_max_wait, lambda: asyncio.ensure_future(self._flush(conversation_id))
+            )
+
+    async def _flush(self, conversation_id: UUID):
+        timer = self._flush_timers.pop(conversation_id, None)
+        if timer:
+            timer.cancel()
+        frames = self._pending.pop(conversation_id, None)
+        if not frames:
+            return
+        # Publishes of one conversation are serialized to keep frames in order
+        lock, users = self._publish_locks.get(conversation_id, (asyncio.Lock(), 0))
+        self._publish_locks[conversation_id] = (lock, users + 1)
+        try:
+            async with lock:
+                await self.broker.publish(conversation_id, frames)
+        except Exception as e:
+            print(f"⚠️ Failed to publish frames for conversation {conversation_id}: {e}")
+        finally:
+            lock, users = self._publish_locks[conversation_id]
+            if users == 1:
+                del self._publish_locks[conversation_id]
+            else:
+                self._publish_locks[conversation_id] = (lock, users - 1)
+
+    async def _deliver(self, conversation_id: UUID, frames: List[dict]):
+        log = self._logs.get(conversation_id)
+        if log is None:
+            return  # arrived after the conversation was released
+        # Only queues the frames; each connection's writer sends at its own pace
+        subscribers = list(self.active_connections.get(conversation_id, ()))
+        for frame in frames:
+            frame = log.append(frame)
+            for connection in subscribers:
+                connection.offer(frame)
+
+    def stats(self) -> dict:
+        connections = [c for subscribers in self.active_connections.values() for c in subscribers]
+        return {
+            "conversations": len(self.active_connections),
+            "connections": len(connections),
+            "frames_dropped": sum(c.frames_dropped for c in connections),
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "event_logs": len(self._logs),
+            "resumed": self.resumed,
+            "not_resumed": self.not_resumed,
+            "pending_conversations": len(self._pending),
+            "broker": self.broker.stats(),
+            "per_connection": [c.stats() for c in connections[:STATS_MAX_CONNECTIONS]],
+        }
+
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager(
+    create_broker(WS_BROKER),
+    batch_max_wait_ms=WS_BATCH_MAX_WAIT_MS,
+    batch_max_frames=WS_BATCH_MAX_FRAMES,
+    event_log_max_events=WS_EVENT_LOG_MAX_EVENTS,
+    resume_window_seconds=WS_RESUME_WINDOW_SECONDS,
+)
@@ -1,14 +1,24 @@
 # backend/main.py
 
+import asyncio
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import ws
+from app.websockets.manager import manager
 from app.db.database import engine
 from app.db.models import Base 
 from app.api import auth, conversations, messages
 from app.api import vector_contexts
+from app.api import stats
+from app.api import usage
+from app.api import jobs
+from app.core.inference import shutdown_inference
+from app.core.security import WARMUP_ENABLED, GENERATION_WORKER_IN_PROCESS
+from app.jobs.worker import GenerationWorker
+from app.core.warmup import readiness, warm_up
 
 app = FastAPI(
     title="RAG App",
@@ -22,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Before-Cursor", "X-After-Cursor", "X-Has-More"],  # pagination cursors
 )
 
 # Register routers
@@ -30,10 +41,24 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(conversations.router, prefix="/api/conversations", tags=["Conversations"])
 app.include_router(messages.router, prefix="/api/messages", tags=["Messages"])
 app.include_router(vector_contexts.router, prefix="/api/vector-contexts", tags=["Vector Contexts"])
+app.include_router(stats.router, prefix="/api/stats", tags=["Stats"])
+app.include_router(usage.router, prefix="/api/usage", tags=["Usage"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 
 # Websockets
 app.include_router(ws.router)
 
+# Liveness: the process is up and serving
+@app.get("/health", tags=["Health"])
+async def health():
+    return {"status": "ok"}
+
+# Readiness: models are loaded and hot collections are open
+@app.get("/ready", tags=["Health"])
+async def ready():
+    status_code = 200 if readiness.ready else 503
+    return JSONResponse(status_code=status_code, content=readiness.status())
+
 # Optional: Startup/shutdown events
 @app.on_event("startup")
 async def on_startup():
@@ -43,9 +68,29 @@ async def on_startup():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    # Warm up in the background so liveness checks pass right away
+    if WARMUP_ENABLED:
+        app.state.warmup_task = asyncio.create_task(warm_up())
+    else:
+        readiness.ready = True
+
+    # Subscribe to the WebSocket fan-out before accepting connections
+    await manager.start()
+
+    # Single-process deployments run a generation worker inside the API
+    if GENERATION_WORKER_IN_PROCESS:
+        app.state.generation_worker = GenerationWorker()
+        app.state.generation_worker_task = asyncio.create_task(app.state.generation_worker.run())
+
 @app.on_event("shutdown")
 async def on_shutdown():
     print("👋 App is shutting down...")
+    worker = getattr(app.state, "generation_worker", None)
+    if worker:
+        await worker.stop()
+        app.state.generation_worker_task.cancel()
+    await manager.close()
+    shutdown_inference()
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
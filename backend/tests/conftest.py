@@ -0,0 +1,79 @@
+# backend/tests/conftest.py
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# app.db.database builds its engine and app.core.security reads its paths at import time
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("CHROMA_BASE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".chroma"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.activity import touch_conversation  # noqa: E402
+from app.db.models import Base, Conversation, Message, RoleEnum, User, VectorContext  # noqa: E402
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def run_db():
+    """
+    Runs `scenario(db)` against a fresh in-memory SQLite database and returns its
+    result; tests stay synchronous and each gets its own event loop and schema.
+    """
+    def run(scenario):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                async with AsyncSession(engine, expire_on_commit=False) as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+async def create_user(db, email: str = "user@example.com") -> User:
+    user = User(name="User", email=email, hashed_password="x", created_at=T0)
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def create_conversation(db, user: User, created_at: datetime = T0, title: str = "Chat") -> Conversation:
+    context = VectorContext(name="Docs", description="Docs", chroma_collection_name=f"docs_{uuid.uuid4().hex}")
+    db.add(context)
+    await db.flush()
+    conversation = Conversation(
+        user_id=user.id, vector_context_id=context.id, title=title, created_at=created_at, last_message_at=created_at
+    )
+    db.add(conversation)
+    await db.commit()
+    return conversation
+
+
+async def add_messages(db, conversation: Conversation, count: int, start: datetime = T0) -> list:
+    messages = [
+        Message(
+            conversation_id=conversation.id,
+            role=RoleEnum.user if i % 2 == 0 else RoleEnum.assistant,
+            content=f"message {i}",
+            created_at=start + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+    db.add_all(messages)
+    await touch_conversation(db, conversation.id, messages[-1].created_at)
+    await db.commit()
+    return messages
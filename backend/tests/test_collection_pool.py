@@ -0,0 +1,104 @@
+# backend/tests/test_collection_pool.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.vector_store.collection_pool import CollectionRegistry, mark_collection_rebuilt
+
+
+class FakeStore:
+    """A handle that fails searches once closed, like an unmapped store would."""
+
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def search(self, seconds=0.0):
+        time.sleep(seconds)
+        assert not self.closed, f"{self.name} was closed during a search"
+        return self.name
+
+
+def make_registry(tmp_path, max_collections=1, open_seconds=0.0):
+    opened, closed = [], []
+
+    def opener(path, name):
+        time.sleep(open_seconds)
+        opened.append(name)
+        return FakeStore(name)
+
+    def closer(store):
+        store.closed = True
+        closed.append(store.name)
+
+    registry = CollectionRegistry(tmp_path, opener=opener, closer=closer, max_collections=max_collections)
+    return registry, opened, closed
+
+
+def test_evicted_handle_stays_open_until_its_search_returns(tmp_path):
+    registry, _, closed = make_registry(tmp_path)
+    searching = threading.Event()
+    finish = threading.Event()
+
+    def slow_search():
+        with registry.get("a") as store:
+            searching.set()
+            finish.wait(5)
+            return store.search()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        search = pool.submit(slow_search)
+        assert searching.wait(5)
+        # Opening a second collection evicts "a" while it is being searched
+        with registry.get("b") as store:
+            assert store.search() == "b"
+        assert closed == []
+        assert registry.stats()["deferred_closes"] == 1
+        finish.set()
+        assert search.result() == "a"
+
+    assert closed == ["a"]
+    assert list(registry.stats()["collections"]) == ["b"]
+
+
+def test_many_searches_while_collections_are_evicted(tmp_path):
+    registry, _, closed = make_registry(tmp_path, max_collections=2)
+    names = ["a", "b", "c", "d"]
+
+    def search(i):
+        with registry.get(names[i % len(names)]) as store:
+            return store.search(0.001)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(search, range(200)))
+
+    assert results == [names[i % len(names)] for i in range(200)]
+    assert registry.evictions > 0
+    assert len(closed) == registry.evictions
+    assert all(entry["borrows"] == 0 for entry in registry.stats()["collections"].values())
+
+
+def test_concurrent_callers_share_one_open(tmp_path):
+    registry, opened, _ = make_registry(tmp_path, max_collections=4, open_seconds=0.05)
+
+    def search(_):
+        with registry.get("a") as store:
+            return store.search()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(search, range(4))) == ["a"] * 4
+    assert opened == ["a"]
+
+
+def test_rebuilt_collection_is_reopened_after_in_flight_searches(tmp_path):
+    registry, opened, closed = make_registry(tmp_path, max_collections=4)
+    with registry.get("a") as old:
+        mark_collection_rebuilt(str(tmp_path / "a"))
+        with registry.get("a") as new:
+            assert new is not old
+        assert closed == []
+    assert closed == ["a"] and opened == ["a", "a"]
+
+    registry.invalidate()
+    assert closed == ["a", "a"]
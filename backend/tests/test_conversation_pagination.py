@@ -0,0 +1,63 @@
+# backend/tests/test_conversation_pagination.py
+
+from datetime import timedelta
+
+from fastapi import Response
+
+from app.api.conversations import get_conversations
+from conftest import T0, add_messages, create_conversation, create_user
+
+
+async def fetch(db, user, limit, before=None):
+    response = Response()
+    rows = await get_conversations(response, limit=limit, before=before, db=db, current_user=user)
+    return rows, response.headers.get("x-before-cursor")
+
+
+def test_pages_follow_recent_activity(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        conversations = [
+            await create_conversation(db, user, created_at=T0 + timedelta(minutes=i), title=f"c{i}")
+            for i in range(5)
+        ]
+        # A message moves the oldest conversation to the top
+        await add_messages(db, conversations[0], 1, start=T0 + timedelta(hours=1))
+
+        titles, cursor = [], None
+        while True:
+            rows, cursor = await fetch(db, user, limit=2, before=cursor)
+            titles.append([row.title for row in rows])
+            if cursor is None:
+                return titles
+
+    assert run_db(scenario) == [["c0", "c4"], ["c3", "c2"], ["c1"]]
+
+
+def test_preview_and_last_message_at(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        empty = await create_conversation(db, user, title="empty")
+        active = await create_conversation(db, user, created_at=T0 + timedelta(minutes=1), title="active")
+        messages = await add_messages(db, active, 3, start=T0 + timedelta(hours=1))
+        rows, _ = await fetch(db, user, limit=10)
+        return {row.title: row for row in rows}, messages[-1]
+
+    rows, last = run_db(scenario)
+    assert rows["active"].last_message_preview == "message 2"
+    assert rows["active"].last_message_at.replace(tzinfo=None) == last.created_at.replace(tzinfo=None)
+    # No messages yet: the stored sort key (creation time) is not reported as a message time
+    assert rows["empty"].last_message_preview is None
+    assert rows["empty"].last_message_at is None
+
+
+def test_only_own_conversations_are_listed(run_db):
+    async def scenario(db):
+        owner = await create_user(db)
+        other = await create_user(db, email="other@example.com")
+        await create_conversation(db, owner, title="mine")
+        await create_conversation(db, other, title="theirs")
+        rows, cursor = await fetch(db, owner, limit=10)
+        return [row.title for row in rows], cursor
+
+    assert run_db(scenario) == (["mine"], None)
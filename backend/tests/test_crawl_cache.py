@@ -0,0 +1,59 @@
+# backend/tests/test_crawl_cache.py
+
+from app.vector_store.crawl_cache import CrawlCache, content_hash
+
+URL = "https://example.com/page"
+
+
+def cached_page(tmp_path, html="<p>page</p>", **validators):
+    path = tmp_path / "page.html"
+    path.write_text(html, encoding="utf-8")
+    cache = CrawlCache(str(tmp_path))
+    cache.update(URL, file=str(path), hash=content_hash(html), **validators)
+    return cache, path
+
+
+def test_sitemap_lastmod_skips_the_fetch(tmp_path):
+    cache, _ = cached_page(tmp_path, lastmod="2025-01-01")
+    assert cache.unchanged_by_lastmod(URL, "2025-01-01")
+    assert not cache.unchanged_by_lastmod(URL, "2025-02-01")
+    assert not cache.unchanged_by_lastmod(URL, None)
+
+
+def test_etag_wins_over_last_modified(tmp_path):
+    cache, _ = cached_page(tmp_path, etag='"v1"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+    assert cache.conditional_headers(URL) == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+    assert cache.unchanged_by_headers(URL, '"v1"', "Thu, 02 Jan 2025 00:00:00 GMT")
+    assert not cache.unchanged_by_headers(URL, '"v2"', "Wed, 01 Jan 2025 00:00:00 GMT")
+    # Without an ETag from the server, Last-Modified decides
+    assert cache.unchanged_by_headers(URL, None, "Wed, 01 Jan 2025 00:00:00 GMT")
+    assert not cache.unchanged_by_headers(URL, None, None)
+
+
+def test_identical_content_is_not_rewritten(tmp_path):
+    cache, _ = cached_page(tmp_path)
+    assert cache.unchanged_by_hash(URL, content_hash("<p>page</p>"))
+    assert not cache.unchanged_by_hash(URL, content_hash("<p>page, edited</p>"))
+    assert not cache.unchanged_by_hash("https://example.com/other", content_hash("<p>page</p>"))
+
+
+def test_validators_persist_and_need_the_crawled_file(tmp_path):
+    cache, path = cached_page(tmp_path, etag='"v1"', lastmod="2025-01-01")
+    cache.save()
+
+    reloaded = CrawlCache(str(tmp_path))
+    assert reloaded.unchanged_by_headers(URL, '"v1"', None)
+    # A deleted file has to be fetched again, whatever the validators say
+    path.unlink()
+    assert reloaded.get(URL) is None
+    assert not reloaded.unchanged_by_lastmod(URL, "2025-01-01")
+    assert reloaded.conditional_headers(URL) == {}
+
+
+def test_forgotten_files_are_fetched_again(tmp_path):
+    cache, path = cached_page(tmp_path, lastmod="2025-01-01")
+    cache.forget_files([str(path)])
+    assert URL not in cache.entries
+    assert not cache.unchanged_by_lastmod(URL, "2025-01-01")
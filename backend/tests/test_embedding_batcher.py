@@ -0,0 +1,99 @@
+# backend/tests/test_embedding_batcher.py
+
+import asyncio
+import time
+
+import numpy as np
+
+from app.core import llm_responder
+from app.core.embedding_batcher import EmbeddingBatcher
+from app.core.inference import InferenceStage
+
+
+def make_batcher(**kwargs):
+    calls = []
+
+    def embed_batch(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    batcher = EmbeddingBatcher(embed_batch, InferenceStage("test-embedding", 1, 1), **kwargs)
+    return batcher, calls
+
+
+def test_flushes_as_soon_as_the_batch_is_full():
+    batcher, calls = make_batcher(max_batch_size=3, max_wait_ms=10_000)
+
+    async def main():
+        started = time.monotonic()
+        vectors = await asyncio.gather(*(batcher.embed(text) for text in ["a", "bb", "ccc"]))
+        return vectors, time.monotonic() - started
+
+    vectors, elapsed = asyncio.run(main())
+    assert vectors == [[1.0], [2.0], [3.0]]
+    assert calls == [["a", "bb", "ccc"]]
+    assert elapsed < 5
+
+
+def test_flushes_a_partial_batch_after_the_wait():
+    batcher, calls = make_batcher(max_batch_size=16, max_wait_ms=20)
+
+    async def main():
+        first = asyncio.ensure_future(batcher.embed("a"))
+        await asyncio.sleep(0.005)
+        second = asyncio.ensure_future(batcher.embed("a"))
+        await asyncio.sleep(0)
+        assert calls == [] and batcher.stats()["pending"] == 2
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(main()) == [[1.0], [1.0]]
+    # Identical texts are embedded once
+    assert calls == [["a"]]
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["items"] == 2
+
+
+class FakeSentenceTransformer:
+    def __init__(self, prompts=None):
+        self.prompts = prompts or {}
+        self.calls = []
+
+    def encode(self, texts, prompt=""):
+        self.calls.append((list(texts), prompt))
+        return np.array([[float(len(prompt + text))] for text in texts])
+
+
+class FakeEmbeddings:
+    """HuggingFaceEmbeddings' surface: documents and queries may be encoded differently."""
+
+    def __init__(self, client, query_encode_kwargs=None):
+        self._client = client
+        self.query_encode_kwargs = query_encode_kwargs
+
+    def embed_documents(self, texts):
+        return self._client.encode(texts).tolist()
+
+    def embed_query(self, text):
+        if self.query_encode_kwargs:
+            return self._client.encode([text], **self.query_encode_kwargs).tolist()[0]
+        prompt = self._client.prompts.get("query", "")
+        return self._client.encode([text], prompt=prompt).tolist()[0]
+
+
+def test_batched_queries_match_embed_query(monkeypatch):
+    texts = ["short", "a longer query"]
+    for embeddings in [
+        FakeEmbeddings(FakeSentenceTransformer(), query_encode_kwargs={"prompt": "query: "}),
+        FakeEmbeddings(FakeSentenceTransformer(prompts={"query": "Represent this question: "})),
+        FakeEmbeddings(FakeSentenceTransformer()),
+    ]:
+        monkeypatch.setattr(llm_responder, "get_embedding_function", lambda: embeddings)
+        assert llm_responder.embed_queries(texts) == [embeddings.embed_query(text) for text in texts]
+
+
+def test_query_encode_kwargs_are_one_forward_pass(monkeypatch):
+    client = FakeSentenceTransformer()
+    embeddings = FakeEmbeddings(client, query_encode_kwargs={"prompt": "query: "})
+    monkeypatch.setattr(llm_responder, "get_embedding_function", lambda: embeddings)
+
+    llm_responder.embed_queries(["a", "b\nc"])
+    assert client.calls == [(["a", "b c"], "query: ")]
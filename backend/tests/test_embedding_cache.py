@@ -0,0 +1,73 @@
+# backend/tests/test_embedding_cache.py
+
+from types import SimpleNamespace
+
+from app.core import embedding_cache
+from app.core.embedding_cache import EmbeddingCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def use_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(embedding_cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EmbeddingCache("model", max_entries=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    assert cache.get("a") == [1.0]
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0] and cache.get("c") == [3.0]
+    # Whitespace differences share one entry
+    assert cache.get("  c ") == [3.0]
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = use_clock(monkeypatch)
+    cache = EmbeddingCache("model", ttl_seconds=60)
+    cache.put("a", [1.0])
+    clock.now += 59
+    assert cache.get("a") == [1.0]
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_tier_serves_evicted_entries_and_survives_restarts(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache("model", max_entries=1, disk_path=path)
+    cache.put("a", [0.5, 0.25])
+    cache.put("b", [1.0, 2.0])
+
+    # "a" fell out of memory but is still on disk, and a disk hit is promoted
+    assert cache.get("a") is None
+    assert cache.load("a") == [0.5, 0.25]
+    assert cache.get("a") == [0.5, 0.25]
+
+    restarted = EmbeddingCache("model", disk_path=path)
+    assert restarted.get("b") is None and restarted.load("b") == [1.0, 2.0]
+    # Another model never sees these vectors
+    assert EmbeddingCache("other-model", disk_path=path).load("b") is None
+    assert (cache.stats()["disk_hits"], restarted.stats()["disk_hits"]) == (1, 1)
+
+
+def test_expired_disk_rows_are_misses(tmp_path, monkeypatch):
+    clock = use_clock(monkeypatch)
+    path = str(tmp_path / "embeddings.sqlite")
+    EmbeddingCache("model", disk_path=path).put("a", [1.0])
+
+    clock.now += 120
+    cache = EmbeddingCache("model", ttl_seconds=60, disk_path=path)
+    assert cache.load("a") is None
+    assert cache.stats()["misses"] == 1 and cache.stats()["entries"] == 0
@@ -0,0 +1,48 @@
+# backend/tests/test_inference.py
+
+import asyncio
+import threading
+import time
+
+from app.core.inference import InferenceStage
+
+
+def test_stage_caps_concurrent_calls_and_keeps_the_loop_free():
+    stage = InferenceStage("test", max_workers=4, max_concurrency=2)
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def blocking_call(i):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return i
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticking = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(stage.run(blocking_call, i) for i in range(6)))
+        ticking.cancel()
+        return results, ticks
+
+    try:
+        results, ticks = asyncio.run(main())
+    finally:
+        stage.shutdown()
+
+    assert results == list(range(6))
+    assert peak == 2
+    # The loop kept running while the blocking calls ran on the pool
+    assert ticks > 10
+    assert stage.stats()["completed"] == 6 and stage.stats()["in_flight"] == 0
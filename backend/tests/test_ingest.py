@@ -0,0 +1,229 @@
+# backend/tests/test_ingest.py
+
+import asyncio
+import os
+import time
+
+from app.vector_store import ingest
+from app.vector_store.ingest import FileReport, iter_html_chunk_batches
+
+
+def write_pages(directory, count):
+    paths = []
+    for i in range(count):
+        path = directory / f"page{i}.html"
+        path.write_text(f"<html><body><p>page {i}</p></body></html>", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_parse_workers_are_spawned_not_forked(tmp_path):
+    assert ingest.INGEST_START_METHOD == "spawn"
+    files = write_pages(tmp_path, 3)
+    report: list[FileReport] = []
+
+    batches = list(iter_html_chunk_batches(str(tmp_path), workers=2, report=report, files=files))
+
+    # Every file comes back from a worker process (parsed, or with its error recorded)
+    assert sorted(f for _, batch_files in batches for f in batch_files) == files
+    assert sorted(r.path for r in report) == files
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeCollection:
+    """Chroma's upsert; optionally dies right after storing its N-th batch."""
+
+    def __init__(self, die_after_batch=None):
+        self.die_after_batch = die_after_batch
+        self.upserts: list[list[str]] = []
+        self.sources: dict[str, str] = {}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        assert len(ids) == len(embeddings) == len(documents)
+        self.upserts.append(list(ids))
+        self.sources.update((id_, m["source"]) for id_, m in zip(ids, metadatas))
+        if len(self.upserts) == self.die_after_batch:
+            # Stored, but the process dies before the checkpoint records the batch
+            raise Interrupted()
+
+
+class FakeChroma:
+    def __init__(self, collection):
+        self._collection = collection
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_interrupted_ingest_resumes_without_duplicates(tmp_path, monkeypatch):
+    from langchain_core.documents import Document
+
+    input_dir = tmp_path / "pages"
+    input_dir.mkdir()
+    files = write_pages(input_dir, 5)
+    parsed = []
+
+    def load_and_chunk(file_path, chunk_size, chunk_overlap):
+        # Two chunks per page, without needing the HTML parser
+        parsed.append(file_path)
+        chunks = [Document(page_content=f"{file_path} part {i}", metadata={"source": file_path}) for i in range(2)]
+        return file_path, chunks, 0.0, None
+
+    monkeypatch.setattr(ingest, "_load_and_chunk_file", load_and_chunk)
+    checkpoint_path = str(tmp_path / "chroma" / ingest.CHECKPOINT_FILENAME)
+
+    # First run: one page per batch, dies right after storing the third batch
+    collection = FakeCollection(die_after_batch=3)
+    checkpoint = ingest.IngestCheckpoint(path=checkpoint_path, input_dir=str(input_dir), incremental=False)
+    checkpoint.start()
+    try:
+        ingest.run_ingest_pipeline(
+            FakeChroma(collection), FakeEmbeddings(), str(input_dir), files, {}, checkpoint, [], workers=1, batch_size=2
+        )
+    except Interrupted:
+        pass
+    else:
+        raise AssertionError("the first run should have been interrupted")
+
+    # Resume the way ingest_collection does: skip checkpointed files, and chunks
+    # that made it into the collection without being checkpointed
+    resumed = ingest.IngestCheckpoint.load(checkpoint_path, str(input_dir))
+    assert resumed.completed_files == set(files[:2])
+    remaining = [f for f in files if f not in resumed.completed_files]
+    parsed.clear()
+    collection.die_after_batch = None
+    ingest.run_ingest_pipeline(
+        FakeChroma(collection), FakeEmbeddings(), str(input_dir), remaining, dict(collection.sources),
+        resumed, [], workers=1, batch_size=2,
+    )
+
+    assert parsed == files[2:]
+    stored_ids = [id_ for batch in collection.upserts for id_ in batch]
+    assert len(stored_ids) == len(set(stored_ids)) == 10
+    assert resumed.completed_files == set(files)
+    # The third page was stored by the first run; the resumed run only re-checked it
+    assert resumed.added == 8
+
+
+def test_bounded_queues_hold_back_parsing(tmp_path, monkeypatch):
+    from langchain_core.documents import Document
+
+    input_dir = tmp_path / "pages"
+    input_dir.mkdir()
+    files = write_pages(input_dir, 20)
+    parsed = []
+
+    def load_and_chunk(file_path, chunk_size, chunk_overlap):
+        parsed.append(file_path)
+        return file_path, [Document(page_content=file_path, metadata={"source": file_path})], 0.0, None
+
+    class SlowCollection(FakeCollection):
+        def upsert(self, ids, embeddings, documents, metadatas):
+            # Parsing may run ahead of storage by at most the two queues plus the
+            # batch each stage is working on
+            assert len(parsed) - len(self.upserts) <= 2 * ingest.INGEST_QUEUE_SIZE + 3
+            super().upsert(ids, embeddings, documents, metadatas)
+            time.sleep(0.005)
+
+    monkeypatch.setattr(ingest, "_load_and_chunk_file", load_and_chunk)
+    collection = SlowCollection()
+    checkpoint = ingest.IngestCheckpoint(path=str(tmp_path / "ckpt.jsonl"), input_dir=str(input_dir), incremental=False)
+    checkpoint.start()
+    added = ingest.run_ingest_pipeline(
+        FakeChroma(collection), FakeEmbeddings(), str(input_dir), files, {}, checkpoint, [], workers=1, batch_size=1
+    )
+    assert added == 20 and len(collection.upserts) == 20
+
+
+class FakeChromaStore:
+    """The slice of langchain's Chroma that ingest_collection uses, kept per directory."""
+
+    stores: dict = {}
+
+    def __new__(cls, persist_directory, collection_name, embedding_function):
+        if persist_directory not in cls.stores:
+            os.makedirs(persist_directory, exist_ok=True)
+            store = super().__new__(cls)
+            store._collection = FakeCollection()
+            cls.stores[persist_directory] = store
+        return cls.stores[persist_directory]
+
+    def __init__(self, persist_directory, collection_name, embedding_function):
+        pass
+
+    def get(self, include):
+        ids = list(self._collection.sources)
+        return {"ids": ids, "metadatas": [{"source": self._collection.sources[id_]} for id_ in ids]}
+
+    def delete(self, ids):
+        for id_ in ids:
+            del self._collection.sources[id_]
+
+
+def test_incremental_ingest_only_touches_changed_sources(tmp_path, monkeypatch):
+    from langchain_core.documents import Document
+
+    input_dir = tmp_path / "pages"
+    input_dir.mkdir()
+    parse_errors = {}
+
+    def load_and_chunk(file_path, chunk_size, chunk_overlap):
+        # One chunk per "|"-separated part of the page
+        if file_path in parse_errors:
+            return file_path, [], 0.0, parse_errors[file_path]
+        with open(file_path, encoding="utf-8") as f:
+            parts = f.read().split("|")
+        return file_path, [Document(page_content=p, metadata={"source": file_path}) for p in parts], 0.0, None
+
+    def write(name, text):
+        (input_dir / name).write_text(text, encoding="utf-8")
+        return str(input_dir / name)
+
+    monkeypatch.setattr(ingest, "_load_and_chunk_file", load_and_chunk)
+    monkeypatch.setattr(ingest, "Chroma", FakeChromaStore)
+    monkeypatch.setattr(ingest, "HuggingFaceEmbeddings", lambda model_name: FakeEmbeddings())
+    monkeypatch.setattr(ingest, "CHROMA_BASE_PATH", tmp_path / "chroma")
+    monkeypatch.setattr(FakeChromaStore, "stores", {})
+
+    def ingest_pages(incremental):
+        return asyncio.run(ingest.ingest_collection(
+            "docs", str(input_dir), "Docs", db=None, workers=1, incremental=incremental
+        ))
+
+    unchanged = write("unchanged.html", "alpha one|alpha two")
+    changed = write("changed.html", "beta")
+    vanished = write("vanished.html", "gamma")
+    ingest_pages(incremental=False)
+    (store,) = FakeChromaStore.stores.values()
+    first_ids = {
+        source: {id_ for id_, s in store._collection.sources.items() if s == source}
+        for source in (unchanged, changed, vanished)
+    }
+    assert [len(first_ids[s]) for s in (unchanged, changed, vanished)] == [2, 1, 1]
+
+    write("changed.html", "beta, edited")
+    os.remove(vanished)
+    added = write("added.html", "delta")
+    store._collection.upserts.clear()
+    assert ingest_pages(incremental=True) == []
+
+    sources = store._collection.sources
+    upserted = {id_ for batch in store._collection.upserts for id_ in batch}
+    # Unchanged chunks keep their ids and are not embedded or written again
+    assert first_ids[unchanged] <= set(sources) and not first_ids[unchanged] & upserted
+    # The edited page's old chunk and the vanished page's chunk are gone
+    assert not (first_ids[changed] | first_ids[vanished]) & set(sources)
+    assert sorted(sources[id_] for id_ in upserted) == sorted([changed, added])
+    assert sorted(sources.values()) == sorted([unchanged, unchanged, changed, added])
+
+    # A page that fails to parse keeps its previous chunks
+    parse_errors[changed] = "ParserError()"
+    store._collection.upserts.clear()
+    assert ingest_pages(incremental=True) == [changed]
+    assert sorted(sources.values()) == sorted([unchanged, unchanged, changed, added])
+    assert store._collection.upserts == []
@@ -0,0 +1,151 @@
+# backend/tests/test_job_queue.py
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.db.models import GenerationJob, JobStatusEnum
+from app.jobs import queue
+from app.jobs.queue import (
+    JobLease, LeaseLost, claim_next_job, complete_job, enqueue_generation, fail_job, release_job, renew_lease,
+)
+from conftest import add_messages, create_conversation, create_user
+
+
+@pytest.fixture(autouse=True)
+def fresh_depth_gauge():
+    # The depth reading is cached per process; each test has its own database
+    queue._depth.value = 0
+    queue._depth.read_at = 0.0
+
+
+async def enqueue(db):
+    user = await create_user(db)
+    conversation = await create_conversation(db, user)
+    (message,) = await add_messages(db, conversation, 1)
+    job_id = await enqueue_generation(db, user.id, conversation.id, conversation.vector_context_id, message.id)
+    await db.commit()
+    return job_id
+
+
+async def set_job(db, job_id, **values):
+    await db.execute(update(GenerationJob).where(GenerationJob.id == job_id).values(**values))
+    await db.commit()
+
+
+async def reload(db, job_id) -> GenerationJob:
+    job = await db.get(GenerationJob, job_id)
+    await db.refresh(job)
+    return job
+
+
+def test_claim_runs_a_job_once(run_db):
+    async def scenario(db):
+        job_id = await enqueue(db)
+        job = await claim_next_job(db, "worker-a")
+        second = await claim_next_job(db, "worker-b")
+        return job, second, await reload(db, job_id)
+
+    job, second, stored = run_db(scenario)
+    assert job.locked_by == "worker-a" and job.attempts == 1
+    assert second is None
+    assert stored.status == JobStatusEnum.running
+
+
+def test_complete_and_release(run_db):
+    async def scenario(db):
+        job_id = await enqueue(db)
+        await claim_next_job(db, "worker-a")
+        await release_job(db, job_id, "worker-a")
+        released = await reload(db, job_id)
+        released = (released.status, released.attempts, released.locked_by)
+
+        job = await claim_next_job(db, "worker-a")
+        completed = await complete_job(db, job.id, "worker-a")
+        return released, completed, await reload(db, job_id)
+
+    released, completed, stored = run_db(scenario)
+    # A released job is not charged an attempt
+    assert released == (JobStatusEnum.queued, 0, None)
+    assert completed
+    assert stored.status == JobStatusEnum.succeeded and stored.locked_by is None
+
+
+def test_failed_job_is_retried_after_backoff_then_fails(run_db):
+    async def scenario(db):
+        job_id = await enqueue(db)
+        job = await claim_next_job(db, "worker-a")
+        assert await fail_job(db, job, "worker-a", "boom")
+        stored = await reload(db, job_id)
+        assert stored.status == JobStatusEnum.queued
+        assert stored.last_error == "boom"
+
+        # Not due until the backoff has passed
+        assert await claim_next_job(db, "worker-a") is None
+        await set_job(db, job_id, run_after=datetime.now(timezone.utc) - timedelta(seconds=1))
+        job = await claim_next_job(db, "worker-a")
+        assert job.attempts == 2
+
+        await set_job(db, job_id, max_attempts=2)
+        job.max_attempts = 2
+        assert await fail_job(db, job, "worker-a", "boom again")
+        return await reload(db, job_id)
+
+    stored = run_db(scenario)
+    assert stored.status == JobStatusEnum.failed
+    assert stored.last_error == "boom again"
+
+
+def test_abandoned_job_is_not_retried(run_db):
+    async def scenario(db):
+        job_id = await enqueue(db)
+        job = await claim_next_job(db, "worker-a")
+        await fail_job(db, job, "worker-a", "gone", retry=False)
+        return await reload(db, job_id)
+
+    assert run_db(scenario).status == JobStatusEnum.failed
+
+
+def test_expired_lease_is_taken_over(run_db):
+    async def scenario(db):
+        job_id = await enqueue(db)
+        await claim_next_job(db, "worker-a")
+        lease = JobLease(job_id, "worker-a")
+        # worker-a stops renewing; its lease runs out
+        expired = datetime.now(timezone.utc) - timedelta(seconds=queue.GENERATION_JOB_LEASE_SECONDS + 1)
+        await set_job(db, job_id, locked_at=expired)
+
+        job = await claim_next_job(db, "worker-b")
+        assert job.locked_by == "worker-b" and job.attempts == 2
+
+        # The old owner can neither keep, save, fail nor complete the job
+        assert not await lease.renew(db)
+        with pytest.raises(LeaseLost):
+            lease.check()
+        with pytest.raises(LeaseLost):
+            await JobLease(job_id, "worker-a").guard(db)
+        await db.rollback()
+        assert not await fail_job(db, await reload(db, job_id), "worker-a", "late failure")
+        assert not await complete_job(db, job_id, "worker-a")
+        await release_job(db, job_id, "worker-a")
+
+        assert await renew_lease(db, job_id, "worker-b")
+        await JobLease(job_id, "worker-b").guard(db)
+        await db.commit()
+        return await reload(db, job_id)
+
+    stored = run_db(scenario)
+    assert stored.status == JobStatusEnum.running
+    assert stored.locked_by == "worker-b"
+    assert stored.last_error is None
+
+
+def test_lease_check_fails_when_renewals_stall():
+    lease = JobLease(None, "worker-a", lease_seconds=0.03)
+    lease.check()
+    time.sleep(0.03)
+    with pytest.raises(LeaseLost):
+        lease.check()
+    assert lease.lost
@@ -0,0 +1,64 @@
+# backend/tests/test_llm_responder.py
+
+from langchain_core.documents import Document
+from sqlalchemy import func, select
+
+from app.core import llm_responder
+from app.db.models import Message, TokenUsage, VectorContext
+from app.websockets.manager import manager
+from conftest import create_conversation, create_user
+
+
+class FakeAnswerCache:
+    def __init__(self, answer):
+        self.answer = answer
+
+    def lookup(self, *args):
+        return self.answer
+
+    def store(self, *args):
+        raise AssertionError("a cached answer must not be stored again")
+
+
+class FakeRegistry:
+    def version(self, name):
+        return 1
+
+
+def test_cached_answers_are_not_billed(run_db, monkeypatch):
+    sent, billed = [], []
+
+    async def retrieve_context(collection_name, query_text, k=3, vector_backend="chroma"):
+        return [1.0, 0.0], [(Document(page_content="context", id="chunk-1"), 0.1)]
+
+    async def send_message(conversation_id, payload):
+        sent.append(payload)
+
+    async def llm_chat(prompt):
+        raise AssertionError("a cached answer must not call the LLM")
+
+    monkeypatch.setattr(llm_responder, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(llm_responder, "retrieve_context", retrieve_context)
+    monkeypatch.setattr(llm_responder, "answer_cache", FakeAnswerCache("cached answer"))
+    monkeypatch.setattr(llm_responder, "registry_for", lambda vector_backend: FakeRegistry())
+    monkeypatch.setattr(llm_responder, "llm_chat", llm_chat)
+    monkeypatch.setattr(manager, "send_message", send_message)
+    monkeypatch.setattr(llm_responder, "record_token_usage", lambda *args: billed.append(args))
+
+    async def scenario(db):
+        user = await create_user(db)
+        conversation = await create_conversation(db, user)
+        question = Message(conversation_id=conversation.id, role="user", content="question")
+        db.add(question)
+        await db.commit()
+        context = await db.get(VectorContext, conversation.vector_context_id)
+
+        await llm_responder.generate_llm_response(db, user, conversation.id, question, context)
+
+        usage = await db.scalar(select(func.count()).select_from(TokenUsage))
+        reply = await db.scalar(select(Message.content).where(Message.role == "assistant"))
+        return usage, reply
+
+    assert run_db(scenario) == (0, "cached answer")
+    assert sent[-1]["content"] == "cached answer"
+    assert billed == []
@@ -0,0 +1,83 @@
+# backend/tests/test_message_pagination.py
+
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.messages import get_messages
+from conftest import add_messages, create_conversation, create_user
+
+
+async def fetch(db, user, conversation, limit, before=None, after=None):
+    response = await get_messages(
+        conversation.id, limit=limit, before=before, after=after, db=db, current_user=user
+    )
+    return [m["content"] for m in json.loads(response.body)], response.headers
+
+
+def test_latest_page_then_older_pages_until_exhausted(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        conversation = await create_conversation(db, user)
+        await add_messages(db, conversation, 5)
+
+        page, headers = await fetch(db, user, conversation, limit=2)
+        assert page == ["message 3", "message 4"]
+
+        pages = [page]
+        while "x-before-cursor" in headers:
+            page, headers = await fetch(db, user, conversation, limit=2, before=headers["x-before-cursor"])
+            pages.append(page)
+        return pages
+
+    assert run_db(scenario) == [["message 3", "message 4"], ["message 1", "message 2"], ["message 0"]]
+
+
+def test_no_before_cursor_when_everything_fits(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        conversation = await create_conversation(db, user)
+        await add_messages(db, conversation, 3)
+        return await fetch(db, user, conversation, limit=3)
+
+    page, headers = run_db(scenario)
+    assert page == ["message 0", "message 1", "message 2"]
+    assert "x-before-cursor" not in headers
+
+
+def test_after_cursor_returns_only_newer_messages(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        conversation = await create_conversation(db, user)
+        messages = await add_messages(db, conversation, 3)
+        _, headers = await fetch(db, user, conversation, limit=10)
+        await add_messages(db, conversation, 2, start=messages[-1].created_at.replace(microsecond=1))
+        return await fetch(db, user, conversation, limit=10, after=headers["x-after-cursor"])
+
+    page, headers = run_db(scenario)
+    assert page == ["message 0", "message 1"]
+    assert headers["x-has-more"] == "false"
+
+
+def test_other_users_conversation_is_not_found(run_db):
+    async def scenario(db):
+        owner = await create_user(db)
+        other = await create_user(db, email="other@example.com")
+        conversation = await create_conversation(db, owner)
+        await fetch(db, other, conversation, limit=10)
+
+    with pytest.raises(HTTPException) as exc:
+        run_db(scenario)
+    assert exc.value.status_code == 404
+
+
+def test_invalid_cursor_is_rejected(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        conversation = await create_conversation(db, user)
+        await fetch(db, user, conversation, limit=10, before="not-a-cursor")
+
+    with pytest.raises(HTTPException) as exc:
+        run_db(scenario)
+    assert exc.value.status_code == 400
@@ -0,0 +1,144 @@
+# backend/tests/test_numpy_store.py
+
+import os
+
+import numpy as np
+import pytest
+
+from app.vector_store import numpy_store
+from app.vector_store.numpy_store import NumpyVectorStore, export_chroma_collection, numpy_store_path
+
+
+class FakeCollection:
+    """Serves a Chroma collection's `count`/`get` pages and records the page sizes."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.ids = [f"id{i}" for i in range(len(embeddings))]
+        self.pages = []
+
+    def count(self):
+        return len(self.embeddings)
+
+    def get(self, include, limit=None, offset=0):
+        if limit is None:
+            return {"ids": list(self.ids)}
+        rows = range(offset, min(offset + limit, len(self.embeddings)))
+        self.pages.append(len(rows))
+        return {
+            "ids": [self.ids[i] for i in rows],
+            "embeddings": self.embeddings[offset:offset + limit].tolist(),
+            "documents": [f"doc {i}" for i in rows],
+            "metadatas": [{"source": f"page{i}.html"} for i in rows],
+        }
+
+
+class FakeChroma:
+    def __init__(self, embeddings):
+        self._collection = FakeCollection(embeddings)
+
+
+def embeddings(rows, dim=8, seed=1):
+    return np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+
+
+def top_id(path, query):
+    store = NumpyVectorStore(path)
+    (document, _), = store.similarity_search_by_vector_with_relevance_scores(query, k=1)
+    return document.id, store.manifest
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_export_streams_batches_into_a_searchable_store(tmp_path, dtype):
+    vectors = embeddings(25)
+    chroma = FakeChroma(vectors)
+    path = numpy_store_path(str(tmp_path))
+
+    count, report = export_chroma_collection(chroma, path, dtype=dtype, batch_size=10)
+
+    assert count == 25
+    assert chroma._collection.pages == [10, 10, 5]
+    assert {row["dtype"] for row in report} == {"float32", "float16", "int8"}
+    found, manifest = top_id(path, vectors[17])
+    assert found == "id17"
+    assert manifest["dtype"] == dtype and manifest["count"] == 25
+    assert manifest["rerank"] == (dtype != "float32")
+
+
+def test_export_swaps_versions_through_a_symlink(tmp_path):
+    path = numpy_store_path(str(tmp_path))
+    first = embeddings(6, seed=1)
+    export_chroma_collection(FakeChroma(first), path)
+    old_target = os.path.realpath(path)
+    reader = NumpyVectorStore(path)
+
+    second = embeddings(9, seed=2)
+    export_chroma_collection(FakeChroma(second), path)
+
+    assert os.path.islink(path)
+    assert os.path.realpath(path) != old_target
+    # An open reader keeps its version; new readers get the new one
+    assert len(reader) == 6 and len(NumpyVectorStore(path)) == 9
+
+    export_chroma_collection(FakeChroma(first), path)
+    versions = sorted(e for e in os.listdir(tmp_path) if e.startswith(numpy_store.NUMPY_DIRNAME + numpy_store.VERSION_SUFFIX))
+    # Only the current version and the one it replaced remain
+    assert len(versions) == 2
+    assert not os.path.exists(old_target)
+
+
+def test_a_plain_directory_store_is_replaced(tmp_path):
+    path = numpy_store_path(str(tmp_path))
+    os.makedirs(path)
+    open(os.path.join(path, numpy_store.MANIFEST_FILENAME), "w").close()
+
+    export_chroma_collection(FakeChroma(embeddings(3)), path)
+
+    assert os.path.islink(path)
+    assert len(NumpyVectorStore(path)) == 3
+
+
+def test_empty_collection(tmp_path):
+    path = numpy_store_path(str(tmp_path))
+    count, report = export_chroma_collection(FakeChroma(np.zeros((0, 8), dtype=np.float32)), path, dtype="int8")
+    assert (count, report) == (0, [])
+    assert NumpyVectorStore(path).similarity_search_by_vector_with_relevance_scores(np.ones(8), k=3) == []
+
+
+def test_refresh_keeps_the_stored_dtype_and_rerank(tmp_path):
+    path = numpy_store_path(str(tmp_path))
+    export_chroma_collection(FakeChroma(embeddings(4)), path, dtype="int8", rerank=False)
+    manifest = numpy_store.read_manifest(path)
+
+    assert numpy_store.store_settings(manifest, None, None) == ("int8", False)
+    assert numpy_store.same_store_settings(manifest, "int8", False)
+    # Explicit settings win, and a new dtype re-ranks unless told otherwise
+    assert numpy_store.store_settings(manifest, "float16", None) == ("float16", True)
+    assert not numpy_store.same_store_settings(manifest, "int8", True)
+    assert numpy_store.store_settings(None, None, None) == ("float32", True)
+    assert numpy_store.read_manifest(str(tmp_path / "missing")) is None
+
+
+def test_rows_shifting_during_export_keep_the_current_store(tmp_path):
+    path = numpy_store_path(str(tmp_path))
+    export_chroma_collection(FakeChroma(embeddings(25)), path)
+    current = os.path.realpath(path)
+
+    class ShiftingCollection(FakeCollection):
+        def get(self, include, limit=None, offset=0):
+            page = super().get(include, limit, offset)
+            if len(self.pages) == 1 and limit is not None:
+                # A writer deletes the first row and adds one after the first page:
+                # the count still matches, but the second page skips a row
+                self.ids = self.ids[1:] + ["new"]
+                self.embeddings = np.concatenate([self.embeddings[1:], embeddings(1, seed=3)])
+            return page
+
+    chroma = FakeChroma(embeddings(25))
+    chroma._collection = ShiftingCollection(chroma._collection.embeddings)
+    with pytest.raises(RuntimeError, match="collection changed during export"):
+        export_chroma_collection(chroma, path, batch_size=10)
+
+    assert os.path.realpath(path) == current and len(NumpyVectorStore(path)) == 25
+    versions = [e for e in os.listdir(tmp_path) if e.startswith(numpy_store.NUMPY_DIRNAME + numpy_store.VERSION_SUFFIX)]
+    assert versions == [os.path.basename(current)]
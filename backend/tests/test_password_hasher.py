@@ -0,0 +1,48 @@
+# backend/tests/test_password_hasher.py
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import auth
+from app.core import security
+from app.core.security import PasswordHasher, PasswordHasherBusy
+from app.schemas.auth import LoginRequest
+from conftest import create_user
+
+
+def test_calls_beyond_workers_and_queue_fail_fast():
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        # One call running and one queued fill the hasher
+        held = [asyncio.ensure_future(hasher.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run(release.wait, 5)
+        release.set()
+        await asyncio.gather(*held)
+        # Capacity is back once the pending calls finish
+        return await hasher.run(lambda: "hashed")
+
+    assert asyncio.run(main()) == "hashed"
+    assert hasher.stats()["rejected"] == 1 and hasher.stats()["completed"] == 3
+
+
+def test_a_saturated_hasher_answers_503(run_db, monkeypatch):
+    busy = PasswordHasher(max_workers=1, max_queue=0)
+    busy.pending = 1
+    monkeypatch.setattr(security, "password_hasher", busy)
+
+    async def scenario(db):
+        await create_user(db, "user@example.com")
+        with pytest.raises(HTTPException) as err:
+            await auth.login_user(LoginRequest(email="user@example.com", password="secret"), db=db)
+        return err.value
+
+    error = run_db(scenario)
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
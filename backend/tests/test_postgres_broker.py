@@ -0,0 +1,129 @@
+# backend/tests/test_postgres_broker.py
+
+import asyncio
+import json
+import uuid
+
+from app.websockets import broker as broker_module
+from app.websockets.broker import PostgresBroker, channel_name
+
+
+class FakeDriverConnection:
+    """The parts of an asyncpg connection the LISTEN side uses."""
+
+    def __init__(self):
+        self.listeners = {}
+        self.termination_listeners = []
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def remove_listener(self, channel, callback):
+        self.listeners.pop(channel, None)
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def execute(self, query, timeout=None):
+        return "SELECT 1"
+
+    def notify(self, channel, frames):
+        self.listeners[channel](self, 1, channel, json.dumps({"f": frames}))
+
+    def terminate(self):
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+class FakeConnection:
+    def __init__(self, driver_connection):
+        self.driver_connection = driver_connection
+
+    async def get_raw_connection(self):
+        return self
+
+    async def invalidate(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeEngine:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.drivers = []
+
+    async def connect(self):
+        if self.drivers and self.failures:
+            self.failures -= 1
+            raise OSError("connection refused")
+        self.drivers.append(FakeDriverConnection())
+        return FakeConnection(self.drivers[-1])
+
+
+async def wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+def test_listen_connection_is_re_established_after_a_drop(monkeypatch):
+    monkeypatch.setattr(broker_module, "PG_RECONNECT_INITIAL_SECONDS", 0.01)
+    conversation_id = uuid.uuid4()
+    channel = channel_name(conversation_id)
+
+    async def main():
+        received = []
+
+        async def handler(cid, frames):
+            received.append((cid, frames))
+
+        engine = FakeEngine(failures=2)
+        broker = PostgresBroker(engine)
+        await broker.start(handler)
+        await broker.subscribe(conversation_id)
+
+        engine.drivers[0].terminate()
+        await wait_for(lambda: broker.reconnects == 1)
+
+        # Two failed attempts, then a fresh connection listening to the same channel
+        driver = engine.drivers[-1]
+        assert len(engine.drivers) == 2
+        assert channel in driver.listeners
+        driver.notify(channel, [{"type": "delta"}])
+        await wait_for(lambda: received)
+        await wait_for(lambda: not broker._tasks)
+
+        stats = broker.stats()
+        await broker.close()
+        return received, stats
+
+    received, stats = asyncio.run(main())
+    assert received == [(conversation_id, [{"type": "delta"}])]
+    assert stats["connected"] and stats["reconnects"] == 1 and stats["channels"] == 1
+
+
+def test_subscribe_while_disconnected_listens_after_reconnect(monkeypatch):
+    monkeypatch.setattr(broker_module, "PG_RECONNECT_INITIAL_SECONDS", 0.05)
+    conversation_id = uuid.uuid4()
+
+    async def main():
+        async def handler(cid, frames):
+            pass
+
+        engine = FakeEngine(failures=1)
+        broker = PostgresBroker(engine)
+        await broker.start(handler)
+        engine.drivers[0].terminate()
+        await wait_for(lambda: not broker.stats()["connected"])
+
+        await broker.subscribe(conversation_id)
+        await wait_for(lambda: broker.reconnects == 1)
+        listening = channel_name(conversation_id) in engine.drivers[-1].listeners
+        await broker.close()
+        return listening
+
+    assert asyncio.run(main())
@@ -0,0 +1,35 @@
+# backend/tests/test_stats_access.py
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import dependencies
+from app.core.dependencies import TokenUser, require_stats_access
+from app.websockets.connection import ClientConnection
+from conftest import T0
+
+
+def user(email):
+    return TokenUser(id=uuid.uuid4(), name="User", email=email, created_at=T0)
+
+
+def test_stats_are_limited_to_admin_emails(monkeypatch):
+    monkeypatch.setattr(dependencies, "STATS_ADMIN_EMAILS", {"ops@example.com"})
+    assert asyncio.run(require_stats_access(user("Ops@example.com"))).email == "Ops@example.com"
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(require_stats_access(user("someone@example.com")))
+    assert err.value.status_code == 403
+
+
+def test_any_signed_in_user_without_admin_list(monkeypatch):
+    monkeypatch.setattr(dependencies, "STATS_ADMIN_EMAILS", set())
+    asyncio.run(require_stats_access(user("someone@example.com")))
+
+
+def test_connection_stats_leave_out_the_conversation():
+    conversation_id = uuid.uuid4()
+    connection = ClientConnection(conversation_id, websocket=None)
+    assert str(conversation_id) not in str(connection.stats())
@@ -0,0 +1,59 @@
+# backend/tests/test_usage_rollups.py
+
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from app.db.models import TokenUsageRollup
+from app.db.rollups import increment_usage_rollups
+from conftest import T0, create_conversation, create_user
+
+
+async def rollup_rows(db, vector_context_id):
+    result = await db.execute(
+        select(TokenUsageRollup)
+        .where(TokenUsageRollup.vector_context_id == vector_context_id)
+        .order_by(TokenUsageRollup.granularity, TokenUsageRollup.bucket_start)
+    )
+    return [
+        (row.granularity, row.bucket_start.replace(tzinfo=None), row.input_tokens, row.output_tokens, row.message_count)
+        for row in result.scalars()
+    ]
+
+
+def test_repeated_calls_accumulate_into_one_hour_and_one_day_row(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        context_id = (await create_conversation(db, user)).vector_context_id
+        for minute in (0, 15, 59):
+            await increment_usage_rollups(db, user.id, context_id, 10, 3, T0 + timedelta(minutes=minute))
+        await db.commit()
+        return await rollup_rows(db, context_id)
+
+    start = T0.replace(tzinfo=None)
+    assert run_db(scenario) == [
+        ("day", start, 30, 9, 3),
+        ("hour", start, 30, 9, 3),
+    ]
+
+
+def test_a_new_hour_opens_a_row_within_the_same_day(run_db):
+    async def scenario(db):
+        user = await create_user(db)
+        context_id = (await create_conversation(db, user)).vector_context_id
+        other_context_id = (await create_conversation(db, user)).vector_context_id
+        await increment_usage_rollups(db, user.id, context_id, 10, 3, T0)
+        await increment_usage_rollups(db, user.id, context_id, 5, 1, T0 + timedelta(hours=1, minutes=30))
+        # Each vector context has its own buckets
+        await increment_usage_rollups(db, user.id, other_context_id, 7, 7, T0)
+        await db.commit()
+        return await rollup_rows(db, context_id), await rollup_rows(db, other_context_id)
+
+    start = T0.replace(tzinfo=None)
+    rows, other_rows = run_db(scenario)
+    assert rows == [
+        ("day", start, 15, 4, 2),
+        ("hour", start, 10, 3, 1),
+        ("hour", start + timedelta(hours=1), 5, 1, 1),
+    ]
+    assert other_rows == [("day", start, 7, 7, 1), ("hour", start, 7, 7, 1)]
@@ -0,0 +1,49 @@
+# backend/tests/test_user_cache.py
+
+import uuid
+
+from app.core import dependencies
+from app.core.dependencies import token_claims
+from app.core.user_cache import UserCache
+from app.db.models import User
+from conftest import T0
+
+
+def make_user():
+    return User(id=uuid.uuid4(), name="User", email="user@example.com", hashed_password="x", created_at=T0)
+
+
+def test_each_lookup_gets_its_own_copy():
+    cache = UserCache()
+    user = make_user()
+    first = cache.put(user)
+    second, third = cache.get(str(user.id)), cache.get(str(user.id))
+
+    assert len({id(user), id(first), id(second), id(third)}) == 4
+    # A request changing its copy doesn't leak into the others or the cache
+    second.name = "Changed"
+    assert third.name == "User" and cache.get(str(user.id)).name == "User"
+    assert cache.stats()["hits"] == 3
+
+
+def test_expired_and_invalidated_entries_miss():
+    cache = UserCache(ttl_seconds=0)
+    user = make_user()
+    cache.put(user)
+    assert cache.get(str(user.id)) is None
+
+    cache = UserCache()
+    cache.put(user)
+    cache.invalidate(user.id)
+    assert cache.get(str(user.id)) is None
+
+
+def test_identity_claims_only_when_trusted(monkeypatch):
+    user = make_user()
+    monkeypatch.setattr(dependencies, "AUTH_TRUST_TOKEN_CLAIMS", False)
+    assert token_claims(user) == {"sub": str(user.id)}
+
+    monkeypatch.setattr(dependencies, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    assert token_claims(user) == {
+        "sub": str(user.id), "name": "User", "email": "user@example.com", "created_at": T0.isoformat(),
+    }
@@ -0,0 +1,85 @@
+# backend/tests/test_ws_access.py
+
+import asyncio
+import uuid
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api import ws
+from app.core.security import create_access_token
+from app.websockets.broker import InMemoryBroker
+from app.websockets.manager import ConnectionManager
+from conftest import add_messages, create_conversation, create_user
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, frame):
+        self.sent.append(frame)
+
+    async def close(self, code=1000):
+        pass
+
+
+def token_for(user):
+    return create_access_token({"sub": str(user.id)})
+
+
+def test_only_the_owner_may_open_a_conversation_socket(run_db, monkeypatch):
+    async def scenario(db):
+        monkeypatch.setattr(ws, "AsyncSessionLocal", async_sessionmaker(db.bind, expire_on_commit=False))
+        owner = await create_user(db, "owner@example.com")
+        other = await create_user(db, "other@example.com")
+        conversation = await create_conversation(db, owner)
+        return [
+            await ws.owns_conversation(token_for(owner), conversation.id),
+            await ws.owns_conversation(token_for(other), conversation.id),
+            await ws.owns_conversation(token_for(owner), uuid.uuid4()),
+            await ws.owns_conversation(None, conversation.id),
+            await ws.owns_conversation("not-a-token", conversation.id),
+        ]
+
+    assert run_db(scenario) == [True, False, False, False, False]
+
+
+def test_replay_from_db_returns_newer_replies(run_db, monkeypatch):
+    async def scenario(db):
+        monkeypatch.setattr(ws, "AsyncSessionLocal", async_sessionmaker(db.bind, expire_on_commit=False))
+        conversation = await create_conversation(db, await create_user(db))
+        messages = await add_messages(db, conversation, 5)
+        replayed = await ws.replay_from_db(conversation.id, messages[0].id)
+        unknown = await ws.replay_from_db(conversation.id, uuid.uuid4())
+        return [frame["content"] for frame in replayed], unknown
+
+    # Only assistant replies (odd positions) are replayed
+    assert run_db(scenario) == (["message 1", "message 3"], None)
+
+
+def test_live_frames_wait_for_the_replayed_history():
+    async def main():
+        manager = ConnectionManager(InMemoryBroker(), batch_max_wait_ms=0)
+        await manager.start()
+        conversation_id = uuid.uuid4()
+        websocket = FakeWebSocket()
+
+        # An epoch the event log doesn't know: history has to come from elsewhere
+        connection, resumed = await manager.connect(conversation_id, websocket, resume_epoch="gone", resume_seq=3)
+        await manager.send_message(conversation_id, {"type": "end", "id": "live"})
+        await asyncio.sleep(0.01)
+        sent_while_replaying = [frame["type"] for frame in websocket.sent]
+
+        connection.release([{"type": "replay", "id": "old"}])
+        await asyncio.sleep(0.01)
+        await manager.disconnect(connection)
+        await manager.close()
+        return resumed, sent_while_replaying, [frame["type"] for frame in websocket.sent]
+
+    resumed, sent_while_replaying, sent = asyncio.run(main())
+    assert not resumed
+    assert sent_while_replaying == ["hello"]
+    assert sent == ["hello", "replay", "end"]
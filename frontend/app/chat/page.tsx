@@ -30,6 +30,9 @@ export default function ChatPage() {
   const [showSidebar, setShowSidebar] = useState(!isMobile)
   const [selectedConversation, setSelectedConversation] = useState<Conversation | null>(null)
   const [messages, setMessages] = useState<Message[]>([])
+  // Cursor of the page of older messages, null once the whole history is loaded
+  const [olderCursor, setOlderCursor] = useState<string | null>(null)
+  const [loadingOlder, setLoadingOlder] = useState(false)
   const [loading, setLoading] = useState(false)
 
 
@@ -45,24 +48,42 @@ export default function ChatPage() {
     router.push("/")
   }
 
-  // Fetch messages when conversation changes
-  useEffect(() => {
-    if (!selectedConversation) return
+  // Latest page of the history; older pages are loaded as the user scrolls up
+  const loadLatestMessages = async (conversationId: string) => {
+    const page = await getMessages(conversationId)
+    setMessages(page.items.sort((a, b) => new Date(a.created_at).getTime() - new Date(b.created_at).getTime()))
+    setOlderCursor(page.beforeCursor)
+  }
 
-    const fetchMessages = async () => {
-      const data = await getMessages(selectedConversation.id)
-      setMessages(data)
+  const loadOlderMessages = async () => {
+    if (!selectedConversation || !olderCursor || loadingOlder) return
+    setLoadingOlder(true)
+    try {
+      const page = await getMessages(selectedConversation.id, olderCursor)
+      setMessages((prev) => {
+        const known = new Set(prev.map((m) => m.id))
+        return [...page.items.filter((m) => !known.has(m.id)), ...prev]
+      })
+      setOlderCursor(page.beforeCursor)
+    } catch (err) {
+      console.error("Failed to load older messages:", err)
+    } finally {
+      setLoadingOlder(false)
     }
+  }
 
-    fetchMessages()
+  // Fetch messages when conversation changes
+  useEffect(() => {
+    if (!selectedConversation) return
+    loadLatestMessages(selectedConversation.id)
   }, [selectedConversation])
 
-  const handleSelectConversation = async (conversation: Conversation) => {
+  const handleSelectConversation = (conversation: Conversation) => {
+    if (isMobile) setShowSidebar(false)
+    if (conversation.id === selectedConversation?.id) return
     setSelectedConversation(conversation)
     setMessages([])
-    if (isMobile) setShowSidebar(false)
-    const latest = await getMessages(conversation.id)
-    setMessages(latest.sort((a, b) => new Date(a.created_at).getTime() - new Date(b.created_at).getTime()))
+    setOlderCursor(null)
   }
 
   // Handle sending user messages
@@ -103,10 +124,21 @@ export default function ChatPage() {
     conversationId: selectedConversation?.id || null,
     onNewMessage: (incoming) => {
       setMessages((prev) => {
-        const withoutLoading = prev.filter((m) => m.id !== "loading")
+        const withoutLoading = prev.filter((m) => m.id !== "loading" && m.id !== incoming.id)
         return [...withoutLoading, incoming]
       })
     },
+    onPartialMessage: (partial) => {
+      setMessages((prev) => {
+        const withoutLoading = prev.filter((m) => m.id !== "loading" && m.id !== partial.id)
+        return [...withoutLoading, partial]
+      })
+    },
+    onResync: async () => {
+      // Missed too much while disconnected to replay; reload the latest page
+      if (!selectedConversation) return
+      await loadLatestMessages(selectedConversation.id)
+    },
   })
 
   return (
@@ -187,7 +219,14 @@ export default function ChatPage() {
         <div className="flex-1 flex flex-col overflow-hidden">
           {selectedConversation ? (
             <>
-              <MessageList conversation={selectedConversation} messages={messages} setMessages={setMessages} />
+              <MessageList
+                conversation={selectedConversation}
+                messages={messages}
+                setMessages={setMessages}
+                hasOlder={olderCursor !== null}
+                loadingOlder={loadingOlder}
+                onLoadOlder={loadOlderMessages}
+              />
               
               <MessageInput
                 conversation={selectedConversation}
@@ -243,6 +282,7 @@ export default function ChatPage() {
         onConversationCreated={(conversation) => {
           setSelectedConversation(conversation)
           setMessages([])
+          setOlderCursor(null)
         }}
       />
     </div>
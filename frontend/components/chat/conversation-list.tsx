@@ -19,15 +19,36 @@ export function ConversationList({
   onNewConversation,
 }: ConversationListProps) {
   const [conversations, setConversations] = useState<Conversation[]>([])
+  // Cursor of the next page, null once every conversation is loaded
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [isLoading, setIsLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState<string | null>(null)
 
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return
+    setLoadingMore(true)
+    try {
+      const page = await getConversations(nextCursor)
+      setConversations((prev) => {
+        const known = new Set(prev.map((c) => c.id))
+        return [...prev, ...page.items.filter((c) => !known.has(c.id))]
+      })
+      setNextCursor(page.beforeCursor)
+    } catch (err) {
+      console.error("Failed to load more conversations:", err)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   useEffect(() => {
     const fetchConversations = async () => {
       try {
         setIsLoading(true)
-        const data = await getConversations()
-        setConversations(data)
+        const page = await getConversations()
+        setConversations(page.items)
+        setNextCursor(page.beforeCursor)
         setError(null)
       } catch (err) {
         setError("Failed to load conversations")
@@ -66,6 +87,11 @@ export function ConversationList({
                 <span className="truncate">{conversation.title}</span>
               </Button>
             ))}
+            {nextCursor && (
+              <Button variant="ghost" className="w-full text-sm text-gray-500" disabled={loadingMore} onClick={loadMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            )}
             {conversations.length === 0 && <p className="text-sm text-gray-500 p-2">No conversations yet!</p>}
           </div>
         )}
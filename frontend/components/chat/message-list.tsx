@@ -11,8 +11,15 @@ interface MessageListProps {
   conversation: Conversation
   messages: Message[]
   setMessages: React.Dispatch<React.SetStateAction<Message[]>>
+  // Older history exists on the server; onLoadOlder prepends the previous page
+  hasOlder: boolean
+  loadingOlder: boolean
+  onLoadOlder: () => void
 }
 
+// Distance from the top (px) at which the previous page starts loading
+const LOAD_OLDER_THRESHOLD = 80
+
 // interface MessageListProps {
 //   messages: Message[]
 // }
@@ -43,10 +50,23 @@ interface MessageListProps {
 // }
 
 
-export function MessageList({ conversation, messages, setMessages }: MessageListProps) {
+export function MessageList({
+  conversation,
+  messages,
+  setMessages,
+  hasOlder,
+  loadingOlder,
+  onLoadOlder,
+}: MessageListProps) {
   const [isLoading, setIsLoading] = useState(true)
   const [error] = useState<string | null>(null)
   const scrollAreaRef = useRef<HTMLDivElement>(null)
+  // First/last message ids and scroll height seen at the last render, to tell a
+  // prepended page of history from new messages at the bottom
+  const renderedRef = useRef<{ firstId?: string; lastId?: string; scrollHeight: number }>({ scrollHeight: 0 })
+
+  const getViewport = () =>
+    scrollAreaRef.current?.querySelector("[data-radix-scroll-area-viewport]") as HTMLElement | null
 
   const fetchMessages = async () => {
     if (!conversation) return
@@ -128,16 +148,35 @@ export function MessageList({ conversation, messages, setMessages }: MessageList
 //     }
 //   }, [messages, isPolling])
 
-  // Scroll to bottom when messages change
+  // Scroll to bottom when messages arrive; keep the position when older ones are prepended
   useEffect(() => {
-    if (scrollAreaRef.current) {
-      const scrollContainer = scrollAreaRef.current.querySelector("[data-radix-scroll-area-viewport]")
-      if (scrollContainer) {
-        scrollContainer.scrollTop = scrollContainer.scrollHeight
-      }
+    const scrollContainer = getViewport()
+    if (!scrollContainer) return
+    const previous = renderedRef.current
+    const firstId = messages[0]?.id
+    const lastId = messages[messages.length - 1]?.id
+    const prepended = previous.lastId !== undefined && previous.lastId === lastId && previous.firstId !== firstId
+    if (prepended) {
+      scrollContainer.scrollTop += scrollContainer.scrollHeight - previous.scrollHeight
+    } else {
+      scrollContainer.scrollTop = scrollContainer.scrollHeight
     }
+    renderedRef.current = { firstId, lastId, scrollHeight: scrollContainer.scrollHeight }
   }, [messages])
 
+  // Load the previous page when the user scrolls near the top
+  useEffect(() => {
+    const scrollContainer = getViewport()
+    if (!scrollContainer) return
+    const onScroll = () => {
+      if (scrollContainer.scrollTop < LOAD_OLDER_THRESHOLD && hasOlder && !loadingOlder) {
+        onLoadOlder()
+      }
+    }
+    scrollContainer.addEventListener("scroll", onScroll)
+    return () => scrollContainer.removeEventListener("scroll", onScroll)
+  }, [hasOlder, loadingOlder, onLoadOlder])
+
   if (isLoading && messages.length === 0) {
     return <div className="flex-1 flex items-center justify-center">Loading messages...</div>
   }
@@ -149,6 +188,17 @@ export function MessageList({ conversation, messages, setMessages }: MessageList
   return (
     <ScrollArea className="flex-1 p-4" ref={scrollAreaRef}>
       <div className="space-y-4">
+        {(hasOlder || loadingOlder) && (
+          <div className="text-center text-sm text-gray-500">
+            {loadingOlder ? (
+              "Loading older messages..."
+            ) : (
+              <button type="button" className="underline" onClick={onLoadOlder}>
+                Load older messages
+              </button>
+            )}
+          </div>
+        )}
         {messages.map((message) => (
           <div key={message.id} className={cn("flex", message.role === "user" ? "justify-end" : "justify-start")}>
             <div
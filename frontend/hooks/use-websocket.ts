@@ -1,44 +1,119 @@
 import { useEffect, useRef } from "react"
 import type { Message } from "@/types"
+import { getToken } from "@/lib/api"
+
+// Reconnect delays grow up to this cap (ms)
+const MAX_RECONNECT_DELAY = 10000
 
 export function useWebSocket({
   conversationId,
   onNewMessage,
+  onPartialMessage,
+  onResync,
 }: {
   conversationId: string | null
   onNewMessage: (message: Message) => void
+  onPartialMessage?: (message: Message) => void
+  // Called when missed messages could not be replayed and the history must be refetched
+  onResync?: () => void
 }) {
   const socketRef = useRef<WebSocket | null>(null)
+  // Assistant replies being streamed, keyed by message id
+  const partialsRef = useRef<Record<string, Message>>({})
+  // Resume position: server event log epoch, last frame seq and last complete reply
+  const resumeRef = useRef<{ epoch?: string; seq?: number; lastMessageId?: string }>({})
 
   useEffect(() => {
     if (!conversationId) return
 
-    const wsUrl = `ws://localhost:8000/ws/${conversationId}`
-    socketRef.current = new WebSocket(wsUrl)
+    let closedByUs = false
+    let reconnectDelay = 500
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined
+    resumeRef.current = {}
+    partialsRef.current = {}
 
-    socketRef.current.onopen = () => {
-      console.log("✅ WebSocket connected")
-    }
+    const connect = () => {
+      const params = new URLSearchParams()
+      // The server only lets the conversation's owner subscribe
+      const token = getToken()
+      if (token) params.set("token", token)
+      const { epoch, seq, lastMessageId } = resumeRef.current
+      if (epoch && seq !== undefined) {
+        params.set("epoch", epoch)
+        params.set("seq", String(seq))
+      }
+      if (lastMessageId) params.set("last_message_id", lastMessageId)
+
+      const wsUrl = `ws://localhost:8000/ws/${conversationId}?${params.toString()}`
+      const socket = new WebSocket(wsUrl)
+      socketRef.current = socket
 
-    socketRef.current.onmessage = (event) => {
-      try {
-        const data = JSON.parse(event.data)
-        onNewMessage(data)
-      } catch (err) {
-        console.error("Invalid WebSocket message:", err)
+      socket.onopen = () => {
+        console.log("✅ WebSocket connected")
+        reconnectDelay = 500
       }
-    }
 
-    socketRef.current.onerror = (err) => {
-      console.error("WebSocket error:", err)
-    }
+      socket.onmessage = (event) => {
+        try {
+          const data = JSON.parse(event.data)
+          const { type, epoch, seq, ...message } = data
+
+          if (seq !== undefined) {
+            resumeRef.current.epoch = epoch
+            resumeRef.current.seq = seq
+          }
 
-    socketRef.current.onclose = () => {
-      console.log("❌ WebSocket disconnected")
+          if (type === "ping") {
+            // Server heartbeat; answering keeps the connection from being closed as idle
+            socket.send(JSON.stringify({ type: "pong" }))
+          } else if (type === "pong") {
+            return
+          } else if (type === "hello") {
+            resumeRef.current.epoch = epoch
+            if (!message.resumed) resumeRef.current.seq = message.last_seq
+          } else if (type === "resync") {
+            partialsRef.current = {}
+            onResync?.()
+          } else if (type === "start") {
+            partialsRef.current[message.id] = { ...message, content: "" }
+            onPartialMessage?.(partialsRef.current[message.id])
+          } else if (type === "delta") {
+            const partial = partialsRef.current[message.id]
+            if (!partial) return
+            partial.content += message.content
+            onPartialMessage?.({ ...partial })
+          } else if (type === "error") {
+            delete partialsRef.current[message.id]
+          } else {
+            // "end"/"replay" frames and non-streamed replies carry the full message
+            delete partialsRef.current[message.id]
+            resumeRef.current.lastMessageId = message.id
+            onNewMessage(message)
+          }
+        } catch (err) {
+          console.error("Invalid WebSocket message:", err)
+        }
+      }
+
+      socket.onerror = (err) => {
+        console.error("WebSocket error:", err)
+      }
+
+      socket.onclose = () => {
+        console.log("❌ WebSocket disconnected")
+        if (closedByUs) return
+        // Reconnect and resume from the last frame we saw
+        reconnectTimer = setTimeout(connect, reconnectDelay)
+        reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_DELAY)
+      }
     }
 
+    connect()
+
     return () => {
+      closedByUs = true
+      clearTimeout(reconnectTimer)
       socketRef.current?.close()
     }
   }, [conversationId])
-}
\ No newline at end of file
+}
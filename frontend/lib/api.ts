@@ -8,6 +8,7 @@ import type {
   NewConversation,
   Message,
   NewMessage,
+  Page,
 } from "@/types"
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "https://api.example.com"
@@ -18,7 +19,7 @@ export const getToken = (): string | null => {
 }
 
 // API helper
-async function apiRequest<T>(endpoint: string, method = "GET", data?: any): Promise<T> {
+async function apiFetch(endpoint: string, method = "GET", data?: any): Promise<Response> {
   const token = getToken()
 
   const headers: HeadersInit = {
@@ -42,9 +43,24 @@ async function apiRequest<T>(endpoint: string, method = "GET", data?: any): Prom
     throw new Error(errorData.message || `API request failed with status ${response.status}`)
   }
 
+  return response
+}
+
+async function apiRequest<T>(endpoint: string, method = "GET", data?: any): Promise<T> {
+  const response = await apiFetch(endpoint, method, data)
   return response.json()
 }
 
+// GET of a paginated list; the cursor of the next page comes in the X-Before-Cursor header
+async function apiRequestPage<T>(endpoint: string, before?: string | null): Promise<Page<T>> {
+  const query = before ? `?before=${encodeURIComponent(before)}` : ""
+  const response = await apiFetch(`${endpoint}${query}`)
+  return {
+    items: await response.json(),
+    beforeCursor: response.headers.get("X-Before-Cursor"),
+  }
+}
+
 // Auth APIs
 export const registerUser = async (credentials: RegisterCredentials): Promise<{ user: User; token: string }> => {
   const data = await apiRequest<{ user: User; token: string }>("auth/register", "POST", credentials)
@@ -72,8 +88,9 @@ export const getContexts = async (): Promise<Context[]> => {
 }
 
 // Conversation APIs
-export const getConversations = async (): Promise<Conversation[]> => {
-  return apiRequest<Conversation[]>("conversations")
+// Most recently active first; pass beforeCursor to load the next page
+export const getConversations = async (before?: string | null): Promise<Page<Conversation>> => {
+  return apiRequestPage<Conversation>("conversations", before)
 }
 
 export const createConversation = async (newConversation: NewConversation): Promise<Conversation> => {
@@ -82,8 +99,9 @@ export const createConversation = async (newConversation: NewConversation): Prom
 
 
 // Message APIs
-export const getMessages = async (conversationId: string): Promise<Message[]> => {
-  return apiRequest<Message[]>(`messages/${conversationId}`)
+// Latest page of a conversation (oldest first); pass beforeCursor to load the page before it
+export const getMessages = async (conversationId: string, before?: string | null): Promise<Page<Message>> => {
+  return apiRequestPage<Message>(`messages/${conversationId}`, before)
 }
 
 export const sendMessage = async (newMessage: NewMessage): Promise<Message> => {
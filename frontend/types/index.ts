@@ -54,3 +54,9 @@ export interface NewMessage {
   conversation_id: string
   content: string
 }
+
+// One page of a keyset-paginated list; beforeCursor fetches the next (older) page
+export interface Page<T> {
+  items: T[]
+  beforeCursor: string | null
+}